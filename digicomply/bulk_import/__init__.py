@@ -0,0 +1,2 @@
+# Copyright (c) 2024, DigiComply and contributors
+# License: MIT
@@ -0,0 +1,302 @@
+# Copyright (c) 2024, DigiComply and contributors
+# License: MIT
+
+"""
+In-memory dry-run validation for bulk imports
+
+A dry run used to go through the import handlers, which look up every
+row in the database. RowValidator instead checks rows against:
+
+- the Import Template columns (required flags, field types, regex)
+- the checks the import handlers apply themselves (required keys, TRN format)
+- lookup sets loaded once per run (existing records and link targets)
+
+so a whole file is validated in one streaming pass without per-row queries.
+"""
+
+import datetime
+import re
+
+import frappe
+from frappe.utils import cint, cstr, getdate
+
+
+# Checks the import handlers make regardless of the template: (field, message)
+REQUIRED_FIELDS = {
+    "Customer": [("customer_name", "Customer name is required")],
+    "Supplier": [("supplier_name", "Supplier name is required")],
+    "Item": [("item_code", "Item code is required")],
+    "TRN Registry": [
+        ("trn", "TRN is required"),
+        ("entity_name", "Entity name is required"),
+        ("company", "Company is required"),
+    ],
+    "Company": [("company_name", "Company name is required")],
+    "Invoice": [
+        ("invoice_no", "Invoice number is required"),
+        ("customer", "Customer is required"),
+    ],
+    "ASP Data": [("invoice_no", "Invoice number is required")],
+}
+
+# Record an import row creates or updates: (field, doctype, lookup field, label)
+EXISTING_RECORDS = {
+    "Customer": ("customer_name", "Customer", "customer_name", "Customer"),
+    "Supplier": ("supplier_name", "Supplier", "supplier_name", "Supplier"),
+    "Item": ("item_code", "Item", "name", "Item"),
+    "TRN Registry": ("trn", "TRN Registry", "trn", "TRN"),
+    "Company": ("company_name", "Company", "name", "Company"),
+    "Invoice": ("invoice_no", "Sales Invoice", "name", "Invoice"),
+}
+
+# Links checked against existing records: (field, doctype, checked with skip_validation)
+LINK_FIELDS = {
+    "Customer": [("customer_group", "Customer Group", False), ("territory", "Territory", False)],
+    "Supplier": [("supplier_group", "Supplier Group", False), ("country", "Country", False)],
+    "Item": [("item_group", "Item Group", False), ("stock_uom", "UOM", False)],
+    "TRN Registry": [("company", "Company", False)],
+    "Company": [("default_currency", "Currency", False), ("country", "Country", False)],
+    "Invoice": [("customer", "Customer", True), ("item_code", "Item", False)],
+}
+
+CHECK_VALUES = {"0", "1"}
+
+
+def normalize_column(column):
+    """Same header normalisation as process_import"""
+    return cstr(column).strip().lower().replace(" ", "_")
+
+
+def get_template_columns(import_type, template=None):
+    """
+    Column definitions of the import's template
+
+    Uses the given Import Template or the default one for the import type;
+    an empty list if there is neither.
+    """
+    template = template or frappe.db.get_value(
+        "Import Template", {"import_type": import_type, "is_default": 1}, "name"
+    )
+    if not template:
+        return []
+
+    return frappe.get_all(
+        "Import Template Column",
+        filters={"parent": template, "parenttype": "Import Template"},
+        fields=["column_name", "field_name", "field_type", "is_required", "default_value", "validation_regex"],
+        order_by="idx asc"
+    )
+
+
+def load_lookup_sets(import_type, skip_validation=False):
+    """
+    Existing keys and link targets for an import type, loaded once
+
+    Returns:
+        tuple: (set of existing record keys or None, {field: (doctype, set of names)})
+        Values are casefolded, as the database compares them case-insensitively.
+    """
+    existing = None
+    if import_type in EXISTING_RECORDS:
+        _field, doctype, lookup_field, _label = EXISTING_RECORDS[import_type]
+        existing = get_lookup_set(doctype, lookup_field)
+
+    links = {}
+    for field, doctype, always in LINK_FIELDS.get(import_type, []):
+        if always or not skip_validation:
+            links[field] = (doctype, get_lookup_set(doctype, "name"))
+
+    return existing, links
+
+
+def get_lookup_set(doctype, fieldname):
+    return {
+        cstr(value).casefold()
+        for value in frappe.get_all(doctype, pluck=fieldname, limit_page_length=0)
+    }
+
+
+class RowValidator:
+    """
+    Validates import rows of one Bulk Import Log without database access
+
+    Build it once per run with the file header, then call validate() per
+    row. Issues use the same messages as the import handlers where they
+    overlap, so a dry run reports what the real import would.
+    """
+
+    def __init__(self, import_log, header, columns=None, lookups=None):
+        self.import_type = import_log.import_type
+        self.update_existing = cint(import_log.update_existing)
+        self.skip_validation = cint(import_log.skip_validation)
+        self.default_company = import_log.company
+
+        self.positions = {field: position for position, field in enumerate(header)}
+        self.header_errors = []
+
+        if columns is None:
+            columns = get_template_columns(import_log.import_type, import_log.get("import_template"))
+        if lookups is None:
+            lookups = load_lookup_sets(import_log.import_type, self.skip_validation)
+        self.existing, self.links = lookups
+
+        self.required = self.get_required_checks(columns)
+        self.typed = self.get_type_checks(columns)
+        self.date_cache = {}
+
+        self.key_field, self.key_position, self.record_label = None, None, None
+        if self.import_type in EXISTING_RECORDS:
+            self.key_field, _doctype, _lookup_field, self.record_label = EXISTING_RECORDS[self.import_type]
+            self.key_position = self.positions.get(self.key_field)
+
+        self.link_positions = [
+            (self.positions[field], field, doctype, names)
+            for field, (doctype, names) in self.links.items()
+            if field in self.positions
+        ]
+
+    def get_position(self, column):
+        """Header position of a template column, matched by column or field name"""
+        for candidate in (normalize_column(column.column_name), column.field_name):
+            if candidate in self.positions:
+                return self.positions[candidate]
+        return None
+
+    def get_required_checks(self, columns):
+        """(position, field, message, default) for every required field"""
+        checks = {}
+
+        for field, message in REQUIRED_FIELDS.get(self.import_type, []):
+            default = self.default_company if field == "company" and self.import_type == "TRN Registry" else None
+            checks[field] = (self.positions.get(field), field, message, default)
+
+        for column in columns:
+            if not column.is_required or column.field_name in checks:
+                continue
+            checks[column.field_name] = (
+                self.get_position(column), column.field_name,
+                f"{column.column_name} is required", column.default_value
+            )
+
+        for position, field, message, default in checks.values():
+            if position is None and not default:
+                self.header_errors.append({
+                    "row": 1,
+                    "error": f"Column '{field}' is missing",
+                    "field": field,
+                    "value": ""
+                })
+
+        return [check for check in checks.values() if check[0] is not None and not check[3]]
+
+    def get_type_checks(self, columns):
+        """(position, field, converter, field type, regex) for columns that need more than a string"""
+        checks = []
+
+        for column in columns:
+            position = self.get_position(column)
+            if position is None:
+                continue
+
+            converter = {
+                "Int": self.check_int,
+                "Float": self.check_float,
+                "Currency": self.check_float,
+                "Date": self.check_date,
+                "Datetime": self.check_date,
+                "Check": self.check_check,
+            }.get(column.field_type)
+
+            regex = None
+            if column.validation_regex:
+                try:
+                    regex = re.compile(column.validation_regex)
+                except re.error:
+                    regex = None
+
+            if converter or regex:
+                checks.append((position, column.field_name, converter, column.field_type, regex))
+
+        return checks
+
+    @staticmethod
+    def check_int(value):
+        int(value.replace(",", ""))
+
+    @staticmethod
+    def check_float(value):
+        float(value.replace(",", ""))
+
+    @staticmethod
+    def check_check(value):
+        if value not in CHECK_VALUES:
+            raise ValueError(value)
+
+    def check_date(self, value):
+        # ASP and ERP exports repeat the same dates, so each distinct value is parsed once
+        valid = self.date_cache.get(value)
+        if valid is None:
+            try:
+                datetime.date.fromisoformat(value[:10])
+                valid = True
+            except ValueError:
+                try:
+                    getdate(value)
+                    valid = True
+                except Exception:
+                    valid = False
+            self.date_cache[value] = valid
+
+        if not valid:
+            raise ValueError(value)
+
+    def validate(self, row):
+        """
+        Validate one row (list of cells in header order)
+
+        Returns:
+            tuple: (errors, warnings) lists of issue dicts without row numbers
+        """
+        errors = []
+        warnings = []
+        width = len(row)
+
+        def cell(position):
+            return row[position].strip() if position < width else ""
+
+        for position, field, message, _default in self.required:
+            if not cell(position):
+                errors.append({"error": message, "field": field, "value": ""})
+
+        for position, field, converter, field_type, regex in self.typed:
+            value = cell(position)
+            if not value:
+                continue
+
+            if converter:
+                try:
+                    converter(value)
+                except (ValueError, TypeError):
+                    errors.append({"error": f"Invalid {field_type} value", "field": field, "value": value})
+                    continue
+
+            if regex and not regex.match(value):
+                errors.append({"error": "Value does not match the expected format", "field": field, "value": value})
+
+        if self.import_type == "TRN Registry" and not self.skip_validation:
+            trn = cell(self.positions["trn"]) if "trn" in self.positions else ""
+            trn_clean = "".join(filter(str.isdigit, trn))
+            if trn and len(trn_clean) != 15:
+                errors.append({"error": f"TRN must be 15 digits, got {len(trn_clean)}", "field": "trn", "value": trn})
+
+        for position, field, doctype, names in self.link_positions:
+            value = cell(position)
+            if value and value.casefold() not in names:
+                errors.append({"error": f"{doctype} '{value}' not found", "field": field, "value": value})
+
+        if not errors and self.key_position is not None and not self.update_existing:
+            key = cell(self.key_position)
+            if key and key.casefold() in self.existing:
+                warnings.append({"warning": f"{self.record_label} '{key}' already exists", "field": self.key_field})
+
+        return errors, warnings
@@ -13,6 +13,7 @@ from digicomply.digicomply.api.fta_api import (
     validate_trn_with_fta,
     validate_trn_format,
     bulk_validate_trns,
+    validate_trns_in_bulk,
     get_fta_settings
 )
 
@@ -29,6 +30,7 @@ __all__ = [
     "validate_trn_with_fta",
     "validate_trn_format",
     "bulk_validate_trns",
+    "validate_trns_in_bulk",
     "get_fta_settings",
     # Connector Framework
     "ConnectorFramework",
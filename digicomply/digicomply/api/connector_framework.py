@@ -7,20 +7,83 @@ Central orchestrator for ASP (Accredited Service Provider) interactions
 """
 
 import frappe
-from frappe.utils import now_datetime
+from frappe.utils import cint, now_datetime
 import requests
 import json
 import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from functools import wraps
 
 
+# ASP rate limiting: bucket size in seconds of traffic, wait after a 429
+# without Retry-After, and how long an idle bucket is kept
+RATE_LIMIT_BURST_SECONDS = 10
+RATE_LIMIT_RETRY_AFTER = 10
+RATE_LIMIT_KEY_TTL = 3600
+
+# KEYS[1] bucket; ARGV capacity, refill per second, tokens to take (0 to peek), ttl
+TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated", "blocked_until")
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+local blocked_until = tonumber(bucket[3]) or 0
+
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+
+local wait = 0
+if blocked_until > now then
+    -- Refilling resumes only once the block has passed
+    return {tostring(blocked_until - now), "0", tostring(blocked_until - now)}
+elseif tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+
+if requested > 0 then
+    redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated", tostring(now))
+    redis.call("EXPIRE", KEYS[1], ARGV[4])
+end
+
+return {tostring(wait), tostring(tokens), "0"}
+"""
+
+# KEYS[1] bucket; ARGV seconds to block, ttl. Empties the bucket until then.
+TOKEN_BUCKET_BLOCK_SCRIPT = """
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local blocked_until = now + tonumber(ARGV[1])
+
+if blocked_until > (tonumber(redis.call("HGET", KEYS[1], "blocked_until")) or 0) then
+    redis.call("HSET", KEYS[1], "blocked_until", tostring(blocked_until), "tokens", "0", "updated", tostring(blocked_until))
+    redis.call("EXPIRE", KEYS[1], ARGV[2])
+end
+
+return tostring(blocked_until - now)
+"""
+
+# Concurrent invoice pushes: in-flight requests per connection, and invoices per DB write batch
+DEFAULT_PUSH_CONCURRENCY = 4
+PUSH_BATCH_SIZE = 50
+
+
 class ConnectorFramework:
     """Main framework class for managing ASP connections and sync operations"""
 
     def __init__(self, connection_name):
         self.connection = frappe.get_doc("ASP Connection", connection_name)
         self.connector = self._get_connector()
-        self.rate_limiter = RateLimiter(self.connection.name)
+        self.rate_limiter = RateLimiter(self.connection.name, self.connection.rate_limit_per_minute)
+        self.pool_key = f"asp::{self.connection.name}"
 
     def _get_connector(self):
         """Get the ASP connector configuration"""
@@ -40,97 +103,142 @@ class ConnectorFramework:
         """Get authentication headers for API requests"""
         return self.connection._get_auth_headers()
 
+    def _get_session(self, headers):
+        """Pooled keep-alive session, recycled when the base URL or credentials change"""
+        from digicomply.http_pool import get_fingerprint, get_retry, get_session
+
+        fingerprint = get_fingerprint(self.connection.base_url, headers, self.connection.max_retries)
+        return get_session(
+            self.pool_key,
+            fingerprint,
+            retry=get_retry(max_retries=self.connection.max_retries or 3)
+        )
+
     def _make_request(self, method, endpoint, data=None, params=None, sync_run=None):
         """Make an API request with logging and rate limiting"""
-        from digicomply.digicomply.doctype.api_log.api_log import (
-            create_api_log, update_api_log
-        )
+        # Wait for a token from the connection's shared bucket
+        self.rate_limiter.acquire()
 
-        # Check rate limit
-        self.rate_limiter.wait_if_needed()
+        request = self._begin_request(method, endpoint, data=data, params=params, sync_run=sync_run)
+        return self._finish_request(request, *self._send_request(request))
 
-        url = f"{self.connection.base_url}{endpoint}"
+    def _begin_request(self, method, endpoint, data=None, params=None, sync_run=None):
+        """Resolve everything _send_request needs; the call is logged by _finish_request"""
         headers = self._get_headers()
 
-        # Create log entry
-        log_name = create_api_log(
-            connection=self.connection.name,
-            endpoint=endpoint,
+        return frappe._dict(
             method=method,
-            request_headers=headers,
-            request_body=data,
-            sync_run=sync_run
+            endpoint=endpoint,
+            url=f"{self.connection.base_url}{endpoint}",
+            headers=headers,
+            session=self._get_session(headers),
+            data=data,
+            json=data if method in ["POST", "PUT", "PATCH"] else None,
+            params=params,
+            timeout=self.connection.timeout_seconds or 30,
+            sync_run=sync_run,
+            timestamp=now_datetime()
         )
 
-        start_time = time.time()
-
-        try:
-            response = requests.request(
-                method=method,
-                url=url,
-                headers=headers,
-                json=data if method in ["POST", "PUT", "PATCH"] else None,
-                params=params,
-                timeout=self.connection.timeout_seconds or 30
-            )
+    def _send_request(self, request):
+        """
+        The HTTP round trip only: no database or cache access, so it is
+        safe to run in a worker thread
 
-            response_time_ms = int((time.time() - start_time) * 1000)
+        Returns:
+            tuple: (response or None, RequestException or None, response time in ms, latency samples)
+        """
+        from digicomply.http_pool import send
 
-            # Determine response status
-            if response.status_code in [200, 201, 202, 204]:
-                response_status = "Success"
-            elif response.status_code == 429:
-                response_status = "Rate Limited"
-                self.rate_limiter.record_limit_hit()
-            else:
-                response_status = "Error"
+        latency = []
+        start_time = time.time()
 
-            # Try to parse JSON response
-            try:
-                response_body = response.json()
-            except Exception:
-                response_body = response.text
-
-            # Update log
-            update_api_log(
-                log_name=log_name,
-                status_code=response.status_code,
-                response_status=response_status,
-                response_headers=dict(response.headers),
-                response_body=response_body,
-                response_time_ms=response_time_ms
+        try:
+            response = send(
+                self.pool_key,
+                request.session,
+                request.method,
+                request.url,
+                latency=latency,
+                headers=request.headers,
+                json=request.json,
+                params=request.params,
+                timeout=request.timeout
             )
+            error = None
+        except requests.exceptions.RequestException as e:
+            response, error = None, e
+
+        return response, error, int((time.time() - start_time) * 1000), latency
+
+    def _finish_request(self, request, response, error, response_time_ms, latency=None):
+        """Log the call and update the rate limiter with the outcome of _send_request"""
+        from digicomply.digicomply.doctype.api_log.api_log import log_api_call
+        from digicomply.http_pool import record_latency
+
+        for measurement in latency or []:
+            record_latency(*measurement)
+
+        log = {
+            "connection": self.connection.name,
+            "endpoint": request.endpoint,
+            "method": request.method,
+            "request_timestamp": request.timestamp,
+            "request_headers": request.headers,
+            "request_body": request.data,
+            "sync_run": request.sync_run,
+            "response_time_ms": response_time_ms
+        }
 
-            self.rate_limiter.record_request()
-
-            return {
-                "success": response_status == "Success",
-                "status_code": response.status_code,
-                "data": response_body,
-                "headers": dict(response.headers)
-            }
-
-        except requests.exceptions.Timeout:
-            update_api_log(
-                log_name=log_name,
+        if isinstance(error, requests.exceptions.Timeout):
+            log_api_call(
+                **log,
                 status_code=0,
                 response_status="Timeout",
                 error_type="Timeout",
-                error_message="Request timed out",
-                response_time_ms=int((time.time() - start_time) * 1000)
+                error_message="Request timed out"
             )
             return {"success": False, "error": "Timeout"}
 
-        except requests.exceptions.RequestException as e:
-            update_api_log(
-                log_name=log_name,
+        if error:
+            log_api_call(
+                **log,
                 status_code=0,
                 response_status="Error",
-                error_type=type(e).__name__,
-                error_message=str(e),
-                response_time_ms=int((time.time() - start_time) * 1000)
+                error_type=type(error).__name__,
+                error_message=str(error)
             )
-            return {"success": False, "error": str(e)}
+            return {"success": False, "error": str(error)}
+
+        # Determine response status
+        if response.status_code in [200, 201, 202, 204]:
+            response_status = "Success"
+        elif response.status_code == 429:
+            response_status = "Rate Limited"
+            self.rate_limiter.record_limit_hit(response.headers.get("Retry-After"))
+        else:
+            response_status = "Error"
+
+        # Try to parse JSON response
+        try:
+            response_body = response.json()
+        except Exception:
+            response_body = response.text
+
+        log_api_call(
+            **log,
+            status_code=response.status_code,
+            response_status=response_status,
+            response_headers=response.headers,
+            response_body=response_body
+        )
+
+        return {
+            "success": response_status == "Success",
+            "status_code": response.status_code,
+            "data": response_body,
+            "headers": dict(response.headers)
+        }
 
     def fetch_invoices(self, filters=None, page=1, page_size=100, sync_run=None):
         """Fetch invoices from ASP"""
@@ -148,6 +256,103 @@ class ConnectorFramework:
 
         return self._make_request("GET", endpoint, params=params, sync_run=sync_run)
 
+    def fetch_invoice_pages(self, filters=None, page_size=100, sync_run=None, prefetch=None):
+        """
+        Yield (result, invoices) for each page of invoices, fetching ahead
+
+        While the caller processes one page, up to prefetch further pages
+        (the connector's prefetch_pages) are already being requested in
+        worker threads; the bounded look-ahead is the back-pressure. With
+        page-number pagination they are requested in parallel. With cursor
+        pagination only the next page can be, as its request needs the
+        cursor from the page before.
+
+        Iteration stops after an empty or short page, a page without a next
+        cursor, or a failed request (yielded with no invoices).
+        """
+        if not self.connector:
+            yield {"success": False, "error": "No connector configured"}, []
+            return
+
+        endpoint = self.connector.fetch_invoice_endpoint
+        if not endpoint:
+            yield {"success": False, "error": "Fetch invoice endpoint not configured"}, []
+            return
+
+        paginated = cint(self.connector.supports_pagination)
+        by_cursor = paginated and self.connector.pagination_type == "Cursor"
+        page_limit = min(page_size, self.connector.page_size_limit or 100)
+        depth = max(cint(prefetch or self.connector.prefetch_pages), 1) if paginated else 1
+
+        def get_params(page=None, cursor=None):
+            params = dict(filters or {})
+            if paginated:
+                params["page_size"] = page_limit
+                if by_cursor:
+                    if cursor:
+                        params[self.connector.cursor_param or "cursor"] = cursor
+                else:
+                    params["page"] = page
+            return params
+
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=depth) as executor:
+            def start_fetch(params):
+                self.rate_limiter.acquire()
+                request = self._begin_request("GET", endpoint, params=params, sync_run=sync_run)
+                pending.append((request, executor.submit(self._send_request, request)))
+
+            next_page = 1
+
+            def fill_pages():
+                # Page numbers are known up front, so keep depth requests in flight
+                nonlocal next_page
+                while len(pending) < depth:
+                    start_fetch(get_params(page=next_page))
+                    next_page += 1
+
+            try:
+                if paginated and not by_cursor:
+                    fill_pages()
+                else:
+                    start_fetch(get_params())
+
+                while pending:
+                    request, future = pending.popleft()
+                    result = self._finish_request(request, *future.result())
+                    if not result["success"]:
+                        yield result, []
+                        return
+
+                    invoices = get_fetched_records(result, "invoices")
+                    if not invoices:
+                        return
+
+                    # Request what comes next before handing this page over
+                    has_more = False
+                    if by_cursor:
+                        cursor = get_next_cursor(result.get("data"), self.connector.next_cursor_field or "next_cursor")
+                        if cursor:
+                            has_more = True
+                            start_fetch(get_params(cursor=cursor))
+                    elif paginated and len(invoices) >= page_limit:
+                        has_more = True
+                        fill_pages()
+
+                    yield result, invoices
+
+                    if not has_more:
+                        return
+            finally:
+                # Pages fetched past the end are still logged
+                while pending:
+                    request, future = pending.popleft()
+                    try:
+                        self._finish_request(request, *future.result())
+                    except Exception:
+                        pass
+
     def push_invoice(self, invoice_data, sync_run=None):
         """Push invoice to ASP"""
         if not self.connector:
@@ -168,6 +373,79 @@ class ConnectorFramework:
 
         return self._make_request("POST", endpoint, data=transformed_data, sync_run=sync_run)
 
+    def push_invoices(self, invoices, sync_run=None, max_workers=None):
+        """
+        Push several invoices to the ASP concurrently
+
+        Transforms, API log buffering and rate limiting run in the calling thread;
+        only the HTTP round trips go to a pool of up to max_workers threads
+        (the connection's max_concurrent_requests by default). Every request
+        waits for a token from the connection's shared RateLimiter.
+
+        Args:
+            invoices: list of (key, invoice_data)
+
+        Returns:
+            dict: key -> result, in the same shape push_invoice() returns
+        """
+        from digicomply.digicomply.doctype.transform_rule.transform_rule import apply_transforms_many
+
+        if not self.connector:
+            return {key: {"success": False, "error": "No connector configured"} for key, _data in invoices}
+
+        endpoint = self.connector.push_invoice_endpoint
+        if not endpoint:
+            return {key: {"success": False, "error": "Push invoice endpoint not configured"} for key, _data in invoices}
+
+        max_workers = max_workers or cint(self.connection.max_concurrent_requests) or DEFAULT_PUSH_CONCURRENCY
+
+        results = {}
+        pending = {}
+
+        # Transform the whole batch up front; an invoice whose rules fail only fails itself
+        transform_errors = {}
+        transformed = apply_transforms_many(
+            [invoice_data for _key, invoice_data in invoices],
+            self.connector.name,
+            "Invoice",
+            "Outbound",
+            on_error=transform_errors.__setitem__
+        )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for idx, (key, _data) in enumerate(invoices):
+                if idx in transform_errors:
+                    results[key] = {"success": False, "error": str(transform_errors[idx])}
+                    continue
+
+                while len(pending) >= max_workers:
+                    self._collect_pushes(pending, results)
+
+                self.rate_limiter.acquire()
+
+                try:
+                    request = self._begin_request("POST", endpoint, data=transformed[idx], sync_run=sync_run)
+                except Exception as e:
+                    results[key] = {"success": False, "error": str(e)}
+                    continue
+
+                pending[executor.submit(self._send_request, request)] = (key, request)
+
+            while pending:
+                self._collect_pushes(pending, results)
+
+        return results
+
+    def _collect_pushes(self, pending, results):
+        """Finish whichever pushes have completed, waiting for at least one"""
+        done, _not_done = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            key, request = pending.pop(future)
+            try:
+                results[key] = self._finish_request(request, *future.result())
+            except Exception as e:
+                results[key] = {"success": False, "error": str(e)}
+
     def get_invoice_status(self, invoice_id, sync_run=None):
         """Get invoice status from ASP"""
         if not self.connector:
@@ -222,38 +500,83 @@ class ConnectorFramework:
 
 
 class RateLimiter:
-    """Rate limiter for API requests"""
+    """
+    Token bucket per connection, shared by all workers through Redis
 
-    def __init__(self, connection_name):
+    The bucket holds RATE_LIMIT_BURST_SECONDS worth of requests and refills
+    continuously at rate_limit_per_minute / 60 tokens per second. Refilling,
+    taking a token and the block set by a 429's Retry-After are evaluated
+    atomically in one Lua script against Redis server time, so workers on
+    any host draw from the same budget.
+    """
+
+    def __init__(self, connection_name, limit_per_minute=None):
         self.connection_name = connection_name
-        self.cache_key = f"rate_limit_{connection_name}"
+        self.cache_key = f"rate_limit::{connection_name}"
+        self.limit = cint(limit_per_minute) or 60
+        self.rate = self.limit / 60
+        self.capacity = max(self.limit * RATE_LIMIT_BURST_SECONDS / 60, 1)
+
+    def _eval(self, script, *args):
+        cache = frappe.cache()
+        return cache.eval(script, 1, cache.make_key(self.cache_key), *args)
+
+    def _take(self, tokens):
+        """(seconds until the tokens are available, tokens left, seconds still blocked)"""
+        result = self._eval(TOKEN_BUCKET_SCRIPT, self.capacity, self.rate, tokens, RATE_LIMIT_KEY_TTL)
+        return tuple(float(value) for value in result)
+
+    def try_acquire(self):
+        """Take a token if one is available; returns 0, or the seconds until one will be"""
+        return self._take(1)[0]
+
+    def acquire(self):
+        """Block until a token is taken; returns the seconds spent waiting"""
+        waited = 0
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    def record_limit_hit(self, retry_after=None):
+        """Hold every worker's requests until the ASP's Retry-After has passed"""
+        self._eval(TOKEN_BUCKET_BLOCK_SCRIPT, parse_retry_after(retry_after), RATE_LIMIT_KEY_TTL)
 
-    def get_current_count(self):
-        """Get current request count for the minute"""
-        return frappe.cache().get_value(self.cache_key) or 0
+    def is_limited(self):
+        """Check if we're currently held back by a 429"""
+        return self._take(0)[2] > 0
 
-    def record_request(self):
-        """Record a request"""
-        count = self.get_current_count()
-        frappe.cache().set_value(self.cache_key, count + 1, expires_in_sec=60)
+    def get_utilisation(self):
+        """Current state of the bucket, without taking a token"""
+        _wait, available, blocked_for = self._take(0)
+        return {
+            "limit_per_minute": self.limit,
+            "capacity": round(self.capacity, 2),
+            "available_tokens": round(available, 2),
+            "utilisation": round((1 - available / self.capacity) * 100, 1),
+            "blocked_for_seconds": round(blocked_for, 1)
+        }
 
-    def record_limit_hit(self):
-        """Record that we hit the rate limit"""
-        frappe.cache().set_value(f"{self.cache_key}_limited", True, expires_in_sec=60)
 
-    def is_limited(self):
-        """Check if we're currently rate limited"""
-        return frappe.cache().get_value(f"{self.cache_key}_limited")
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if value:
+        try:
+            return max(float(value), 0)
+        except ValueError:
+            pass
 
-    def wait_if_needed(self):
-        """Wait if we're approaching or at the rate limit"""
-        connection = frappe.get_doc("ASP Connection", self.connection_name)
-        limit = connection.rate_limit_per_minute or 60
+        try:
+            retry_at = parsedate_to_datetime(value)
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo=timezone.utc)
+            return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0)
+        except (TypeError, ValueError):
+            pass
 
-        count = self.get_current_count()
-        if count >= limit or self.is_limited():
-            # Wait for the rest of the minute
-            time.sleep(2)
+    return RATE_LIMIT_RETRY_AFTER
 
 
 # API Methods
@@ -264,6 +587,10 @@ def run_sync(connection_name, direction="Pull", trigger_type="Manual"):
     from digicomply.digicomply.doctype.sync_run.sync_run import (
         create_sync_run, complete_sync_run
     )
+    from digicomply.digicomply.doctype.transform_rule.transform_rule import clear_lookup_caches
+
+    # Each run starts with fresh Lookup transform results
+    clear_lookup_caches()
 
     # Create sync run
     sync_run = create_sync_run(
@@ -285,6 +612,7 @@ def run_sync(connection_name, direction="Pull", trigger_type="Manual"):
         if direction in ["Push", "Bidirectional"]:
             _run_push_sync(framework, sync_run)
 
+        sync_run.update_progress(force=True)
         complete_sync_run(sync_run.name, success=True)
 
         # Update connection stats
@@ -298,6 +626,7 @@ def run_sync(connection_name, direction="Pull", trigger_type="Manual"):
         }
 
     except Exception as e:
+        sync_run.update_progress(force=True)
         complete_sync_run(sync_run.name, success=False, error_details={"error": str(e)})
 
         connection = frappe.get_doc("ASP Connection", connection_name)
@@ -314,49 +643,46 @@ def run_sync(connection_name, direction="Pull", trigger_type="Manual"):
 
 def _run_pull_sync(framework, sync_run):
     """Execute pull sync operation"""
+    from digicomply.digicomply.doctype.transform_rule.transform_rule import apply_transforms_many
+
     connection = framework.connection
 
     if connection.sync_invoices:
-        page = 1
-        while True:
-            result = framework.fetch_invoices(page=page, sync_run=sync_run.name)
-
+        # The next pages are fetched while each one is processed
+        for result, invoices in framework.fetch_invoice_pages(sync_run=sync_run.name):
             if not result["success"]:
                 sync_run.add_error("Invoice", "fetch", result.get("error", "Unknown error"))
                 break
 
-            invoices = result.get("data", {})
-            if isinstance(invoices, dict):
-                invoices = invoices.get("data", []) or invoices.get("invoices", [])
-
-            if not invoices:
-                break
-
             sync_run.records_fetched = (sync_run.records_fetched or 0) + len(invoices)
 
-            for invoice in invoices:
+            # Inbound transforms run once per page
+            transform_errors = {}
+            transformed = invoices
+            if framework.connector:
+                transformed = apply_transforms_many(
+                    invoices,
+                    framework.connector.name,
+                    "Invoice",
+                    "Inbound",
+                    on_error=transform_errors.__setitem__
+                )
+
+            for idx, invoice in enumerate(invoices):
                 try:
-                    _process_fetched_invoice(invoice, connection, sync_run)
+                    if idx in transform_errors:
+                        raise transform_errors[idx]
+                    _process_fetched_invoice(transformed[idx], connection, sync_run)
                 except Exception as e:
                     sync_run.add_error("Invoice", invoice.get("id", "unknown"), str(e))
 
-            sync_run.save()
+            sync_run.update_progress()
             frappe.db.commit()
 
-            # Check if there are more pages
-            if not framework.connector or not framework.connector.supports_pagination:
-                break
-            if len(invoices) < (framework.connector.page_size_limit or 100):
-                break
-
-            page += 1
-
     if connection.sync_customers:
         result = framework.fetch_customers(sync_run=sync_run.name)
         if result["success"]:
-            customers = result.get("data", {})
-            if isinstance(customers, dict):
-                customers = customers.get("data", []) or customers.get("customers", [])
+            customers = get_fetched_records(result, "customers")
 
             for customer in customers:
                 try:
@@ -382,46 +708,66 @@ def _run_push_sync(framework, sync_run):
             limit=100
         )
 
-        for inv in invoices:
-            try:
-                invoice_doc = frappe.get_doc("Sales Invoice", inv.name)
-                invoice_data = _prepare_invoice_for_push(invoice_doc)
+        processed = 0
+        for start in range(0, len(invoices), PUSH_BATCH_SIZE):
+            batch = invoices[start:start + PUSH_BATCH_SIZE]
 
-                result = framework.push_invoice(invoice_data, sync_run=sync_run.name)
+            payloads = []
+            for inv in batch:
+                try:
+                    invoice_doc = frappe.get_doc("Sales Invoice", inv.name)
+                    payloads.append((inv.name, _prepare_invoice_for_push(invoice_doc)))
+                except Exception as e:
+                    sync_run.add_error("Invoice", inv.name, str(e))
 
+            try:
+                results = framework.push_invoices(payloads, sync_run=sync_run.name)
+            except Exception as e:
+                # A failure outside the per-invoice handling fails this batch only
+                frappe.log_error(f"Push batch failed for {connection.name}: {str(e)}")
+                results = {name: {"success": False, "error": str(e)} for name, _data in payloads}
+
+            # One bulk update of sync statuses per batch
+            updates = {}
+            for name, _data in payloads:
+                result = results[name]
                 if result["success"]:
                     sync_run.records_pushed = (sync_run.records_pushed or 0) + 1
-                    _update_invoice_sync_status(inv.name, "Synced", result.get("data"))
+                    updates[name] = _get_invoice_sync_values("Synced", result.get("data"))
                 else:
-                    sync_run.add_error("Invoice", inv.name, result.get("error"))
-                    _update_invoice_sync_status(inv.name, "Error", result.get("error"))
+                    sync_run.add_error("Invoice", name, result.get("error"))
+                    updates[name] = _get_invoice_sync_values("Error", result.get("error"))
 
-            except Exception as e:
-                sync_run.add_error("Invoice", inv.name, str(e))
+            if updates:
+                frappe.db.bulk_update("Sales Invoice", updates)
 
-        sync_run.save()
+            processed += len(batch)
+            sync_run.update_progress(processed, len(invoices))
+            frappe.db.commit()
+
+        sync_run.update_progress(force=True)
         frappe.db.commit()
 
 
-def _process_fetched_invoice(invoice_data, connection, sync_run):
-    """Process a fetched invoice"""
-    from digicomply.digicomply.doctype.transform_rule.transform_rule import apply_transforms
+def get_fetched_records(result, key):
+    """Records of a fetch result: the body itself, or its "data" or <key> list"""
+    records = result.get("data", {})
+    if isinstance(records, dict):
+        records = records.get("data", []) or records.get(key, [])
+    return records
+
+
+def get_next_cursor(data, field):
+    """Value at a dotted path such as "meta.next_cursor" in a response body"""
+    for part in field.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(part)
+    return data
 
-    # Apply inbound transforms
-    if hasattr(connection, 'asp_provider'):
-        connector = frappe.get_all(
-            "ASP Connector",
-            filters={"asp_provider": connection.asp_provider, "enabled": 1},
-            limit=1
-        )
-        if connector:
-            invoice_data = apply_transforms(
-                invoice_data,
-                connector[0].name,
-                "Invoice",
-                "Inbound"
-            )
 
+def _process_fetched_invoice(invoice_data, connection, sync_run):
+    """Process a fetched invoice (inbound transforms already applied)"""
     # Check if invoice already exists
     existing = frappe.db.exists(
         "Sales Invoice",
@@ -473,17 +819,13 @@ def _prepare_invoice_for_push(invoice_doc):
     }
 
 
-def _update_invoice_sync_status(invoice_name, status, response_data=None):
-    """Update invoice sync status"""
-    frappe.db.set_value(
-        "Sales Invoice",
-        invoice_name,
-        {
-            "custom_asp_sync_status": status,
-            "custom_asp_sync_time": now_datetime(),
-            "custom_asp_response": json.dumps(response_data) if response_data else None
-        }
-    )
+def _get_invoice_sync_values(status, response_data=None):
+    """Sales Invoice sync status fields after a push"""
+    return {
+        "custom_asp_sync_status": status,
+        "custom_asp_sync_time": now_datetime(),
+        "custom_asp_response": json.dumps(response_data) if response_data else None
+    }
 
 
 @frappe.whitelist()
@@ -526,6 +868,8 @@ def get_connection_status(connection_name):
     from digicomply.digicomply.doctype.sync_run.sync_run import get_sync_stats
     stats = get_sync_stats(connection_name, days=7)
 
+    from digicomply.http_pool import get_pool_stats
+
     return {
         "connection": {
             "name": connection.name,
@@ -538,7 +882,9 @@ def get_connection_status(connection_name):
             "failed_syncs": connection.failed_syncs
         },
         "recent_runs": recent_runs,
-        "stats": stats
+        "stats": stats,
+        "http_pool": get_pool_stats(f"asp::{connection_name}"),
+        "rate_limit": RateLimiter(connection_name, connection.rate_limit_per_minute).get_utilisation()
     }
 
 
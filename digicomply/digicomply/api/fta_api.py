@@ -12,7 +12,7 @@ Features:
 - Blacklist checking before API calls
 - FTA API integration (mocked until real API is available)
 - Validation logging for audit trail
-- Bulk validation support
+- Bulk validation support (concurrent FTA calls, batched queries and writes)
 """
 
 import frappe
@@ -22,8 +22,17 @@ import json
 import re
 import time
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+
+from digicomply.http_pool import get_fingerprint, get_retry, get_session, record_latency, send
+
+
+# Bulk validation: concurrent FTA calls (digicomply_fta_max_concurrency in
+# site_config), TRNs per blacklist query, and the most TRNs a web request
+# may validate at once (background jobs have no limit)
+DEFAULT_FTA_CONCURRENCY = 8
+BLACKLIST_QUERY_BATCH_SIZE = 1000
+MAX_BULK_TRNS_PER_REQUEST = 100
 
 
 def get_fta_settings():
@@ -341,29 +350,37 @@ def call_fta_api(trn, settings):
     Returns:
         dict: API response with validation result
     """
-    # Create session with retry strategy
-    session = requests.Session()
-
-    # Retry strategy with exponential backoff
-    retry_strategy = Retry(
-        total=3,
-        backoff_factor=1,  # 1s, 2s, 4s delays
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["HEAD", "GET", "POST", "OPTIONS"]
-    )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("https://", adapter)
-    session.mount("http://", adapter)
+    request = get_fta_request(settings)
+
+    # Log the API request for audit trail
+    _log_api_request(trn, request.endpoint, {"trn": trn})
+
+    response, error = send_fta_request(request, trn)
+    return read_fta_response(trn, response, error)
 
+
+def get_fta_request(settings):
+    """Pooled session, endpoint, headers and timeout for FTA validation calls"""
     # Get endpoint from settings or use production default
     base_url = settings.get("api_url") or "https://tax.gov.ae/api/v1"
     # Ensure base_url doesn't have trailing slash
     base_url = base_url.rstrip("/")
-    endpoint = f"{base_url}/trn/validate"
+
+    # Pooled keep-alive session per FTA endpoint, with exponential backoff retries
+    pool_key = f"fta::{base_url}"
+    session = get_session(
+        pool_key,
+        get_fingerprint(base_url, settings.get("api_key")),
+        retry=get_retry(
+            max_retries=3,
+            backoff_factor=1,  # 1s, 2s, 4s delays
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["HEAD", "GET", "POST", "OPTIONS"]
+        )
+    )
 
     # Get timeout from settings (default: 30s connect, 60s read)
     timeout_seconds = cint(settings.get("timeout")) or 30
-    timeout = (timeout_seconds, timeout_seconds * 2)  # (connect, read)
 
     headers = {
         "Content-Type": "application/json",
@@ -376,19 +393,47 @@ def call_fta_api(trn, settings):
     if api_key:
         headers["Authorization"] = f"Bearer {api_key}"
 
-    request_payload = {"trn": trn}
+    return frappe._dict(
+        pool_key=pool_key,
+        session=session,
+        endpoint=f"{base_url}/trn/validate",
+        headers=headers,
+        timeout=(timeout_seconds, timeout_seconds * 2)  # (connect, read)
+    )
 
-    # Log the API request for audit trail
-    _log_api_request(trn, endpoint, request_payload)
 
+def send_fta_request(request, trn, latency=None):
+    """
+    POST one TRN to the FTA endpoint
+
+    Makes no frappe calls, so it can run in a worker thread (with a
+    latency list, see http_pool.send).
+
+    Returns:
+        tuple: (response or None, exception or None)
+    """
     try:
-        response = session.post(
-            endpoint,
-            json=request_payload,
-            headers=headers,
-            timeout=timeout,
+        response = send(
+            request.pool_key,
+            request.session,
+            "POST",
+            request.endpoint,
+            latency=latency,
+            json={"trn": trn},
+            headers=request.headers,
+            timeout=request.timeout,
             verify=True  # SSL verification enabled
         )
+        return response, None
+    except Exception as e:
+        return None, e
+
+
+def read_fta_response(trn, response, error=None):
+    """Turn the outcome of send_fta_request into a validation result"""
+    try:
+        if error:
+            raise error
 
         # Log raw response
         _log_api_response(trn, response.status_code, response.text)
@@ -433,7 +478,7 @@ def call_fta_api(trn, settings):
         }
 
     except requests.exceptions.HTTPError as e:
-        status_code = e.response.status_code if e.response else None
+        status_code = e.response.status_code if e.response is not None else None
         frappe.log_error(
             title="FTA API HTTP Error",
             message=f"HTTP error {status_code} calling FTA API for TRN {trn}: {str(e)}"
@@ -507,9 +552,6 @@ def call_fta_api(trn, settings):
             }
         }
 
-    finally:
-        session.close()
-
 
 def _log_api_request(trn, endpoint, payload):
     """Log API request for audit trail"""
@@ -632,34 +674,7 @@ def log_validation(trn, result, company, trn_registry, validation_type):
     try:
         from digicomply.digicomply.doctype.trn_validation_log.trn_validation_log import create_validation_log
 
-        # Map status
-        status_map = {
-            "Valid": "Valid",
-            "Invalid": "Invalid",
-            "Expired": "Expired",
-            "API Error": "API Error",
-            "Not Found": "Not Found"
-        }
-        validation_status = status_map.get(result.get("status"), "Pending Verification")
-
-        # Extract data
-        data = result.get("data", {})
-
-        create_validation_log(
-            trn=trn,
-            validation_status=validation_status,
-            validation_type=validation_type,
-            validation_source="Manual",
-            trn_registry=trn_registry,
-            company=company,
-            response_code=data.get("response_code"),
-            response_message=result.get("message"),
-            fta_entity_name=data.get("entity_name"),
-            fta_registration_date=data.get("registration_date"),
-            fta_expiry_date=data.get("expiry_date"),
-            fta_status=data.get("fta_status"),
-            raw_response=data
-        )
+        create_validation_log(**get_validation_log_values(trn, result, company, trn_registry, validation_type))
 
     except Exception as e:
         # Log error but don't fail the validation
@@ -669,6 +684,38 @@ def log_validation(trn, result, company, trn_registry, validation_type):
         )
 
 
+def get_validation_log_values(trn, result, company, trn_registry, validation_type):
+    """create_validation_log arguments for a validation result"""
+    # Map status
+    status_map = {
+        "Valid": "Valid",
+        "Invalid": "Invalid",
+        "Expired": "Expired",
+        "API Error": "API Error",
+        "Not Found": "Not Found"
+    }
+    validation_status = status_map.get(result.get("status"), "Pending Verification")
+
+    # Extract data
+    data = result.get("data", {})
+
+    return {
+        "trn": trn,
+        "validation_status": validation_status,
+        "validation_type": validation_type,
+        "validation_source": "Manual",
+        "trn_registry": trn_registry,
+        "company": company,
+        "response_code": data.get("response_code"),
+        "response_message": result.get("message"),
+        "fta_entity_name": data.get("entity_name"),
+        "fta_registration_date": data.get("registration_date"),
+        "fta_expiry_date": data.get("expiry_date"),
+        "fta_status": data.get("fta_status"),
+        "raw_response": data
+    }
+
+
 def update_trn_registry(trn_registry, status, data=None):
     """
     Update TRN Registry document with validation result
@@ -740,9 +787,10 @@ def bulk_validate_trns(trns, company=None):
         if not isinstance(trn, str) or not trn.strip():
             frappe.throw(_("TRN at position {0} must be a non-empty string").format(i+1))
 
-    # Limit bulk validation to prevent abuse
-    max_bulk = 100
-    if len(trns) > max_bulk:
+    # Limit interactive bulk validation to prevent abuse; background jobs
+    # (e.g. trn_health_center.bulk_validate_all) validate any number
+    max_bulk = MAX_BULK_TRNS_PER_REQUEST
+    if getattr(frappe.local, "request", None) and len(trns) > max_bulk:
         frappe.throw(_("Maximum {0} TRNs can be validated at once").format(max_bulk))
 
     results = {}
@@ -754,32 +802,206 @@ def bulk_validate_trns(trns, company=None):
         "errors": 0
     }
 
+    try:
+        validated = validate_trns_in_bulk(trns, company=company)
+    except Exception as e:
+        frappe.log_error(title="Bulk TRN Validation Error", message=str(e))
+        validated = {
+            trn: {"valid": False, "status": "Error", "message": str(e), "data": {}}
+            for trn in trns
+        }
+
     for trn in trns:
-        if not trn:
-            continue
+        result = validated[trn]
+        results[trn] = result
 
-        try:
-            result = validate_trn_with_fta(trn, company=company)
-            results[trn] = result
-
-            # Update summary
-            if result.get("valid"):
-                summary["valid"] += 1
-            elif result.get("data", {}).get("blacklisted"):
-                summary["blacklisted"] += 1
-            else:
-                summary["invalid"] += 1
-
-        except Exception as e:
-            results[trn] = {
-                "valid": False,
-                "status": "Error",
-                "message": str(e),
-                "data": {}
-            }
+        # Update summary
+        if result.get("status") == "Error":
             summary["errors"] += 1
+        elif result.get("valid"):
+            summary["valid"] += 1
+        elif result.get("data", {}).get("blacklisted"):
+            summary["blacklisted"] += 1
+        else:
+            summary["invalid"] += 1
 
     return {
         "results": results,
         "summary": summary
     }
+
+
+def validate_trns_in_bulk(trns, company=None, max_workers=None):
+    """
+    Validate many TRNs with the same checks as validate_trn_with_fta
+
+    Each distinct TRN (after cleaning) is validated once:
+    1. Blacklisted TRNs are found with one query per BLACKLIST_QUERY_BATCH_SIZE
+    2. Format failures are decided locally
+    3. The rest go to the FTA API on up to max_workers concurrent
+       connections (default digicomply_fta_max_concurrency or
+       DEFAULT_FTA_CONCURRENCY), unless FTA validation is disabled
+    4. One validation log per TRN is written with multi-row INSERTs
+
+    No permission checks are made; callers check TRN Registry access.
+
+    Args:
+        trns: list of TRN strings
+        company: Optional company for the validation logs
+
+    Returns:
+        dict: TRN (as given) -> validation result
+    """
+    from digicomply.digicomply.doctype.trn_validation_log.trn_validation_log import insert_validation_logs
+
+    clean_trns = {trn: re.sub(r'[^0-9]', '', str(trn)) for trn in trns if trn}
+    distinct = list(dict.fromkeys(clean_trns.values()))
+
+    validated = {}
+    logs = []
+    pending = []
+
+    # Step 1: Check blacklist first
+    blacklisted = get_blacklist_entries(distinct)
+    fta_settings = get_fta_settings()
+
+    for clean_trn in distinct:
+        entry = blacklisted.get(clean_trn)
+        if entry:
+            message = _("TRN is blacklisted: {0}").format(entry.reason or "Unknown")
+            validated[clean_trn] = {
+                "valid": False,
+                "status": "Invalid",
+                "message": message,
+                "data": {
+                    "blacklisted": True,
+                    "reason": entry.reason,
+                    "entity_name": entry.entity_name
+                }
+            }
+            logs.append(get_validation_log_values(
+                clean_trn, {"valid": False, "status": "Invalid", "message": message},
+                company, None, "Blacklist Check"
+            ))
+            continue
+
+        # Step 2: Validate format
+        format_result = validate_trn_format(clean_trn)
+        if not format_result["valid"]:
+            validated[clean_trn] = {
+                "valid": False,
+                "status": "Invalid",
+                "message": format_result.get("message", _("TRN format is invalid")),
+                "data": {
+                    "errors": format_result.get("errors", [])
+                }
+            }
+            logs.append(get_validation_log_values(clean_trn, format_result, company, None, "Format Check"))
+            continue
+
+        # Step 3: Format-only validation when the FTA API is not enabled
+        if not fta_settings["enabled"]:
+            validated[clean_trn] = {
+                "valid": True,
+                "status": "Valid",
+                "message": _("TRN format is valid. FTA API validation is not enabled."),
+                "data": {
+                    "format_valid": True,
+                    "fta_validated": False
+                }
+            }
+            logs.append(get_validation_log_values(
+                clean_trn,
+                {"valid": True, "status": "Valid", "message": _("TRN format is valid (FTA API not enabled)")},
+                company, None, "Format Check"
+            ))
+            continue
+
+        pending.append(clean_trn)
+
+    # Step 4: Call FTA API concurrently
+    if pending:
+        for clean_trn, fta_result in call_fta_api_many(pending, fta_settings, max_workers).items():
+            validated[clean_trn] = fta_result
+            logs.append(get_validation_log_values(clean_trn, fta_result, company, None, "FTA API"))
+
+    try:
+        insert_validation_logs(logs)
+    except Exception as e:
+        # Log error but don't fail the validation
+        frappe.log_error(
+            title="Validation Log Error",
+            message=f"Error creating {len(logs)} validation logs: {str(e)}"
+        )
+
+    return {trn: validated[clean_trn] for trn, clean_trn in clean_trns.items()}
+
+
+def call_fta_api_many(trns, settings, max_workers=None):
+    """
+    call_fta_api for many TRNs on a bounded number of threads
+
+    Only the HTTP round trips run in worker threads; responses are read,
+    logged and mapped in the calling thread.
+
+    Returns:
+        dict: TRN -> validation result
+    """
+    max_workers = max_workers or cint(frappe.conf.get("digicomply_fta_max_concurrency")) or DEFAULT_FTA_CONCURRENCY
+    request = get_fta_request(settings)
+    latency = []
+    results = {}
+
+    for trn in trns:
+        _log_api_request(trn, request.endpoint, {"trn": trn})
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(trns))) as executor:
+        futures = [(trn, executor.submit(send_fta_request, request, trn, latency)) for trn in trns]
+
+        for trn, future in futures:
+            response, error = future.result()
+            try:
+                results[trn] = read_fta_response(trn, response, error)
+            except Exception as e:
+                error_message = str(e)
+                frappe.log_error(
+                    title="FTA API Error",
+                    message=f"Error calling FTA API for TRN {trn}: {error_message}"
+                )
+                results[trn] = {
+                    "valid": False,
+                    "status": "API Error",
+                    "message": _("Unable to validate with FTA API. Please try again later."),
+                    "data": {
+                        "error_type": "unexpected",
+                        "error": error_message
+                    }
+                }
+
+    for measurement in latency:
+        record_latency(*measurement)
+
+    return results
+
+
+def get_blacklist_entries(trns):
+    """Active TRN Blacklist entries for cleaned TRNs, as {trn: entry}"""
+    entries = {}
+
+    try:
+        for start in range(0, len(trns), BLACKLIST_QUERY_BATCH_SIZE):
+            for entry in frappe.get_all(
+                "TRN Blacklist",
+                filters={"trn": ("in", trns[start:start + BLACKLIST_QUERY_BATCH_SIZE]), "is_active": 1},
+                fields=["trn", "reason", "entity_name"],
+                limit_page_length=0
+            ):
+                entries[entry.trn] = entry
+    except Exception as e:
+        frappe.log_error(
+            title="Blacklist Check Error",
+            message=f"Error checking blacklist for {len(trns)} TRNs: {str(e)}"
+        )
+        # On error, assume not blacklisted to not block operations
+
+    return entries
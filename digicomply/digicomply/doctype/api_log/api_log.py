@@ -3,67 +3,132 @@
 
 import frappe
 from frappe.model.document import Document
-from frappe.utils import now_datetime
+from frappe.utils import cint, flt, now_datetime
 import json
+import random
+import threading
 import uuid
 
 
+# Buffered logging: calls per background insert, and the defaults of the
+# site_config keys digicomply_api_log_sample_rate / digicomply_api_log_max_body_kb
+API_LOG_BATCH_SIZE = 100
+API_LOG_SAMPLE_RATE = 100
+API_LOG_MAX_BODY_KB = 50
+
+_buffers = {}
+_buffer_lock = threading.Lock()
+
+
 class APILog(Document):
     pass
 
 
-def create_api_log(connection, endpoint, method, request_headers=None,
-                   request_body=None, sync_run=None):
-    """Create a new API log entry for a request"""
-    # Sanitize headers (remove sensitive data)
-    safe_headers = sanitize_headers(request_headers) if request_headers else None
+def log_api_call(connection, endpoint, method, request_timestamp, request_headers=None,
+                 request_body=None, sync_run=None, status_code=0, response_status=None,
+                 response_headers=None, response_body=None, response_time_ms=None,
+                 error_type=None, error_message=None, stack_trace=None):
+    """
+    Buffer a finished API call for logging
+
+    This does no database work: the record is kept in memory and written
+    by insert_api_logs in a background job, API_LOG_BATCH_SIZE at a time
+    and after every request or job (flush_api_logs). Successful calls are
+    sampled at digicomply_api_log_sample_rate percent; failed calls are
+    always kept.
+    """
+    sample_rate = flt(frappe.conf.get("digicomply_api_log_sample_rate", API_LOG_SAMPLE_RATE))
+    if response_status == "Success" and sample_rate < 100 and random.random() * 100 >= sample_rate:
+        return
 
-    log = frappe.get_doc({
-        "doctype": "API Log",
+    max_body = cint(frappe.conf.get("digicomply_api_log_max_body_kb", API_LOG_MAX_BODY_KB)) * 1024
+
+    record = {
         "asp_connection": connection,
         "endpoint": endpoint,
         "method": method,
-        "request_timestamp": now_datetime(),
+        "request_timestamp": request_timestamp,
         "request_id": str(uuid.uuid4()),
         "sync_run": sync_run,
-        "request_headers": json.dumps(safe_headers, indent=2) if safe_headers else None,
-        "request_body": json.dumps(request_body, indent=2) if request_body else None
-    })
-    log.insert(ignore_permissions=True)
-    frappe.db.commit()
-
-    return log.name
-
-
-def update_api_log(log_name, status_code, response_status, response_headers=None,
-                   response_body=None, response_time_ms=None, error_type=None,
-                   error_message=None, stack_trace=None):
-    """Update API log with response data"""
-    log = frappe.get_doc("API Log", log_name)
-
-    log.status_code = status_code
-    log.response_status = response_status
-    log.response_timestamp = now_datetime()
-    log.response_time_ms = response_time_ms
-
-    if response_headers:
-        log.response_headers = json.dumps(dict(response_headers), indent=2)
-
-    if response_body:
-        # Truncate large responses
-        body_str = json.dumps(response_body, indent=2) if isinstance(response_body, dict) else str(response_body)
-        if len(body_str) > 50000:
-            body_str = body_str[:50000] + "\n... [truncated]"
-        log.response_body = body_str
-
-    if error_type:
-        log.error_type = error_type
-    if error_message:
-        log.error_message = error_message[:1000] if error_message else None
-    if stack_trace:
-        log.stack_trace = stack_trace[:5000] if stack_trace else None
+        "request_headers": dump_log_value(sanitize_headers(request_headers)) if request_headers else None,
+        "request_body": truncate_body(request_body, max_body),
+        "status_code": status_code,
+        "response_status": response_status,
+        "response_timestamp": now_datetime(),
+        "response_time_ms": response_time_ms,
+        "response_headers": dump_log_value(dict(response_headers)) if response_headers else None,
+        "response_body": truncate_body(response_body, max_body),
+        "error_type": error_type,
+        "error_message": error_message[:1000] if error_message else None,
+        "stack_trace": stack_trace[:5000] if stack_trace else None,
+    }
+
+    with _buffer_lock:
+        buffer = _buffers.setdefault(frappe.local.site, [])
+        buffer.append(record)
+        full = len(buffer) >= API_LOG_BATCH_SIZE
+
+    if full:
+        flush_api_logs()
+
+
+def dump_log_value(value):
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+def truncate_body(body, max_size):
+    if not body or not max_size:
+        return None
 
-    log.save(ignore_permissions=True)
+    body_str = dump_log_value(body) if isinstance(body, (dict, list)) else str(body)
+    if len(body_str) > max_size:
+        body_str = body_str[:max_size] + "\n... [truncated]"
+    return body_str
+
+
+def flush_api_logs(*args, **kwargs):
+    """
+    Hand this site's buffered API calls to a background insert
+
+    Registered as an after_request and after_job hook, so nothing stays
+    buffered past the request or job that made the calls.
+    """
+    site = getattr(frappe.local, "site", None)
+    if not site:
+        return
+
+    with _buffer_lock:
+        records = _buffers.pop(site, None)
+
+    if records:
+        frappe.enqueue(
+            "digicomply.digicomply.doctype.api_log.api_log.insert_api_logs",
+            queue="short",
+            records=records,
+            enqueue_after_commit=False,
+            now=frappe.conf.developer_mode
+        )
+
+
+def insert_api_logs(records):
+    """Write buffered API calls with multi-row INSERTs (background job)"""
+    from digicomply.utils import bulk_insert_rows, reserve_names
+
+    # Same names the API-{YYYY}{MM}{DD}-{####} autoname would give, reserved per day
+    by_prefix = {}
+    for record in records:
+        by_prefix.setdefault(f"API-{record['request_timestamp']:%Y%m%d}-", []).append(record)
+
+    for prefix, day_records in by_prefix.items():
+        names = reserve_names(prefix, len(day_records))
+        for name, record in zip(names, day_records):
+            record.update({
+                "name": name,
+                "creation": record["request_timestamp"],
+                "modified": record["response_timestamp"],
+            })
+
+    bulk_insert_rows("API Log", list(records[0]), records)
     frappe.db.commit()
 
 
@@ -0,0 +1,18 @@
+# Copyright (c) 2024, DigiComply and contributors
+# License: MIT
+
+from frappe.model.document import Document
+
+
+class BulkImportCheckpoint(Document):
+    """
+    Bulk Import Checkpoint - One committed chunk of a Bulk Import Log
+
+    The name is the chunk's idempotency key (import log + first and last
+    row number). It is inserted in the same transaction as the chunk's
+    records, so a chunk is either fully imported and checkpointed or not
+    at all; a second insert of the same key means the chunk was already
+    done and is skipped. Counts and issues of all checkpoints make up the
+    import's final result, also across resumes.
+    """
+    pass
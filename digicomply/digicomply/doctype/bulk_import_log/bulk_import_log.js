@@ -555,6 +555,27 @@ frappe.ui.form.on('Bulk Import Log', {
             $container.append($cancelBtn);
         }
 
+        // Resume button (for interrupted imports with committed rows; not while a worker still runs it)
+        const has_live_job = frm.doc.__onload && frm.doc.__onload.has_live_job;
+        if (['Processing', 'Failed', 'Cancelled'].includes(status) && frm.doc.processed_rows > 0 && !has_live_job) {
+            hasButtons = true;
+            let $resumeBtn = $(`
+                <button class="dc-btn dc-btn-secondary">
+                    <svg width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
+                        <polyline points="23 4 23 10 17 10"/>
+                        <path d="M20.49 15a9 9 0 1 1-2.12-9.36L23 10"/>
+                    </svg>
+                    Resume Import
+                </button>
+            `);
+
+            $resumeBtn.on('click', function() {
+                frm.trigger('do_resume_import');
+            });
+
+            $container.append($resumeBtn);
+        }
+
         // Download Error Report button (for Completed with Errors)
         if (status === 'Completed with Errors' && frm.doc.error_log) {
             hasButtons = true;
@@ -617,6 +638,31 @@ frappe.ui.form.on('Bulk Import Log', {
         });
     },
 
+    do_resume_import: function(frm) {
+        frappe.confirm(
+            __('Continue this import from its last checkpoint? Rows already imported are skipped.'),
+            function() {
+                frappe.call({
+                    method: 'digicomply.digicomply.doctype.bulk_import_log.bulk_import_log.resume_import',
+                    args: {
+                        import_log: frm.doc.name
+                    },
+                    freeze: true,
+                    freeze_message: __('Resuming import...'),
+                    callback: function(r) {
+                        if (r.message && r.message.status === 'started') {
+                            frappe.show_alert({
+                                message: r.message.message,
+                                indicator: 'blue'
+                            }, 5);
+                            frm.reload_doc();
+                        }
+                    }
+                });
+            }
+        );
+    },
+
     do_cancel_import: function(frm) {
         frappe.confirm(
             __('Are you sure you want to cancel this import?'),
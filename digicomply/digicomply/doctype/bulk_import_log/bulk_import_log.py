@@ -11,6 +11,33 @@ from frappe.model.document import Document
 from frappe.utils import cstr, flt, now_datetime, cint
 
 
+# Rows per chunk: one prefetch, one progress update and one commit each
+IMPORT_BATCH_SIZE = 500
+
+IMPORT_ROW_SAVEPOINT = "bulk_import_row"
+
+IMPORT_JOB_TIMEOUT = 3600
+
+# Rows validated between progress updates and cancellation checks in a dry run
+VALIDATION_BATCH_SIZE = 10000
+
+# Running totals kept in Redis while shards run in parallel
+SHARD_COUNTERS = ("processed", "success", "errors", "warnings")
+
+# Records prefetched per chunk: (row column, doctype, fieldname) per import type
+IMPORT_LOOKUPS = {
+    "Customer": [("customer_name", "Customer", "customer_name")],
+    "Supplier": [("supplier_name", "Supplier", "supplier_name")],
+    "Item": [("item_code", "Item", "name")],
+    "TRN Registry": [("trn", "TRN Registry", "trn")],
+    "Company": [("company_name", "Company", "name")],
+    "Invoice": [
+        ("invoice_no", "Sales Invoice", "name"),
+        ("customer", "Customer", "name"),
+    ],
+}
+
+
 class BulkImportLog(Document):
     """
     Bulk Import Log - Handle bulk data imports with progress tracking
@@ -30,6 +57,10 @@ class BulkImportLog(Document):
         if self.file and not self.file_name:
             self.extract_file_name()
 
+    def onload(self):
+        """Tell the form whether a worker is still on this import (no Resume then)"""
+        self.set_onload("has_live_job", self.has_live_job())
+
     def extract_file_name(self):
         """Extract filename from file URL"""
         if self.file:
@@ -41,16 +72,23 @@ class BulkImportLog(Document):
         """Start the import process - enqueues background job"""
         if self.status not in ["Pending", "Failed", "Cancelled"]:
             frappe.throw(_("Import can only be started from Pending, Failed, or Cancelled status"))
+        if self.has_live_job():
+            frappe.throw(_("This import is still being processed. Wait for it to stop before starting it again."))
 
         # Update status to Validating
-        self.db_set("status", "Validating")
-        self.db_set("started_at", now_datetime())
-        self.db_set("error_log", None)
-        self.db_set("processed_rows", 0)
-        self.db_set("success_count", 0)
-        self.db_set("error_count", 0)
-        self.db_set("warning_count", 0)
-        self.db_set("progress_percent", 0)
+        self.db_set({
+            "status": "Validating",
+            "started_at": now_datetime(),
+            "error_log": None,
+            "processed_rows": 0,
+            "success_count": 0,
+            "error_count": 0,
+            "warning_count": 0,
+            "progress_percent": 0,
+        })
+
+        # A fresh start forgets the checkpoints of earlier attempts
+        frappe.db.delete("Bulk Import Checkpoint", {"import_log": self.name})
         frappe.db.commit()
 
         # Publish realtime event
@@ -61,31 +99,204 @@ class BulkImportLog(Document):
         )
 
         # Enqueue background job
+        self.enqueue_import()
+
+        return {"status": "started", "message": _("Import started. You will be notified when complete.")}
+
+    @frappe.whitelist()
+    def resume_import(self):
+        """
+        Continue an interrupted import from its checkpoints
+
+        Rows of checkpointed chunks are skipped and their counts and issues
+        carried over, so nothing is imported twice.
+        """
+        if self.status not in ["Processing", "Failed", "Cancelled"]:
+            frappe.throw(_("Only interrupted, failed or cancelled imports can be resumed"))
+        if self.has_live_job():
+            frappe.throw(_("This import is still being processed and cannot be resumed"))
+
+        checkpoint_modes = set(frappe.get_all(
+            "Bulk Import Checkpoint", filters={"import_log": self.name}, pluck="dry_run", distinct=True
+        ))
+        if not checkpoint_modes:
+            frappe.throw(_("No checkpoint found for this import. Start the import instead."))
+        if checkpoint_modes != {cint(self.dry_run)}:
+            frappe.throw(_("Dry Run was changed since the import was started. Start the import again."))
+
+        self.db_set({"status": "Validating", "completed_at": None, "error_log": None})
+        frappe.db.commit()
+
+        frappe.publish_realtime(
+            "bulk_import_progress",
+            {"import_log": self.name, "status": "Validating", "progress": flt(self.progress_percent)},
+            user=frappe.session.user
+        )
+
+        self.enqueue_import()
+
+        return {"status": "started", "message": _("Import resumed from the last checkpoint.")}
+
+    def enqueue_import(self):
+        """Queue process_import; at most one such job per import at a time"""
         frappe.enqueue(
             "digicomply.digicomply.doctype.bulk_import_log.bulk_import_log.process_import",
             import_log=self.name,
             queue="long",
-            timeout=3600,
+            timeout=IMPORT_JOB_TIMEOUT,
+            job_id=self.get_job_id(),
+            deduplicate=True,
             now=frappe.conf.developer_mode  # Run immediately in dev mode
         )
 
-        return {"status": "started", "message": _("Import started. You will be notified when complete.")}
+    def get_job_id(self):
+        """Background job id - one process_import job per import at a time"""
+        return f"bulk_import_log::{self.name}"
+
+    def get_shard_key(self, *parts):
+        """Cache key for parallel import bookkeeping"""
+        return "::".join([self.get_job_id(), "shards", *[cstr(p) for p in parts]])
 
-    def update_progress(self, processed, success, errors, warnings):
-        """Update import progress counters and publish realtime event"""
+    def has_live_job(self):
+        """True if the main job or a shard job of the current shard run is queued or running"""
+        from frappe.utils.background_jobs import is_job_enqueued
+
+        job_ids = [self.get_job_id()]
+        job_ids += frappe.cache().get_value(self.get_shard_key("jobs")) or []
+
+        return any(is_job_enqueued(job_id) for job_id in job_ids)
+
+    def get_shards(self, total_rows):
+        """Split data rows into (start, end) ranges of rows_per_shard; one range unless run_in_parallel"""
+        rows_per_shard = cint(self.rows_per_shard)
+        if not self.run_in_parallel or rows_per_shard <= 0 or total_rows <= rows_per_shard:
+            return [(0, total_rows)]
+
+        return [(start, min(start + rows_per_shard, total_rows)) for start in range(0, total_rows, rows_per_shard)]
+
+    def enqueue_shards(self, shards, encoding, delimiter, tally=None, offsets=None):
+        """
+        Queue one job per row range on the long queue
+
+        offsets maps a range's first data row to the byte offset it starts at
+        (see scan_data_rows), so each shard seeks straight to its rows and
+        stops at the offset of the next range.
+
+        Shards add their counts to Redis counters after every chunk and
+        publish the running totals, so progress stays live across workers.
+        The counters start from tally (the checkpointed counts when
+        resuming). The shard that completes the set finalises the log (see
+        finish_shard). shard_run_id keeps counters of an interrupted earlier
+        attempt from leaking into this one.
+        """
+        shard_run_id = frappe.generate_hash(length=10)
+        frappe.cache().set_value(self.get_shard_key("run"), shard_run_id, expires_in_sec=IMPORT_JOB_TIMEOUT)
+        frappe.cache().set_value(
+            self.get_shard_key("jobs"),
+            [self.get_shard_key(shard_run_id, index) for index in range(len(shards))],
+            expires_in_sec=IMPORT_JOB_TIMEOUT
+        )
+
+        if tally:
+            self.add_shard_counts(shard_run_id, tally)
+
+        for index, (start_row, end_row) in enumerate(shards):
+            frappe.enqueue(
+                "digicomply.digicomply.doctype.bulk_import_log.bulk_import_log.process_import_shard",
+                import_log=self.name,
+                shard_run_id=shard_run_id,
+                shard_index=index,
+                shard_count=len(shards),
+                start_row=start_row,
+                end_row=end_row,
+                offset=(offsets or {}).get(start_row),
+                end_offset=(offsets or {}).get(end_row),
+                encoding=encoding,
+                delimiter=delimiter,
+                queue="long",
+                timeout=IMPORT_JOB_TIMEOUT,
+                job_id=self.get_shard_key(shard_run_id, index),
+                deduplicate=True,
+                enqueue_after_commit=True,
+                now=frappe.conf.developer_mode
+            )
+
+    def add_shard_counts(self, shard_run_id, counts):
+        """Atomically add one chunk's counts to the shared counters; returns the new totals"""
+        cache = frappe.cache()
+        totals = {}
+
+        for counter in SHARD_COUNTERS:
+            key = cache.make_key(self.get_shard_key(shard_run_id, counter))
+            totals[counter] = cache.incrby(key, counts[counter])
+            cache.expire(key, IMPORT_JOB_TIMEOUT)
+
+        return totals
+
+    def finish_shard(self, shard_run_id, shard_index, shard_count, failure=None):
+        """
+        Count this shard as done; the last shard to finish completes the import
+
+        Counts and issues come from the checkpoints. failure (an issue dict
+        for a shard that crashed) is parked in the cache until then.
+        """
+        cache = frappe.cache()
+        if failure:
+            cache.set_value(self.get_shard_key(shard_run_id, shard_index, "failure"), failure,
+                expires_in_sec=IMPORT_JOB_TIMEOUT)
+
+        counter_key = cache.make_key(self.get_shard_key(shard_run_id, "done"))
+        done = cache.incr(counter_key)
+        cache.expire(counter_key, IMPORT_JOB_TIMEOUT)
+
+        if done != shard_count:
+            return
+
+        combined = get_checkpoint_tally(self.name)
+        combined.pop("ranges")
+        for shard in range(shard_count):
+            failure = cache.get_value(self.get_shard_key(shard_run_id, shard, "failure"))
+            if failure:
+                combined["errors"] += 1
+                combined["error_log"].append(failure)
+            cache.delete_value(self.get_shard_key(shard_run_id, shard, "failure"))
+
+        for counter in SHARD_COUNTERS:
+            cache.delete(cache.make_key(self.get_shard_key(shard_run_id, counter)))
+        cache.delete(counter_key)
+        cache.delete_value(self.get_shard_key("run"))
+        cache.delete_value(self.get_shard_key("jobs"))
+
+        self.reload()
+        self.update_progress(
+            combined["processed"], combined["success"], combined["errors"], combined["warnings"], force=True
+        )
+        finish_import(self, combined)
+        frappe.db.commit()
+
+    def get_progress_reporter(self):
+        """Progress reporter for this import; shared between workers when running in parallel"""
+        from digicomply.utils import ProgressReporter
+
+        if not getattr(self, "_progress_reporter", None):
+            self._progress_reporter = ProgressReporter(self, "bulk_import_progress", shared=bool(self.run_in_parallel))
+        return self._progress_reporter
+
+    def update_progress(self, processed, success, errors, warnings, force=False):
+        """Update import progress counters and publish realtime event (throttled, see ProgressReporter)"""
         total = self.total_rows or 1
         progress = min(100, (processed / total) * 100) if total > 0 else 0
 
-        self.db_set("processed_rows", processed)
-        self.db_set("success_count", success)
-        self.db_set("error_count", errors)
-        self.db_set("warning_count", warnings)
-        self.db_set("progress_percent", flt(progress, 2))
-
-        # Publish realtime event for progress updates
-        frappe.publish_realtime(
-            "bulk_import_progress",
+        self.get_progress_reporter().report(
             {
+                "processed_rows": processed,
+                "success_count": success,
+                "error_count": errors,
+                "warning_count": warnings,
+                "progress_percent": flt(progress, 2),
+            },
+            percent=progress,
+            message={
                 "import_log": self.name,
                 "status": self.status,
                 "progress": progress,
@@ -95,17 +306,18 @@ class BulkImportLog(Document):
                 "errors": errors,
                 "warnings": warnings
             },
-            user=frappe.session.user
+            force=force
         )
 
     def complete(self, status, error_log=None, result_summary=None):
         """Mark import as complete with final status"""
-        self.db_set("status", status)
-        self.db_set("completed_at", now_datetime())
-        self.db_set("progress_percent", 100)
+        # Land the last counters before the final status
+        self.get_progress_reporter().flush()
 
+        values = {"status": status, "completed_at": now_datetime(), "progress_percent": 100}
         if error_log:
-            self.db_set("error_log", json.dumps(error_log, indent=2, default=str))
+            values["error_log"] = json.dumps(error_log, indent=2, default=str)
+        self.db_set(values)
 
         # Generate result summary HTML
         if not result_summary:
@@ -178,8 +390,7 @@ class BulkImportLog(Document):
         if self.status not in ["Validating", "Processing"]:
             frappe.throw(_("Only Validating or Processing imports can be cancelled"))
 
-        self.db_set("status", "Cancelled")
-        self.db_set("completed_at", now_datetime())
+        self.db_set({"status": "Cancelled", "completed_at": now_datetime()})
         frappe.db.commit()
 
         frappe.publish_realtime(
@@ -234,35 +445,27 @@ def process_import(import_log):
     if doc.status == "Cancelled":
         return
 
-    errors = []
-    warnings = []
-    success_count = 0
-    error_count = 0
-    warning_count = 0
+    from digicomply.utils import get_file_path, iter_csv_rows, sniff_csv_format
 
     try:
-        # Get file content
-        file_doc = frappe.get_doc("File", {"file_url": doc.file})
-        content = file_doc.get_content()
-
-        # Decode if bytes
-        if isinstance(content, bytes):
-            content = content.decode("utf-8-sig")  # Handle BOM
+        # Stream rows from the file on disk instead of loading it into memory
+        path = get_file_path(doc.file)
+        encoding, delimiter = sniff_csv_format(path)
+        data_rows = iter_csv_rows(path, encoding, delimiter)
 
-        # Parse CSV
-        rows = parse_csv_content(content)
-
-        if not rows:
+        first_row = next(data_rows, None)
+        if not first_row:
             doc.complete("Failed", [{"row": 0, "error": "No data found in file"}])
             frappe.db.commit()
             return
 
-        # Extract header and data
-        header = [h.strip().lower().replace(" ", "_") for h in rows[0]]
-        data_rows = rows[1:]
+        # Extract header; data rows are read lazily below
+        header = get_import_header(first_row)
 
-        # Update total rows
-        doc.db_set("total_rows", len(data_rows))
+        # Update total rows; the same byte-level scan finds where each shard starts
+        rows_per_shard = cint(doc.rows_per_shard) if doc.run_in_parallel else 0
+        total_rows, shard_offsets = scan_data_rows(path, encoding, delimiter, rows_per_shard)
+        doc.db_set("total_rows", total_rows)
         doc.db_set("status", "Processing")
         frappe.db.commit()
 
@@ -274,101 +477,572 @@ def process_import(import_log):
             frappe.db.commit()
             return
 
-        # Process each row
-        for idx, row in enumerate(data_rows, start=2):  # Start at 2 (1-indexed + header)
-            # Check for cancellation
-            doc.reload()
-            if doc.status == "Cancelled":
-                break
+        # Dry runs are validated in memory against preloaded lookups
+        if doc.dry_run:
+            def report_progress(tally):
+                doc.update_progress(tally["processed"], tally["success"], tally["errors"], tally["warnings"])
 
-            try:
-                # Create row dict
-                row_data = dict(zip(header, row))
-
-                # Process row
-                result = handler(row_data, doc, idx)
-
-                if result.get("status") == "success":
-                    success_count += 1
-                elif result.get("status") == "warning":
-                    warning_count += 1
-                    if result.get("message"):
-                        warnings.append({
-                            "row": idx,
-                            "warning": result.get("message"),
-                            "field": result.get("field", "")
-                        })
-                elif result.get("status") == "error":
-                    error_count += 1
-                    errors.append({
-                        "row": idx,
-                        "error": result.get("message", "Unknown error"),
-                        "field": result.get("field", ""),
-                        "value": result.get("value", "")
-                    })
-                elif result.get("status") == "skipped":
-                    # Dry run - count as success for validation
-                    success_count += 1
+            tally = validate_rows(doc, header, data_rows, report_progress=report_progress)
+            finish_import(doc, tally)
+            frappe.db.commit()
+            return
 
-            except Exception as e:
-                error_count += 1
-                errors.append({
-                    "row": idx,
-                    "error": str(e),
-                    "field": "",
-                    "value": ""
-                })
-                frappe.log_error(
-                    title=f"Bulk Import Error - Row {idx}",
-                    message=str(e)
-                )
-
-            # Update progress every 10 rows
-            if idx % 10 == 0 or idx == len(data_rows) + 1:
-                processed = idx - 1  # Subtract 1 for header offset
-                doc.update_progress(processed, success_count, error_count, warning_count)
-                frappe.db.commit()
-
-        # Determine final status
-        if doc.status == "Cancelled":
-            final_status = "Cancelled"
-        elif error_count > 0 and success_count > 0:
-            final_status = "Completed with Errors"
-        elif error_count > 0 and success_count == 0:
-            final_status = "Failed"
-        else:
-            final_status = "Completed"
+        # Chunks committed by an earlier, interrupted attempt are skipped
+        tally = get_checkpoint_tally(doc.name)
+        done_ranges = tally.pop("ranges")
+
+        # Large files run as row-range shards on several workers
+        shards = doc.get_shards(total_rows)
+        if len(shards) > 1:
+            doc.enqueue_shards(shards, encoding, delimiter, tally, shard_offsets)
+            frappe.db.commit()
+            return
 
-        # Combine errors and warnings
-        all_issues = errors + [{"row": w["row"], "error": f"Warning: {w['warning']}", "field": w.get("field", "")} for w in warnings]
+        def report_progress(counts, tally):
+            doc.update_progress(tally["processed"], tally["success"], tally["errors"], tally["warnings"])
+
+        tally = import_rows(
+            doc, handler, header, data_rows,
+            report_progress=report_progress, tally=tally, done_ranges=done_ranges
+        )
 
-        doc.complete(final_status, all_issues if all_issues else None)
+        finish_import(doc, tally)
         frappe.db.commit()
 
     except Exception as e:
+        # Drop the unfinished chunk along with its checkpoint so a resume redoes it
+        frappe.db.rollback()
         frappe.log_error(title="Bulk Import Failed", message=str(e))
         doc.complete("Failed", [{"row": 0, "error": str(e)}])
         frappe.db.commit()
 
 
+def process_import_shard(import_log, shard_run_id, shard_index, shard_count, start_row, end_row,
+                         encoding=None, delimiter=None, offset=None, end_offset=None):
+    """
+    Background job processing data rows start_row..end_row of a parallel import
+
+    Row numbers in errors and warnings stay relative to the whole file.
+    offset and end_offset say where the shard's rows lie in the file (see
+    get_shard_rows).
+    """
+    from digicomply.utils import get_file_path, iter_csv_rows
+
+    doc = frappe.get_doc("Bulk Import Log", import_log)
+
+    # The import was restarted since this shard was queued
+    if frappe.cache().get_value(doc.get_shard_key("run")) != shard_run_id:
+        return
+
+    failure = None
+
+    try:
+        if doc.status == "Processing":
+            path = get_file_path(doc.file)
+            data_rows = iter_csv_rows(path, encoding, delimiter)
+            header = get_import_header(next(data_rows))
+            data_rows.close()
+
+            handler = get_import_handler(doc.import_type)
+            shard_rows = get_shard_rows(path, encoding, delimiter, start_row, end_row, offset, end_offset)
+
+            def report_progress(counts, running):
+                totals = doc.add_shard_counts(shard_run_id, counts)
+                doc.update_progress(totals["processed"], totals["success"], totals["errors"], totals["warnings"])
+
+            import_rows(
+                doc, handler, header, shard_rows,
+                first_row_num=start_row + 2, report_progress=report_progress,
+                done_ranges=get_checkpoint_ranges(doc.name, start_row + 2, end_row + 1)
+            )
+
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(title=f"Bulk Import Shard Failed - {import_log} #{shard_index + 1}", message=str(e))
+
+        failure = {"row": 0, "error": f"Shard {shard_index + 1} failed: {e}", "field": "", "value": ""}
+        doc.add_shard_counts(shard_run_id, {"processed": 0, "success": 0, "errors": 1, "warnings": 0})
+
+    doc.finish_shard(shard_run_id, shard_index, shard_count, failure)
+
+
+def scan_data_rows(path, encoding, delimiter, rows_per_shard=0):
+    """
+    Count the data rows of an import file, and find where each shard starts
+
+    One byte-level scan (see iter_csv_row_offsets), no CSV parsing.
+
+    Returns:
+        tuple: (total_rows, {first data row of a shard: byte offset})
+    """
+    from digicomply.utils import iter_csv_row_offsets
+
+    row_offsets = iter_csv_row_offsets(path, encoding, delimiter)
+    next(row_offsets, None)  # header
+
+    total_rows = 0
+    shard_offsets = {}
+    for offset in row_offsets:
+        if rows_per_shard > 0 and total_rows % rows_per_shard == 0:
+            shard_offsets[total_rows] = offset
+        total_rows += 1
+
+    return total_rows, shard_offsets
+
+
+def get_shard_rows(path, encoding, delimiter, start_row, end_row, offset=None, end_offset=None):
+    """
+    Data rows start_row..end_row of an import file, lazily
+
+    offset is the byte at which data row start_row begins and end_offset
+    the one at which end_row begins (None at the end of the file). Reading
+    seeks straight to offset, unless the bytes up to end_offset do not hold
+    exactly the shard's rows (see is_shard_aligned); then the error is
+    logged and the rows before the shard are parsed and skipped instead.
+    """
+    from itertools import islice
+
+    from digicomply.utils import iter_csv_rows
+
+    if offset is not None:
+        if is_shard_aligned(path, encoding, delimiter, offset, end_offset, end_row - start_row):
+            return iter_csv_rows(path, encoding, delimiter, offset, end_offset)
+
+        frappe.log_error(
+            title="Bulk Import Shard Misaligned",
+            message=f"Bytes {offset}..{end_offset} of {path} do not hold data rows {start_row}..{end_row}"
+        )
+
+    # The header is row 0
+    return islice(iter_csv_rows(path, encoding, delimiter), start_row + 1, end_row + 1)
+
+
+def is_shard_aligned(path, encoding, delimiter, offset, end_offset, row_count):
+    """
+    Whether the bytes from offset to end_offset hold exactly row_count whole rows
+
+    The range must start right after a line end, and parsing it must give
+    row_count rows; a range starting or ending inside a row almost never
+    does. One parse of the shard, cheap next to importing it.
+    """
+    from itertools import islice
+
+    from digicomply.utils import iter_csv_rows
+
+    with open(path, "rb") as f:
+        f.seek(offset - 1)
+        if f.read(1) not in (b"\n", b"\r"):
+            return False
+
+    rows = iter_csv_rows(path, encoding, delimiter, offset, end_offset)
+    return sum(1 for _row in islice(rows, row_count + 1)) == row_count
+
+
+def get_import_header(first_row):
+    """Normalise the header row into handler field names"""
+    return [h.strip().lower().replace(" ", "_") for h in first_row]
+
+
+def get_import_tally():
+    """Empty counters and issue lists for an import run"""
+    return {
+        "processed": 0,
+        "success": 0,
+        "errors": 0,
+        "warnings": 0,
+        "error_log": [],
+        "warning_log": [],
+        "cancelled": False,
+    }
+
+
+def import_rows(import_log, handler, header, data_rows, first_row_num=2, report_progress=None,
+                tally=None, done_ranges=None):
+    """
+    Run data rows through the import handler chunk by chunk
+
+    Cancellation is checked before every chunk. Each chunk first claims its
+    checkpoint (see claim_import_chunk) and is skipped if another attempt
+    already committed it. After each chunk the checkpoint gets its counts
+    and issues, report_progress(chunk counts, running tally) is called and
+    the chunk is committed together with its checkpoint.
+
+    Args:
+        tally: Counts to continue from (see get_checkpoint_tally)
+        done_ranges: (first, last) row numbers already checkpointed; these rows are skipped
+
+    Returns:
+        dict: tally as built by get_import_tally
+    """
+    tally = tally or get_import_tally()
+
+    numbered_rows = enumerate(data_rows, start=first_row_num)
+    if done_ranges:
+        numbered_rows = skip_checkpointed_rows(numbered_rows, done_ranges)
+
+    for chunk in iter_import_chunks(header, numbered_rows, IMPORT_BATCH_SIZE):
+        # Check for cancellation
+        if frappe.db.get_value("Bulk Import Log", import_log.name, "status") == "Cancelled":
+            import_log.status = "Cancelled"
+            tally["cancelled"] = True
+            break
+
+        checkpoint = claim_import_chunk(import_log, chunk)
+        if not checkpoint:
+            continue
+
+        counts = {"processed": len(chunk), "success": 0, "errors": 0, "warnings": 0}
+        issues = {"errors": [], "warnings": []}
+
+        for idx, result in process_import_chunk(import_log, handler, chunk):
+            if result.get("status") == "success":
+                counts["success"] += 1
+            elif result.get("status") == "warning":
+                counts["warnings"] += 1
+                if result.get("message"):
+                    issues["warnings"].append({
+                        "row": idx,
+                        "warning": result.get("message"),
+                        "field": result.get("field", "")
+                    })
+            elif result.get("status") == "error":
+                counts["errors"] += 1
+                issues["errors"].append({
+                    "row": idx,
+                    "error": result.get("message", "Unknown error"),
+                    "field": result.get("field", ""),
+                    "value": result.get("value", "")
+                })
+            elif result.get("status") == "skipped":
+                # Dry run - count as success for validation
+                counts["success"] += 1
+
+        save_import_checkpoint(checkpoint, counts, issues)
+
+        for counter in SHARD_COUNTERS:
+            tally[counter] += counts[counter]
+        tally["error_log"].extend(issues["errors"])
+        tally["warning_log"].extend(issues["warnings"])
+
+        if report_progress:
+            report_progress(counts, tally)
+        frappe.db.commit()
+
+    return tally
+
+
+def validate_rows(import_log, header, data_rows, first_row_num=2, report_progress=None):
+    """
+    Validate data rows without importing them (dry run)
+
+    Uses RowValidator, so the only queries are the lookup loads up front
+    and a cancellation check every VALIDATION_BATCH_SIZE rows. Rows with
+    errors count as errors, rows with only warnings as warnings, the rest
+    as successes, as in a dry run through the import handlers.
+
+    Returns:
+        dict: tally as built by get_import_tally
+    """
+    from digicomply.bulk_import.validation import RowValidator
+
+    validator = RowValidator(import_log, header)
+    tally = get_import_tally()
+
+    if validator.header_errors:
+        tally["errors"] += len(validator.header_errors)
+        tally["error_log"].extend(validator.header_errors)
+
+    validate = validator.validate
+    error_log = tally["error_log"]
+    warning_log = tally["warning_log"]
+
+    for idx, row in enumerate(data_rows, start=first_row_num):
+        errors, warnings = validate(row)
+
+        if errors:
+            tally["errors"] += 1
+            for issue in errors:
+                issue["row"] = idx
+                error_log.append(issue)
+        elif warnings:
+            tally["warnings"] += 1
+            for issue in warnings:
+                issue["row"] = idx
+                warning_log.append(issue)
+        else:
+            tally["success"] += 1
+
+        tally["processed"] += 1
+
+        if tally["processed"] % VALIDATION_BATCH_SIZE == 0:
+            if frappe.db.get_value("Bulk Import Log", import_log.name, "status") == "Cancelled":
+                import_log.status = "Cancelled"
+                tally["cancelled"] = True
+                break
+
+            if report_progress:
+                report_progress(tally)
+
+    if report_progress:
+        report_progress(tally)
+
+    return tally
+
+
+def get_chunk_key(import_log, start_row, end_row):
+    """Idempotency key of a chunk: the import and its first and last row number"""
+    return f"{import_log}-{start_row}-{end_row}"
+
+
+def claim_import_chunk(import_log, chunk):
+    """
+    Insert the checkpoint of a chunk before processing it
+
+    The checkpoint is named by the chunk's idempotency key and committed
+    with the chunk's records. If the key already exists the chunk was
+    imported by an earlier attempt (or is being imported by a concurrent
+    one, in which case the insert waits for it) and None is returned.
+    """
+    start_row, end_row = chunk[0][0], chunk[-1][0]
+
+    checkpoint = frappe.get_doc({
+        "doctype": "Bulk Import Checkpoint",
+        "name": get_chunk_key(import_log.name, start_row, end_row),
+        "import_log": import_log.name,
+        "start_row": start_row,
+        "end_row": end_row,
+        "dry_run": cint(import_log.dry_run),
+    })
+
+    try:
+        checkpoint.db_insert()
+    except frappe.DuplicateEntryError:
+        return None
+
+    return checkpoint
+
+
+def save_import_checkpoint(checkpoint, counts, issues):
+    """Store a chunk's counts and issues on its checkpoint"""
+    frappe.db.set_value("Bulk Import Checkpoint", checkpoint.name, {
+        "processed": counts["processed"],
+        "success_count": counts["success"],
+        "error_count": counts["errors"],
+        "warning_count": counts["warnings"],
+        "issues": json.dumps(issues, default=str) if issues["errors"] or issues["warnings"] else None,
+    }, update_modified=False)
+
+
+def get_checkpoint_ranges(import_log, from_row=None, to_row=None):
+    """(first, last) row numbers of the checkpointed chunks of an import, optionally within a row range"""
+    filters = {"import_log": import_log}
+    if from_row is not None:
+        filters["end_row"] = [">=", from_row]
+    if to_row is not None:
+        filters["start_row"] = ["<=", to_row]
+
+    checkpoints = frappe.get_all(
+        "Bulk Import Checkpoint",
+        filters=filters,
+        fields=["start_row", "end_row"],
+        order_by="start_row asc",
+        limit_page_length=0
+    )
+    return [(c.start_row, c.end_row) for c in checkpoints]
+
+
+def get_checkpoint_tally(import_log):
+    """
+    Counts and issues of all checkpointed chunks of an import
+
+    Returns:
+        dict: tally as built by get_import_tally, plus "ranges" as in get_checkpoint_ranges
+    """
+    tally = get_import_tally()
+    tally["ranges"] = []
+
+    for checkpoint in frappe.get_all(
+        "Bulk Import Checkpoint",
+        filters={"import_log": import_log},
+        fields=["start_row", "end_row", "processed", "success_count", "error_count", "warning_count", "issues"],
+        order_by="start_row asc",
+        limit_page_length=0
+    ):
+        tally["ranges"].append((checkpoint.start_row, checkpoint.end_row))
+        tally["processed"] += cint(checkpoint.processed)
+        tally["success"] += cint(checkpoint.success_count)
+        tally["errors"] += cint(checkpoint.error_count)
+        tally["warnings"] += cint(checkpoint.warning_count)
+
+        if checkpoint.issues:
+            issues = json.loads(checkpoint.issues)
+            tally["error_log"].extend(issues.get("errors") or [])
+            tally["warning_log"].extend(issues.get("warnings") or [])
+
+    return tally
+
+
+def skip_checkpointed_rows(numbered_rows, done_ranges):
+    """Drop (row number, row) pairs that fall inside a checkpointed (first, last) range"""
+    ranges = iter(sorted(done_ranges))
+    current = next(ranges, None)
+
+    for idx, row in numbered_rows:
+        while current and idx > current[1]:
+            current = next(ranges, None)
+        if current and current[0] <= idx:
+            continue
+        yield idx, row
+
+
+def finish_import(import_log, tally):
+    """Set the final status of an import from its tally and store errors and warnings"""
+    # Determine final status
+    if import_log.status == "Cancelled" or tally["cancelled"]:
+        final_status = "Cancelled"
+    elif tally["errors"] > 0 and tally["success"] > 0:
+        final_status = "Completed with Errors"
+    elif tally["errors"] > 0 and tally["success"] == 0:
+        final_status = "Failed"
+    else:
+        final_status = "Completed"
+
+    tally["error_log"].sort(key=lambda issue: issue["row"])
+    tally["warning_log"].sort(key=lambda issue: issue["row"])
+
+    # Combine errors and warnings
+    all_issues = tally["error_log"] + [
+        {"row": w["row"], "error": f"Warning: {w['warning']}", "field": w.get("field", "")}
+        for w in tally["warning_log"]
+    ]
+
+    import_log.complete(final_status, all_issues if all_issues else None)
+
+
 def parse_csv_content(content):
     """Parse CSV string into list of rows"""
-    rows = []
+    from digicomply.utils import parse_csv_text
+
+    return parse_csv_text(content)
+
+
+def iter_import_chunks(header, numbered_rows, batch_size):
+    """Group (row number, row) pairs into lists of (row number, row dict); row 1 is the header"""
+    chunk = []
+    for idx, row in numbered_rows:
+        chunk.append((idx, dict(zip(header, row))))
+        if len(chunk) >= batch_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
 
-    # Try different delimiters
-    for delimiter in [",", ";", "\t"]:
+
+def process_import_chunk(import_log, handler, chunk):
+    """
+    Run the import handler over one chunk of rows
+
+    Existing records for the whole chunk are looked up with one query per
+    lookup (see prefetch_import_context) and handlers read them from the
+    shared context. Each row runs inside a savepoint, so a failed row is
+    rolled back without losing the rest of the chunk.
+
+    Returns:
+        list: (row number, result dict) per row, in order
+    """
+    context = prefetch_import_context(import_log.import_type, chunk)
+    results = {}
+
+    for idx, row_data in chunk:
+        frappe.db.savepoint(IMPORT_ROW_SAVEPOINT)
         try:
-            reader = csv.reader(StringIO(content), delimiter=delimiter)
-            rows = list(reader)
-            if rows and len(rows[0]) > 1:
-                break
-        except Exception:
-            continue
+            result = handler(row_data, import_log, idx, context=context)
+        except Exception as e:
+            result = {"status": "error", "message": str(e), "field": "", "value": ""}
+            frappe.log_error(
+                title=f"Bulk Import Error - Row {idx}",
+                message=str(e)
+            )
 
-    # Filter out empty rows
-    rows = [row for row in rows if any(cell.strip() for cell in row)]
+        if result.get("status") == "error":
+            frappe.db.rollback(save_point=IMPORT_ROW_SAVEPOINT)
 
-    return rows
+        results[idx] = result
+
+    return list(results.items())
+
+
+def prefetch_import_context(import_type, chunk):
+    """
+    Look up the records a chunk refers to with one query per lookup
+
+    Returns:
+        dict: {"existing": {(doctype, fieldname): {key: name}}}
+        Keys are casefolded, as the database compares them case-insensitively.
+    """
+    context = {"existing": {}}
+
+    for column, doctype, fieldname in IMPORT_LOOKUPS.get(import_type, []):
+        keys = {cstr(row_data.get(column, "")).strip() for _idx, row_data in chunk}
+        keys.discard("")
+
+        existing = {}
+        if keys:
+            for record in frappe.get_all(
+                doctype,
+                filters={fieldname: ["in", list(keys)]},
+                fields=["name", fieldname],
+                limit_page_length=0
+            ):
+                existing.setdefault(cstr(record.get(fieldname)).casefold(), record.name)
+
+        context["existing"][(doctype, fieldname)] = existing
+
+    return context
+
+
+def get_existing_record(context, doctype, fieldname, value):
+    """Name of the record whose fieldname equals value, from the prefetched context if any"""
+    if context is None or (doctype, fieldname) not in context["existing"]:
+        if fieldname == "name":
+            return frappe.db.exists(doctype, value)
+        return frappe.db.exists(doctype, {fieldname: value})
+
+    return context["existing"][(doctype, fieldname)].get(cstr(value).casefold())
+
+
+def save_import_record(import_log, doctype, existing, new_values, values, context=None):
+    """
+    Create or update one imported record
+
+    new_values are only set on new records, values on both. Records are
+    saved through the ORM inside the row's savepoint, so hooks and version
+    tracking run and a failure only affects its own row.
+    """
+    if existing:
+        doc = frappe.get_doc(doctype, existing)
+    else:
+        doc = frappe.new_doc(doctype)
+        doc.update(new_values)
+
+    doc.update(values)
+
+    if not import_log.skip_validation:
+        doc.flags.ignore_validate = False
+    else:
+        doc.flags.ignore_validate = True
+        doc.flags.ignore_mandatory = True
+
+    doc.save(ignore_permissions=True)
+
+    # Later rows of the same chunk must see the record as existing
+    if not existing and context is not None:
+        for (lookup_doctype, fieldname), records in context["existing"].items():
+            if lookup_doctype == doctype:
+                records.setdefault(cstr(doc.get(fieldname)).casefold(), doc.name)
+
+    return doc.name
 
 
 def get_import_handler(import_type):
@@ -389,7 +1063,7 @@ def get_import_handler(import_type):
 # Import Handlers
 # =============================================================================
 
-def import_customer(row_data, import_log, row_num):
+def import_customer(row_data, import_log, row_num, context=None):
     """
     Import a Customer record
 
@@ -408,7 +1082,7 @@ def import_customer(row_data, import_log, row_num):
         return {"status": "error", "message": "Customer name is required", "field": "customer_name"}
 
     # Check if exists
-    existing = frappe.db.exists("Customer", {"customer_name": customer_name})
+    existing = get_existing_record(context, "Customer", "customer_name", customer_name)
 
     if existing and not import_log.update_existing:
         return {"status": "warning", "message": f"Customer '{customer_name}' already exists", "field": "customer_name"}
@@ -420,31 +1094,18 @@ def import_customer(row_data, import_log, row_num):
         return {"status": "skipped", "message": "Would create new customer"}
 
     try:
-        if existing:
-            # Update existing
-            doc = frappe.get_doc("Customer", existing)
-        else:
-            # Create new
-            doc = frappe.new_doc("Customer")
-            doc.customer_name = customer_name
-
         # Map fields
-        doc.customer_type = row_data.get("customer_type") or "Company"
+        values = {"customer_type": row_data.get("customer_type") or "Company"}
         if row_data.get("customer_group"):
-            doc.customer_group = row_data.get("customer_group")
+            values["customer_group"] = row_data.get("customer_group")
         if row_data.get("territory"):
-            doc.territory = row_data.get("territory")
+            values["territory"] = row_data.get("territory")
         if row_data.get("tax_id"):
-            doc.tax_id = row_data.get("tax_id")
-
-        # Validate if not skipping
-        if not import_log.skip_validation:
-            doc.flags.ignore_validate = False
-        else:
-            doc.flags.ignore_validate = True
-            doc.flags.ignore_mandatory = True
+            values["tax_id"] = row_data.get("tax_id")
 
-        doc.save(ignore_permissions=True)
+        save_import_record(
+            import_log, "Customer", existing, {"customer_name": customer_name}, values, context
+        )
 
         return {"status": "success", "message": f"{'Updated' if existing else 'Created'} customer: {customer_name}"}
 
@@ -452,7 +1113,7 @@ def import_customer(row_data, import_log, row_num):
         return {"status": "error", "message": str(e), "field": "customer_name", "value": customer_name}
 
 
-def import_supplier(row_data, import_log, row_num):
+def import_supplier(row_data, import_log, row_num, context=None):
     """
     Import a Supplier record
 
@@ -469,7 +1130,7 @@ def import_supplier(row_data, import_log, row_num):
         return {"status": "error", "message": "Supplier name is required", "field": "supplier_name"}
 
     # Check if exists
-    existing = frappe.db.exists("Supplier", {"supplier_name": supplier_name})
+    existing = get_existing_record(context, "Supplier", "supplier_name", supplier_name)
 
     if existing and not import_log.update_existing:
         return {"status": "warning", "message": f"Supplier '{supplier_name}' already exists", "field": "supplier_name"}
@@ -481,28 +1142,18 @@ def import_supplier(row_data, import_log, row_num):
         return {"status": "skipped", "message": "Would create new supplier"}
 
     try:
-        if existing:
-            doc = frappe.get_doc("Supplier", existing)
-        else:
-            doc = frappe.new_doc("Supplier")
-            doc.supplier_name = supplier_name
-
         # Map fields
-        doc.supplier_type = row_data.get("supplier_type") or "Company"
+        values = {"supplier_type": row_data.get("supplier_type") or "Company"}
         if row_data.get("supplier_group"):
-            doc.supplier_group = row_data.get("supplier_group")
+            values["supplier_group"] = row_data.get("supplier_group")
         if row_data.get("country"):
-            doc.country = row_data.get("country")
+            values["country"] = row_data.get("country")
         if row_data.get("tax_id"):
-            doc.tax_id = row_data.get("tax_id")
-
-        if not import_log.skip_validation:
-            doc.flags.ignore_validate = False
-        else:
-            doc.flags.ignore_validate = True
-            doc.flags.ignore_mandatory = True
+            values["tax_id"] = row_data.get("tax_id")
 
-        doc.save(ignore_permissions=True)
+        save_import_record(
+            import_log, "Supplier", existing, {"supplier_name": supplier_name}, values, context
+        )
 
         return {"status": "success", "message": f"{'Updated' if existing else 'Created'} supplier: {supplier_name}"}
 
@@ -510,7 +1161,7 @@ def import_supplier(row_data, import_log, row_num):
         return {"status": "error", "message": str(e), "field": "supplier_name", "value": supplier_name}
 
 
-def import_item(row_data, import_log, row_num):
+def import_item(row_data, import_log, row_num, context=None):
     """
     Import an Item record
 
@@ -529,7 +1180,7 @@ def import_item(row_data, import_log, row_num):
         return {"status": "error", "message": "Item code is required", "field": "item_code"}
 
     # Check if exists
-    existing = frappe.db.exists("Item", item_code)
+    existing = get_existing_record(context, "Item", "name", item_code)
 
     if existing and not import_log.update_existing:
         return {"status": "warning", "message": f"Item '{item_code}' already exists", "field": "item_code"}
@@ -541,32 +1192,22 @@ def import_item(row_data, import_log, row_num):
         return {"status": "skipped", "message": "Would create new item"}
 
     try:
-        if existing:
-            doc = frappe.get_doc("Item", existing)
-        else:
-            doc = frappe.new_doc("Item")
-            doc.item_code = item_code
-
         # Map fields
-        doc.item_name = row_data.get("item_name") or item_code
+        values = {"item_name": row_data.get("item_name") or item_code}
         if row_data.get("item_group"):
-            doc.item_group = row_data.get("item_group")
+            values["item_group"] = row_data.get("item_group")
         if row_data.get("description"):
-            doc.description = row_data.get("description")
+            values["description"] = row_data.get("description")
         if row_data.get("stock_uom"):
-            doc.stock_uom = row_data.get("stock_uom")
+            values["stock_uom"] = row_data.get("stock_uom")
         if row_data.get("is_stock_item"):
-            doc.is_stock_item = cint(row_data.get("is_stock_item"))
+            values["is_stock_item"] = cint(row_data.get("is_stock_item"))
         if row_data.get("standard_rate"):
-            doc.standard_rate = flt(row_data.get("standard_rate"))
-
-        if not import_log.skip_validation:
-            doc.flags.ignore_validate = False
-        else:
-            doc.flags.ignore_validate = True
-            doc.flags.ignore_mandatory = True
+            values["standard_rate"] = flt(row_data.get("standard_rate"))
 
-        doc.save(ignore_permissions=True)
+        save_import_record(
+            import_log, "Item", existing, {"item_code": item_code}, values, context
+        )
 
         return {"status": "success", "message": f"{'Updated' if existing else 'Created'} item: {item_code}"}
 
@@ -574,7 +1215,7 @@ def import_item(row_data, import_log, row_num):
         return {"status": "error", "message": str(e), "field": "item_code", "value": item_code}
 
 
-def import_trn_registry(row_data, import_log, row_num):
+def import_trn_registry(row_data, import_log, row_num, context=None):
     """
     Import a TRN Registry record
 
@@ -613,7 +1254,7 @@ def import_trn_registry(row_data, import_log, row_num):
         }
 
     # Check if exists
-    existing = frappe.db.exists("TRN Registry", {"trn": trn})
+    existing = get_existing_record(context, "TRN Registry", "trn", trn)
 
     if existing and not import_log.update_existing:
         return {"status": "warning", "message": f"TRN '{trn}' already exists", "field": "trn"}
@@ -625,36 +1266,25 @@ def import_trn_registry(row_data, import_log, row_num):
         return {"status": "skipped", "message": "Would create new TRN"}
 
     try:
-        if existing:
-            doc = frappe.get_doc("TRN Registry", existing)
-        else:
-            doc = frappe.new_doc("TRN Registry")
-            doc.trn = trn
-
         # Map fields
-        doc.entity_name = entity_name
-        doc.company = company
+        values = {"entity_name": entity_name, "company": company}
 
         if row_data.get("entity_type"):
-            doc.entity_type = row_data.get("entity_type")
+            values["entity_type"] = row_data.get("entity_type")
         if row_data.get("fta_registration_date"):
-            doc.fta_registration_date = row_data.get("fta_registration_date")
+            values["fta_registration_date"] = row_data.get("fta_registration_date")
         if row_data.get("fta_expiry_date"):
-            doc.fta_expiry_date = row_data.get("fta_expiry_date")
+            values["fta_expiry_date"] = row_data.get("fta_expiry_date")
         if row_data.get("is_primary") is not None:
-            doc.is_primary = cint(row_data.get("is_primary"))
+            values["is_primary"] = cint(row_data.get("is_primary"))
         if row_data.get("is_active") is not None:
-            doc.is_active = cint(row_data.get("is_active"))
+            values["is_active"] = cint(row_data.get("is_active"))
         if row_data.get("notes"):
-            doc.notes = row_data.get("notes")
-
-        if not import_log.skip_validation:
-            doc.flags.ignore_validate = False
-        else:
-            doc.flags.ignore_validate = True
-            doc.flags.ignore_mandatory = True
+            values["notes"] = row_data.get("notes")
 
-        doc.save(ignore_permissions=True)
+        save_import_record(
+            import_log, "TRN Registry", existing, {"trn": trn}, values, context
+        )
 
         return {"status": "success", "message": f"{'Updated' if existing else 'Created'} TRN: {trn}"}
 
@@ -662,7 +1292,7 @@ def import_trn_registry(row_data, import_log, row_num):
         return {"status": "error", "message": str(e), "field": "trn", "value": trn}
 
 
-def import_company(row_data, import_log, row_num):
+def import_company(row_data, import_log, row_num, context=None):
     """
     Import a Company record
 
@@ -679,7 +1309,7 @@ def import_company(row_data, import_log, row_num):
         return {"status": "error", "message": "Company name is required", "field": "company_name"}
 
     # Check if exists
-    existing = frappe.db.exists("Company", company_name)
+    existing = get_existing_record(context, "Company", "name", company_name)
 
     if existing and not import_log.update_existing:
         return {"status": "warning", "message": f"Company '{company_name}' already exists", "field": "company_name"}
@@ -691,29 +1321,22 @@ def import_company(row_data, import_log, row_num):
         return {"status": "skipped", "message": "Would create new company"}
 
     try:
-        if existing:
-            doc = frappe.get_doc("Company", existing)
-        else:
-            doc = frappe.new_doc("Company")
-            doc.company_name = company_name
+        new_values = {
+            "company_name": company_name,
             # Generate abbreviation if not provided
-            doc.abbr = row_data.get("abbr") or "".join([w[0].upper() for w in company_name.split()[:3]])
+            "abbr": row_data.get("abbr") or "".join([w[0].upper() for w in company_name.split()[:3]])
+        }
 
         # Map fields
+        values = {}
         if row_data.get("default_currency"):
-            doc.default_currency = row_data.get("default_currency")
+            values["default_currency"] = row_data.get("default_currency")
         if row_data.get("country"):
-            doc.country = row_data.get("country")
+            values["country"] = row_data.get("country")
         if row_data.get("tax_id"):
-            doc.tax_id = row_data.get("tax_id")
-
-        if not import_log.skip_validation:
-            doc.flags.ignore_validate = False
-        else:
-            doc.flags.ignore_validate = True
-            doc.flags.ignore_mandatory = True
+            values["tax_id"] = row_data.get("tax_id")
 
-        doc.save(ignore_permissions=True)
+        save_import_record(import_log, "Company", existing, new_values, values, context)
 
         return {"status": "success", "message": f"{'Updated' if existing else 'Created'} company: {company_name}"}
 
@@ -721,7 +1344,7 @@ def import_company(row_data, import_log, row_num):
         return {"status": "error", "message": str(e), "field": "company_name", "value": company_name}
 
 
-def import_invoice(row_data, import_log, row_num):
+def import_invoice(row_data, import_log, row_num, context=None):
     """
     Import an Invoice record (Sales Invoice)
 
@@ -743,11 +1366,11 @@ def import_invoice(row_data, import_log, row_num):
         return {"status": "error", "message": "Customer is required", "field": "customer"}
 
     # Check if customer exists
-    if not frappe.db.exists("Customer", customer):
+    if not get_existing_record(context, "Customer", "name", customer):
         return {"status": "error", "message": f"Customer '{customer}' not found", "field": "customer", "value": customer}
 
     # Check if invoice exists
-    existing = frappe.db.exists("Sales Invoice", invoice_no)
+    existing = get_existing_record(context, "Sales Invoice", "name", invoice_no)
 
     if existing and not import_log.update_existing:
         return {"status": "warning", "message": f"Invoice '{invoice_no}' already exists", "field": "invoice_no"}
@@ -794,13 +1417,17 @@ def import_invoice(row_data, import_log, row_num):
 
         doc.save(ignore_permissions=True)
 
+        # Later rows of the same chunk must see the invoice as existing
+        if not existing and context is not None:
+            context["existing"].get(("Sales Invoice", "name"), {}).setdefault(cstr(doc.name).casefold(), doc.name)
+
         return {"status": "success", "message": f"{'Updated' if existing else 'Created'} invoice: {invoice_no}"}
 
     except Exception as e:
         return {"status": "error", "message": str(e), "field": "invoice_no", "value": invoice_no}
 
 
-def import_asp_data(row_data, import_log, row_num):
+def import_asp_data(row_data, import_log, row_num, context=None):
     """
     Import ASP (Accredited Service Provider) data
 
@@ -854,6 +1481,13 @@ def start_import(import_log):
     return doc.start_import()
 
 
+@frappe.whitelist()
+def resume_import(import_log):
+    """API endpoint to resume an interrupted import"""
+    doc = frappe.get_doc("Bulk Import Log", import_log)
+    return doc.resume_import()
+
+
 @frappe.whitelist()
 def cancel_import(import_log):
     """API endpoint to cancel import"""
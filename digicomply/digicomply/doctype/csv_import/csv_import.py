@@ -1,9 +1,10 @@
 # Copyright (c) 2024, DigiComply and contributors
 # License: MIT
 
-import csv
 import json
-from io import StringIO
+import re
+from datetime import datetime
+from itertools import chain, islice
 
 import frappe
 from frappe import _
@@ -11,6 +12,71 @@ from frappe.model.document import Document
 from frappe.utils import cstr, flt, getdate
 
 
+# Fields map_columns can produce, in storage order
+PARSED_DATA_COLUMNS = ["invoice_no", "posting_date", "grand_total", "vat_amount", "customer", "trn"]
+
+AMOUNT_FIELDS = ("grand_total", "vat_amount")
+
+# Standard column mappings per ASP (normalized header names, first match wins)
+ASP_COLUMN_MAPPINGS = {
+    "ClearTax": {
+        "invoice_no": ["invoice number", "invoice no", "invoice_number", "document number"],
+        "posting_date": ["invoice date", "date", "document date"],
+        "grand_total": ["total amount", "grand total", "invoice value", "total"],
+        "vat_amount": ["vat amount", "tax amount", "gst amount", "vat"],
+        "customer": ["customer name", "buyer name", "party name"],
+        "trn": ["customer trn", "buyer trn", "gstin", "vat number"],
+    },
+    "Cygnet": {
+        "invoice_no": ["document no", "invoice no", "inv no"],
+        "posting_date": ["document date", "inv date"],
+        "grand_total": ["total value", "invoice amount"],
+        "vat_amount": ["tax value", "vat"],
+        "customer": ["party name", "customer"],
+        "trn": ["party trn", "trn"],
+    },
+    "Zoho": {
+        "invoice_no": ["invoice#", "invoice number"],
+        "posting_date": ["invoice date", "date"],
+        "grand_total": ["total", "amount"],
+        "vat_amount": ["tax", "vat"],
+        "customer": ["customer name"],
+        "trn": ["customer tax id"],
+    },
+}
+
+# Candidate date formats, day-first before month-first like dateutil(dayfirst=True)
+DATE_FORMATS = [
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%Y/%m/%d",
+    "%d-%b-%Y",
+    "%d %b %Y",
+    "%d-%B-%Y",
+    "%d %B %Y",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%m/%d/%Y",
+]
+
+# Rows sampled to detect the date format, and distinct dates memoised per import
+DATE_SAMPLE_SIZE = 100
+DATE_CACHE_SIZE = 10000
+
+# Parse errors kept in the log (all are counted)
+MAX_PARSE_ERRORS = 1000
+
+# Year-first dates, which must not be parsed day-first
+ISO_DATE_PREFIX = re.compile(r"\d{4}[-/]\d{1,2}[-/]\d{1,2}")
+
+# Currency symbols and thousands separators stripped from amounts
+AMOUNT_NOISE = re.compile(r",|AED|\$")
+
+
 class CSVImport(Document):
     """
     CSV Import - Handle ASP data uploads
@@ -30,33 +96,28 @@ class CSVImport(Document):
     @frappe.whitelist()
     def process_csv(self):
         """Parse CSV file and extract invoice data"""
+        from digicomply.utils import get_file_path, iter_csv_rows
+
         self.db_set("status", "Processing")
 
         try:
-            # Get file content
-            file_doc = frappe.get_doc("File", {"file_url": self.file})
-            content = file_doc.get_content()
+            # Stream rows from the file on disk (encoding and delimiter are sniffed)
+            rows = iter_csv_rows(get_file_path(self.file))
 
-            # Decode if bytes
-            if isinstance(content, bytes):
-                content = content.decode("utf-8-sig")  # Handle BOM
-
-            # Parse CSV
-            rows = self.parse_csv_content(content)
-
-            if not rows:
+            # Extract header; data rows are mapped as they are read
+            header = next(rows, None)
+            if not header:
                 frappe.throw(_("No data found in CSV file"))
 
-            # Extract header and data
-            header = rows[0]
-            data_rows = rows[1:]
-
             # Map columns to our standard format
-            mapped_data = self.map_columns(header, data_rows)
+            parse_errors = []
+            mapped_data = self.map_columns(header, rows, parse_errors)
 
-            # Store parsed data
-            self.db_set("parsed_data", json.dumps(mapped_data))
+            # Store parsed data as a compressed columnar file
+            self.save_parsed_data(mapped_data)
             self.db_set("row_count", len(mapped_data))
+            self.db_set("parse_error_count", len(parse_errors))
+            self.db_set("parse_errors", json.dumps(parse_errors[:MAX_PARSE_ERRORS], indent=2) if parse_errors else None)
             self.db_set("status", "Completed")
 
             # Generate preview
@@ -73,59 +134,51 @@ class CSVImport(Document):
 
     def parse_csv_content(self, content: str) -> list:
         """Parse CSV string into list of rows"""
-        rows = []
+        from digicomply.utils import parse_csv_text
 
-        # Try different delimiters
-        for delimiter in [",", ";", "\t"]:
-            try:
-                reader = csv.reader(StringIO(content), delimiter=delimiter)
-                rows = list(reader)
-                if rows and len(rows[0]) > 1:
-                    break
-            except Exception:
-                continue
+        return parse_csv_text(content)
 
-        # Filter out empty rows
-        rows = [row for row in rows if any(cell.strip() for cell in row)]
+    def map_columns(self, header: list, data_rows, errors: list = None) -> list:
+        """
+        Map CSV columns to standard format based on ASP provider or custom mapping
 
-        return rows
+        A mapping plan (column index and converter per field) is built once
+        from the header and a sample of rows, see get_mapping_plan. Cells
+        that cannot be read as a date or amount are appended to errors as
+        {row, field, value, error}; row numbers count the header as row 1.
+        """
+        data_rows = iter(data_rows)
+        sample = list(islice(data_rows, DATE_SAMPLE_SIZE))
+        plan = self.get_mapping_plan(header, sample)
 
-    def map_columns(self, header: list, data_rows: list) -> list:
-        """Map CSV columns to standard format based on ASP provider or custom mapping"""
+        # Extract data
+        mapped_data = []
+        for row_num, row in enumerate(chain(sample, data_rows), start=2):
+            record = {}
+            for field, idx, convert in plan:
+                if idx < len(row):
+                    value = row[idx].strip()
+                    # Convert to appropriate type
+                    if convert:
+                        value, error = convert(value)
+                        if error and errors is not None:
+                            errors.append({"row": row_num, "field": field, "value": row[idx], "error": error})
+                    record[field] = value
+
+            # Only include if has invoice number
+            if record.get("invoice_no"):
+                mapped_data.append(record)
+
+        return mapped_data
+
+    def get_column_indices(self, header: list) -> dict:
+        """Resolve each standard field to its column index in this header"""
 
         # Normalize header names
         header_map = {self.normalize_column_name(h): i for i, h in enumerate(header)}
 
-        # Define standard column mappings per ASP
-        asp_mappings = {
-            "ClearTax": {
-                "invoice_no": ["invoice number", "invoice no", "invoice_number", "document number"],
-                "posting_date": ["invoice date", "date", "document date"],
-                "grand_total": ["total amount", "grand total", "invoice value", "total"],
-                "vat_amount": ["vat amount", "tax amount", "gst amount", "vat"],
-                "customer": ["customer name", "buyer name", "party name"],
-                "trn": ["customer trn", "buyer trn", "gstin", "vat number"],
-            },
-            "Cygnet": {
-                "invoice_no": ["document no", "invoice no", "inv no"],
-                "posting_date": ["document date", "inv date"],
-                "grand_total": ["total value", "invoice amount"],
-                "vat_amount": ["tax value", "vat"],
-                "customer": ["party name", "customer"],
-                "trn": ["party trn", "trn"],
-            },
-            "Zoho": {
-                "invoice_no": ["invoice#", "invoice number"],
-                "posting_date": ["invoice date", "date"],
-                "grand_total": ["total", "amount"],
-                "vat_amount": ["tax", "vat"],
-                "customer": ["customer name"],
-                "trn": ["customer tax id"],
-            },
-        }
-
         # Get mapping for this ASP, fallback to custom
-        mapping = asp_mappings.get(self.asp_provider, {})
+        mapping = dict(ASP_COLUMN_MAPPINGS.get(self.asp_provider, {}))
 
         # Apply custom column overrides
         if self.invoice_no_column:
@@ -149,25 +202,30 @@ class CSVImport(Document):
                     col_indices[field] = header_map[name]
                     break
 
-        # Extract data
-        mapped_data = []
-        for row in data_rows:
-            record = {}
-            for field, idx in col_indices.items():
-                if idx < len(row):
-                    value = row[idx].strip()
-                    # Convert to appropriate type
-                    if field in ["grand_total", "vat_amount"]:
-                        value = self.parse_amount(value)
-                    elif field == "posting_date":
-                        value = self.parse_date(value)
-                    record[field] = value
+        return col_indices
 
-            # Only include if has invoice number
-            if record.get("invoice_no"):
-                mapped_data.append(record)
+    def get_mapping_plan(self, header: list, sample_rows: list) -> list:
+        """
+        Compile the column mapping into (field, column index, converter) tuples
 
-        return mapped_data
+        Amount columns get the precompiled amount cleaner. The date format is
+        detected once from the sample rows and parsed with strptime; values
+        in any other format still go through dateutil.
+        """
+        plan = []
+        for field, idx in self.get_column_indices(header).items():
+            if field in AMOUNT_FIELDS:
+                convert = parse_amount_cell
+            elif field == "posting_date":
+                convert = get_date_parser(
+                    detect_date_format([row[idx].strip() for row in sample_rows if idx < len(row)])
+                )
+            else:
+                convert = None
+
+            plan.append((field, idx, convert))
+
+        return plan
 
     def normalize_column_name(self, name: str) -> str:
         """Normalize column name for matching"""
@@ -175,23 +233,11 @@ class CSVImport(Document):
 
     def parse_amount(self, value: str) -> float:
         """Parse amount string to float"""
-        if not value:
-            return 0.0
-        # Remove currency symbols and commas
-        cleaned = cstr(value).replace(",", "").replace("AED", "").replace("$", "").strip()
-        return flt(cleaned)
+        return parse_amount_cell(cstr(value))[0]
 
     def parse_date(self, value: str) -> str:
         """Parse date string to standard format"""
-        if not value:
-            return ""
-        try:
-            # Try common date formats
-            from dateutil.parser import parse
-            dt = parse(value, dayfirst=True)
-            return dt.strftime("%Y-%m-%d")
-        except Exception:
-            return cstr(value)
+        return parse_date_cell(value)[0]
 
     def generate_preview(self, sample_data: list):
         """Generate HTML preview table - stored in memory only (HTML field)"""
@@ -246,8 +292,59 @@ class CSVImport(Document):
         # HTML fields don't have DB columns, just set on document
         self.preview_html = html
 
-    def get_invoice_data(self) -> dict:
-        """Return parsed data as dict keyed by invoice number"""
+    def save_parsed_data(self, mapped_data: list):
+        """
+        Store mapped rows as a private columnar file (see reconciliation.columnar)
+        instead of a JSON blob in parsed_data, replacing any earlier file.
+        """
+        from digicomply.reconciliation.columnar import write_columnar
+
+        self.delete_parsed_data_file()
+
+        file_doc = frappe.get_doc({
+            "doctype": "File",
+            "file_name": f"{self.name}-parsed.zip",
+            "content": write_columnar(mapped_data, PARSED_DATA_COLUMNS),
+            "attached_to_doctype": self.doctype,
+            "attached_to_name": self.name,
+            "attached_to_field": "parsed_data_file",
+            "is_private": 1,
+        })
+        file_doc.save(ignore_permissions=True)
+
+        self.db_set("parsed_data_file", file_doc.file_url)
+        self.db_set("parsed_data", None)
+
+    def delete_parsed_data_file(self):
+        """Remove the columnar file of an earlier parse"""
+        if not self.parsed_data_file:
+            return
+
+        for file_name in frappe.get_all(
+            "File",
+            filters={
+                "file_url": self.parsed_data_file,
+                "attached_to_doctype": self.doctype,
+                "attached_to_name": self.name,
+            },
+            pluck="name"
+        ):
+            frappe.delete_doc("File", file_name, ignore_permissions=True)
+
+    def get_invoice_data(self, columns=None):
+        """
+        Return parsed data as a mapping keyed by invoice number.
+
+        Rows are read lazily from the columnar file; columns limits them to
+        the fields the caller needs. Imports parsed before the columnar file
+        existed fall back to the parsed_data JSON.
+        """
+        if self.parsed_data_file:
+            from digicomply.reconciliation.columnar import ColumnarInvoiceData
+
+            file_doc = frappe.get_doc("File", {"file_url": self.parsed_data_file})
+            return ColumnarInvoiceData(file_doc.get_full_path(), columns)
+
         if not self.parsed_data:
             return {}
 
@@ -255,6 +352,91 @@ class CSVImport(Document):
         return {row.get("invoice_no"): row for row in data if row.get("invoice_no")}
 
 
+def parse_amount_cell(value: str) -> tuple:
+    """(amount, error) for an amount cell - unreadable amounts become 0.0"""
+    if not value:
+        return 0.0, None
+
+    cleaned = AMOUNT_NOISE.sub("", value).strip()
+    try:
+        return float(cleaned), None
+    except ValueError:
+        return 0.0, _("Not a valid amount")
+
+
+def parse_date_cell(value: str) -> tuple:
+    """(YYYY-MM-DD, error) for a date cell in any format dateutil understands"""
+    if not value:
+        return "", None
+
+    try:
+        from dateutil.parser import parse
+
+        # dayfirst would read ISO 2024-01-02 as 1 February
+        dayfirst = not ISO_DATE_PREFIX.match(value)
+        return parse(value, dayfirst=dayfirst).strftime("%Y-%m-%d"), None
+    except Exception:
+        return cstr(value), _("Not a valid date")
+
+
+def detect_date_format(values: list):
+    """
+    The DATE_FORMATS entry that parses the most non-empty sample values
+
+    Ties go to the earlier (day-first) format; None if nothing parses.
+    """
+    values = [v for v in values if v]
+
+    best_format, best_count = None, 0
+    for date_format in DATE_FORMATS:
+        count = 0
+        for value in values:
+            try:
+                datetime.strptime(value, date_format)
+                count += 1
+            except ValueError:
+                pass
+
+        if count > best_count:
+            best_format, best_count = date_format, count
+            if count == len(values):
+                break
+
+    return best_format
+
+
+def get_date_parser(date_format=None):
+    """
+    Date cell converter for one import
+
+    Parses with the detected fixed format, falling back to dateutil for
+    values in another format. Results are memoised since ASP exports
+    repeat the same few hundred dates over and over.
+    """
+    cache = {}
+
+    def parse(value):
+        result = cache.get(value)
+        if result is not None:
+            return result
+
+        result = None
+        if value and date_format:
+            try:
+                result = datetime.strptime(value, date_format).strftime("%Y-%m-%d"), None
+            except ValueError:
+                pass
+
+        if result is None:
+            result = parse_date_cell(value)
+
+        if len(cache) < DATE_CACHE_SIZE:
+            cache[value] = result
+        return result
+
+    return parse
+
+
 @frappe.whitelist()
 def process_csv(docname):
     """API endpoint to process CSV"""
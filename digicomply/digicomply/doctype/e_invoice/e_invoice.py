@@ -249,6 +249,31 @@ class EInvoice(Document):
     @frappe.whitelist()
     def submit_to_asp(self):
         """Submit e-invoice to ASP for processing"""
+        error = self._prepare_submission()
+        if error:
+            return error
+
+        # Prepare invoice data
+        invoice_data = self._prepare_invoice_data()
+
+        try:
+            from digicomply.digicomply.api.connector_framework import ConnectorFramework
+
+            framework = ConnectorFramework(self.asp_connection)
+            result = framework.push_invoice(invoice_data)
+
+        except Exception as e:
+            return self._record_submission_error(e)
+
+        return self._record_submission_result(result)
+
+    def _prepare_submission(self):
+        """
+        Validate, resolve the ASP connection and mark the invoice as pending
+
+        Returns:
+            dict: The failure result if the invoice cannot be submitted, else None
+        """
         # Validate first
         validation = self.validate_for_submission()
         if not validation.get("valid"):
@@ -276,23 +301,16 @@ class EInvoice(Document):
                 return {"success": False, "message": "No ASP connection configured for this company"}
             self.asp_connection = connection
 
-        asp = frappe.get_doc("ASP Connection", self.asp_connection)
-        self.asp_provider = asp.asp_provider
+        self.asp_provider = frappe.db.get_value("ASP Connection", self.asp_connection, "asp_provider")
 
         # Update status
         self.e_invoice_status = "Pending Submission"
         self.submission_date = now_datetime()
         self.submission_attempts = (self.submission_attempts or 0) + 1
 
-        # Prepare invoice data
-        invoice_data = self._prepare_invoice_data()
-
+    def _record_submission_result(self, result):
+        """Store the ASP's answer to a push and save"""
         try:
-            from digicomply.digicomply.api.connector_framework import ConnectorFramework
-
-            framework = ConnectorFramework(self.asp_connection)
-            result = framework.push_invoice(invoice_data)
-
             self.response_date = now_datetime()
 
             if result.get("success"):
@@ -313,13 +331,16 @@ class EInvoice(Document):
             return result
 
         except Exception as e:
-            self.e_invoice_status = "Error"
-            self.last_error = str(e)[:500]
-            self.response_date = now_datetime()
-            self._add_to_history("error", {"error": str(e)})
-            self.save()
+            return self._record_submission_error(e)
 
-            return {"success": False, "message": str(e)}
+    def _record_submission_error(self, error):
+        self.e_invoice_status = "Error"
+        self.last_error = str(error)[:500]
+        self.response_date = now_datetime()
+        self._add_to_history("error", {"error": str(error)})
+        self.save()
+
+        return {"success": False, "message": str(error)}
 
     def _prepare_invoice_data(self):
         """Prepare invoice data in PINT AE format for ASP"""
@@ -739,20 +760,68 @@ def bulk_create_e_invoices(sales_invoices):
 
 @frappe.whitelist()
 def bulk_submit_e_invoices(e_invoices):
-    """Submit multiple E-Invoices to ASP"""
+    """
+    Submit multiple E-Invoices to ASP
+
+    Invoices are pushed concurrently per ASP Connection (see
+    ConnectorFramework.push_invoices), PUSH_BATCH_SIZE at a time with one
+    commit per batch. Results are returned in the order given.
+    """
+    from digicomply.digicomply.api.connector_framework import ConnectorFramework, PUSH_BATCH_SIZE
+
     if isinstance(e_invoices, str):
         e_invoices = json.loads(e_invoices)
 
-    results = []
-    for inv in e_invoices:
-        try:
-            e_invoice = frappe.get_doc("E-Invoice", inv)
-            result = e_invoice.submit_to_asp()
-            results.append({"e_invoice": inv, **result})
-        except Exception as e:
-            results.append({"e_invoice": inv, "success": False, "error": str(e)})
+    # An invoice listed twice must not be pushed twice
+    e_invoices = list(dict.fromkeys(e_invoices))
 
-    return results
+    results = {}
+    frameworks = {}
+
+    for start in range(0, len(e_invoices), PUSH_BATCH_SIZE):
+        docs = {}
+        by_connection = {}
+
+        for inv in e_invoices[start:start + PUSH_BATCH_SIZE]:
+            try:
+                e_invoice = frappe.get_doc("E-Invoice", inv)
+                error = e_invoice._prepare_submission()
+                if error:
+                    results[inv] = error
+                    continue
+
+                docs[inv] = e_invoice
+                by_connection.setdefault(e_invoice.asp_connection, []).append(
+                    (inv, e_invoice._prepare_invoice_data())
+                )
+            except Exception as e:
+                results[inv] = {"success": False, "error": str(e)}
+
+        for connection, payloads in by_connection.items():
+            try:
+                if connection not in frameworks:
+                    frameworks[connection] = ConnectorFramework(connection)
+                pushed = frameworks[connection].push_invoices(payloads)
+            except Exception as e:
+                for inv, _data in payloads:
+                    results[inv] = _record_bulk_submission(docs[inv], error=e)
+                continue
+
+            for inv, _data in payloads:
+                results[inv] = _record_bulk_submission(docs[inv], result=pushed[inv])
+
+        frappe.db.commit()
+
+    return [{"e_invoice": inv, **results[inv]} for inv in e_invoices]
+
+
+def _record_bulk_submission(e_invoice, result=None, error=None):
+    try:
+        if error:
+            return e_invoice._record_submission_error(error)
+        return e_invoice._record_submission_result(result)
+    except Exception as e:
+        return {"success": False, "error": str(e)}
 
 
 def auto_create_e_invoice(doc, method):
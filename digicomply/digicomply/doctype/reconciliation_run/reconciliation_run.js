@@ -6,6 +6,9 @@ frappe.ui.form.on('Reconciliation Run', {
         // Add CSS for color-coded rows
         frm.trigger('add_custom_styles');
 
+        // Subscribe to live progress from the background job
+        frm.trigger('setup_realtime');
+
         // Add visual dashboard summary
         frm.trigger('add_visual_dashboard');
 
@@ -620,18 +623,43 @@ frappe.ui.form.on('Reconciliation Run', {
 
     do_reconciliation: function(frm) {
         frappe.call({
-            method: 'run_reconciliation',
+            method: 'enqueue_reconciliation',
             doc: frm.doc,
-            freeze: true,
-            freeze_message: __('Running reconciliation...'),
             callback: function(r) {
-                if (r.message && r.message.status === 'success') {
-                    frm.reload_doc();
+                if (r.message) {
                     frappe.show_alert({
-                        message: __('Reconciliation completed successfully'),
-                        indicator: 'green'
+                        message: r.message.message,
+                        indicator: 'blue'
                     });
+                    frm.reload_doc();
+                }
+            }
+        });
+    },
+
+    setup_realtime: function(frm) {
+        // Unsubscribe from previous subscriptions
+        frappe.realtime.off('reconciliation_progress');
+
+        frappe.realtime.on('reconciliation_progress', function(data) {
+            if (data.reconciliation_run !== frm.doc.name) return;
+
+            if (data.stage === 'Completed') {
+                frappe.hide_progress();
+                frm.reload_doc();
+                frappe.show_alert({
+                    message: __('Reconciliation completed successfully'),
+                    indicator: 'green'
+                });
+            } else if (data.stage === 'Failed') {
+                frappe.hide_progress();
+                frm.reload_doc();
+            } else {
+                let description = __(data.stage);
+                if (data.total) {
+                    description += ` (${data.loaded || 0} / ${data.total})`;
                 }
+                frappe.show_progress(__('Reconciliation'), data.progress || 0, 100, description);
             }
         });
     },
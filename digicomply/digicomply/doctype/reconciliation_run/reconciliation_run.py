@@ -1,14 +1,68 @@
 # Copyright (c) 2024, DigiComply and contributors
 # License: MIT
 
+import hashlib
+import json
 import re
+import time
+
 import frappe
 from frappe import _
 from frappe.model.document import Document
-from frappe.utils import flt, cint, getdate, now_datetime
+from frappe.utils import add_months, flt, cint, cstr, getdate, get_first_day, get_last_day, now_datetime
 from difflib import SequenceMatcher
 
 
+# Reconciliation Item columns written by create_reconciliation_items
+RECONCILIATION_ITEM_FIELDS = [
+    "invoice_no",
+    "match_status",
+    "erp_grand_total",
+    "asp_grand_total",
+    "customer",
+    "posting_date",
+    "differences",
+    "action_required",
+    "asp_invoice_no",
+    "erp_fingerprint",
+    "asp_fingerprint",
+    "resolution_status",
+    "resolution_notes",
+    "resolved_by",
+    "resolved_on",
+]
+
+# Large group-wide runs can take a while on the long queue
+RECONCILIATION_JOB_TIMEOUT = 4 * 3600
+
+# Runs without progress for this long are treated as abandoned by a dead worker
+STALLED_RUN_MINUTES = 30
+
+# Abandoned runs are re-queued this many times before being marked Failed
+# (digicomply_max_reconciliation_resumes in site_config)
+MAX_RUN_RESUMES = 3
+
+# CSV Import columns reconciliation reads (see compare_invoice_pairs)
+ASP_INVOICE_COLUMNS = ["invoice_no", "posting_date", "grand_total", "vat_amount"]
+
+# Empty result buckets, see match_invoices_enhanced
+RESULT_KEYS = ("matched", "mismatched", "missing_in_asp", "missing_in_erp")
+
+# Reconciliation Item match_status -> result bucket
+MATCH_STATUS_KEYS = {
+    "Matched": "matched",
+    "Mismatched": "mismatched",
+    "Missing in ASP": "missing_in_asp",
+    "Missing in Books": "missing_in_erp",
+}
+
+# Sales Invoice columns reconciliation reads (see iter_erp_invoices_for_company)
+ERP_INVOICE_FIELDS = [
+    "name", "company", "posting_date", "customer", "customer_name",
+    "grand_total", "total_taxes_and_charges", "tax_id",
+]
+
+
 class ReconciliationRun(Document):
     """
     Reconciliation Run - Core MVP DocType
@@ -72,10 +126,80 @@ class ReconciliationRun(Document):
         return tolerance if tolerance else 0.5
 
     def on_submit(self):
-        """Run reconciliation when submitted"""
-        self.run_reconciliation()
+        """Queue reconciliation when submitted"""
+        self.enqueue_reconciliation()
+
+    def get_job_id(self):
+        """Background job id - one reconciliation job per run at a time"""
+        return f"reconciliation_run::{self.name}"
+
+    def get_shard_key(self, *parts):
+        """Cache key for parallel run bookkeeping"""
+        return "::".join([self.get_job_id(), "shards", *[cstr(p) for p in parts]])
+
+    def has_live_job(self):
+        """True if the main, shard or merge job of this run is queued or running"""
+        from frappe.utils.background_jobs import is_job_enqueued
+
+        job_ids = [self.get_job_id(), self.get_shard_key("merge")]
+        job_ids += frappe.cache().get_value(self.get_shard_key("jobs")) or []
+
+        return any(is_job_enqueued(job_id) for job_id in job_ids)
 
     @frappe.whitelist()
+    def enqueue_reconciliation(self, resume_count=0):
+        """
+        Run reconciliation as a background job on the long queue.
+
+        Idempotent: if a job for this run is already queued or running,
+        nothing new is enqueued. resume_count is the number of times the
+        run was re-queued after its worker died (see
+        resume_stalled_reconciliations); a user queueing it starts over.
+        """
+        job_id = self.get_job_id()
+        if self.has_live_job():
+            return {"status": "already_queued", "message": _("Reconciliation is already queued")}
+
+        self.db_set("status", "Queued")
+        self.db_set("resume_count", cint(resume_count), update_modified=False)
+
+        frappe.enqueue(
+            "digicomply.digicomply.doctype.reconciliation_run.reconciliation_run.execute_reconciliation",
+            docname=self.name,
+            queue="long",
+            timeout=RECONCILIATION_JOB_TIMEOUT,
+            job_id=job_id,
+            deduplicate=True,
+            enqueue_after_commit=True,
+        )
+
+        self.publish_progress("Queued", 0)
+
+        return {"status": "queued", "message": _("Reconciliation queued. Progress will update live.")}
+
+    def publish_progress(self, stage, percent, **details):
+        """
+        Record the current stage and push it to the form via realtime.
+
+        The stage is committed so it survives a worker crash and shows where
+        an interrupted run stopped.
+        """
+        if self.progress_stage != stage:
+            self.db_set("progress_stage", stage, update_modified=False)
+            frappe.db.commit()
+
+        frappe.publish_realtime(
+            "reconciliation_progress",
+            {
+                "reconciliation_run": self.name,
+                "stage": stage,
+                "progress": flt(percent, 2),
+                **details,
+            },
+            doctype=self.doctype,
+            docname=self.name,
+        )
+
     def run_reconciliation(self):
         """
         Enhanced reconciliation logic with multi-company and fuzzy matching support.
@@ -88,44 +212,234 @@ class ReconciliationRun(Document):
         6. Track missing in ASP/books
         7. Use tolerance for amount comparison
         8. Update counts and match percentage
+
+        Runs inside the background job (execute_reconciliation); clients
+        go through enqueue_reconciliation.
         """
         self.db_set("status", "In Progress")
+        self.db_set("started_on", now_datetime(), update_modified=False)
         frappe.db.commit()
 
         try:
             # Step 1: Get companies to reconcile
             companies = self.get_companies_to_reconcile()
 
-            # Step 2: Get book invoices for all companies
-            erp_invoices = {}
-            batch_size = cint(self.batch_size) or 1000
+            shards = self.get_shards(companies)
+            if len(shards) > 1:
+                self.enqueue_shards(shards)
+                return {"status": "queued", "message": _("Reconciliation split into {0} parallel jobs").format(len(shards))}
 
-            for company in companies:
-                company_invoices = self.get_erp_invoices_for_company(company, batch_size)
-                erp_invoices.update(company_invoices)
+            # A delta run only re-matches what changed since its base run
+            base_run = self.get_base_run()
+            if base_run:
+                results, carry_over = self.match_changed_invoices(base_run, companies)
+                self.save_results(results, carry_over)
+                return {"status": "success", "results": results}
+
+            # Step 2: Stream book invoices for all companies in chunks
+            batch_size = cint(self.batch_size) or 1000
+            erp_chunks = self.iter_erp_invoice_chunks(companies, batch_size)
 
             # Step 3: Get ASP data
+            self.publish_progress("Loading ASP Data", 5)
             asp_invoices = self.get_asp_invoices()
 
-            # Step 4: Perform enhanced matching
-            results = self.match_invoices_enhanced(erp_invoices, asp_invoices)
+            # Step 4: Perform enhanced matching (consumes book invoices chunk by chunk)
+            results = self.match_invoices_enhanced(erp_chunks, asp_invoices)
+
+            # Steps 5-6: Create reconciliation items and update summary counts
+            self.save_results(results)
+
+            return {"status": "success", "results": results}
 
-            # Step 5: Create reconciliation items
-            self.create_reconciliation_items(results)
+        except Exception as e:
+            self.mark_failed(e)
 
-            # Step 6: Update summary counts
+    def save_results(self, results: dict, carry_over=None):
+        """
+        Write reconciliation items and summary counts, then mark the run Completed
+
+        carry_over selects base run rows copied over as they are (see
+        match_changed_invoices); counts then come from the stored items.
+        """
+        self.publish_progress("Saving Results", 80)
+        saved = self.create_reconciliation_items(results, carry_over)
+
+        if cint(self.delta_mode):
+            self.db_set("carried_forward_count", saved["copied"] + sum(
+                1 for item in results["matched"] + results["mismatched"]
+                if item.get("carried_forward")
+            ))
+
+        if carry_over:
+            self.set_counts(self.get_item_counts())
+        else:
             self.update_counts(results)
 
-            self.db_set("status", "Completed")
-            frappe.db.commit()
+        self.db_set("status", "Completed")
+        self.db_set("progress_stage", "Completed", update_modified=False)
+        frappe.db.commit()
 
-            return {"status": "success", "results": results}
+        self.publish_progress("Completed", 100)
 
-        except Exception as e:
-            self.db_set("status", "Failed")
-            frappe.db.commit()
-            frappe.log_error(title="Reconciliation Failed", message=str(e))
-            frappe.throw(_("Reconciliation failed: {0}").format(str(e)))
+    def mark_failed(self, error):
+        """Mark the run Failed, notify the form and re-raise as a user-facing error"""
+        self.db_set("status", "Failed")
+        frappe.db.commit()
+        frappe.publish_realtime(
+            "reconciliation_progress",
+            {"reconciliation_run": self.name, "stage": "Failed", "error": str(error)},
+            doctype=self.doctype,
+            docname=self.name,
+        )
+        frappe.log_error(title="Reconciliation Failed", message=str(error))
+        frappe.throw(_("Reconciliation failed: {0}").format(str(error)))
+
+    def get_shards(self, companies):
+        """
+        Split the run into independent units of work for parallel mode.
+
+        One shard per company, or per company and calendar month when
+        shard_by is "Company and Month". Without run_in_parallel the whole
+        run is a single shard.
+        """
+        if not cint(self.run_in_parallel):
+            return [{"company": None, "from_date": self.from_date, "to_date": self.to_date}]
+
+        if self.shard_by == "Company and Month":
+            periods = get_month_ranges(self.from_date, self.to_date)
+        else:
+            periods = [(self.from_date, self.to_date)]
+
+        return [
+            {"company": company, "from_date": cstr(from_date), "to_date": cstr(to_date)}
+            for company in companies
+            for from_date, to_date in periods
+        ]
+
+    def enqueue_shards(self, shards):
+        """
+        Queue one exact-matching job per shard on the long queue.
+
+        Every shard stores its results in the cache and bumps a shared
+        counter; the shard that completes the set queues the merge job
+        (see merge_shards). shard_run_id keeps results of an interrupted
+        earlier attempt from leaking into this one.
+        """
+        shard_run_id = frappe.generate_hash(length=10)
+        job_ids = [self.get_shard_key(shard_run_id, index) for index in range(len(shards))]
+
+        # Resolve the delta base once so every shard carries forward from the same run
+        self.get_base_run()
+
+        frappe.cache().set_value(self.get_shard_key("jobs"), job_ids, expires_in_sec=RECONCILIATION_JOB_TIMEOUT)
+
+        for index, shard in enumerate(shards):
+            frappe.enqueue(
+                "digicomply.digicomply.doctype.reconciliation_run.reconciliation_run.execute_reconciliation_shard",
+                docname=self.name,
+                shard_run_id=shard_run_id,
+                shard_index=index,
+                shard_count=len(shards),
+                queue="long",
+                timeout=RECONCILIATION_JOB_TIMEOUT,
+                job_id=job_ids[index],
+                deduplicate=True,
+                enqueue_after_commit=True,
+                **shard,
+            )
+
+        self.publish_progress("Loading Book Invoices", 10, shards=len(shards))
+
+    def run_shard(self, shard_run_id, shard_index, shard_count, company, from_date, to_date):
+        """
+        Exact-match one shard of book invoices and park the outcome in the cache.
+
+        Only exact matching happens here: book invoice numbers are unique, so
+        shards never compete for the same ASP row. Fuzzy matching needs every
+        leftover invoice at once and runs in merge_shards.
+        """
+        batch_size = cint(self.batch_size) or 1000
+
+        erp_invoices = {}
+        for chunk in self.iter_erp_invoices_for_company(company, batch_size, from_date, to_date):
+            erp_invoices.update(chunk)
+
+        asp_invoices = self.get_asp_invoices()
+        carry_forward = self.get_carry_forward_items(list(erp_invoices), exact_only=True)
+
+        results = {key: [] for key in RESULT_KEYS}
+        asp_matched = set()
+        erp_unmatched = self.exact_match_invoices(erp_invoices, asp_invoices, carry_forward, results, asp_matched)
+
+        # Store finished rows rather than full invoice pairs to keep the payload small
+        payload = {
+            status_key: [
+                {
+                    "invoice_no": item["invoice_no"],
+                    "carried_forward": item.get("carried_forward"),
+                    "item_row": self.get_reconciliation_item_row(item, status_key),
+                }
+                for item in results[status_key]
+            ]
+            for status_key in ("matched", "mismatched")
+        }
+        payload["erp_unmatched"] = erp_unmatched
+        payload["asp_matched"] = list(asp_matched)
+
+        cache = frappe.cache()
+        cache.set_value(self.get_shard_key(shard_run_id, shard_index, "results"), payload,
+            expires_in_sec=RECONCILIATION_JOB_TIMEOUT)
+
+        counter_key = cache.make_key(self.get_shard_key(shard_run_id, "done"))
+        done = cache.incr(counter_key)
+        cache.expire(counter_key, RECONCILIATION_JOB_TIMEOUT)
+
+        self.publish_progress(
+            "Exact Matching", 10 + 40 * done / shard_count,
+            company=company, shards_done=done, shards=shard_count
+        )
+
+        if done == shard_count:
+            frappe.enqueue(
+                "digicomply.digicomply.doctype.reconciliation_run.reconciliation_run.execute_reconciliation_merge",
+                docname=self.name,
+                shard_run_id=shard_run_id,
+                shard_count=shard_count,
+                queue="long",
+                timeout=RECONCILIATION_JOB_TIMEOUT,
+                job_id=self.get_shard_key("merge"),
+                deduplicate=True,
+                enqueue_after_commit=True,
+            )
+
+    def merge_shards(self, shard_run_id, shard_count):
+        """Combine shard results, fuzzy-match the leftovers and save the run"""
+        cache = frappe.cache()
+
+        results = {key: [] for key in RESULT_KEYS}
+        asp_matched = set()
+        erp_unmatched = {}
+
+        for shard_index in range(shard_count):
+            payload = cache.get_value(self.get_shard_key(shard_run_id, shard_index, "results"))
+            if payload is None:
+                frappe.throw(_("Results of reconciliation shard {0} are missing or expired").format(shard_index + 1))
+
+            results["matched"].extend(payload["matched"])
+            results["mismatched"].extend(payload["mismatched"])
+            erp_unmatched.update(payload["erp_unmatched"])
+            asp_matched.update(payload["asp_matched"])
+
+        asp_invoices = self.get_asp_invoices()
+        self.match_remaining_invoices(erp_unmatched, asp_invoices, results, asp_matched)
+
+        self.save_results(results)
+
+        for shard_index in range(shard_count):
+            cache.delete_value(self.get_shard_key(shard_run_id, shard_index, "results"))
+        cache.delete(cache.make_key(self.get_shard_key(shard_run_id, "done")))
+        cache.delete_value(self.get_shard_key("jobs"))
 
     def get_erp_invoices(self):
         """Fetch Sales Invoices from books (legacy single-company method)"""
@@ -134,35 +448,88 @@ class ReconciliationRun(Document):
     def get_erp_invoices_for_company(self, company, batch_size=None):
         """
         Fetch Sales Invoices from books for a specific company.
-        Supports batch processing for large datasets.
+        Reads all invoices in the date range, batch_size rows at a time.
         """
-        if batch_size is None:
-            batch_size = cint(self.batch_size) or 1000
+        invoices = {}
+        for chunk in self.iter_erp_invoices_for_company(company, batch_size):
+            invoices.update(chunk)
+
+        return invoices
+
+    def iter_erp_invoice_chunks(self, companies, batch_size=None):
+        """Yield book invoice chunks for each company in turn, publishing progress"""
+        total = sum(
+            frappe.db.count("Sales Invoice", {
+                "company": company,
+                "posting_date": ["between", [self.from_date, self.to_date]],
+                "docstatus": 1,
+            })
+            for company in companies
+        )
+        self.publish_progress("Loading Book Invoices", 10, total=total)
+
+        # Each chunk is exact-matched by the consumer before the next one is read
+        loaded = 0
+        for company in companies:
+            for chunk in self.iter_erp_invoices_for_company(company, batch_size):
+                yield chunk
+                loaded += len(chunk)
+                self.publish_progress(
+                    "Exact Matching", 10 + 40 * loaded / max(total, 1),
+                    company=company, loaded=loaded, total=total
+                )
 
-        filters = {
-            "company": company,
-            "posting_date": ["between", [self.from_date, self.to_date]],
-            "docstatus": 1,  # Submitted only
-        }
+    def iter_erp_invoices_for_company(self, company, batch_size=None, from_date=None, to_date=None):
+        """
+        Stream submitted Sales Invoices for a company in the date range.
 
-        invoices = frappe.get_all(
-            "Sales Invoice",
-            filters=filters,
-            fields=[
-                "name",
-                "company",
-                "posting_date",
-                "customer",
-                "customer_name",
-                "grand_total",
-                "total_taxes_and_charges",
-                "tax_id",  # Customer TRN
-            ],
-            limit_page_length=batch_size
-        )
+        Uses keyset pagination on (posting_date, name) so every page is an
+        index range scan regardless of depth, and nothing past batch_size
+        is silently dropped. Yields dicts of up to batch_size invoices
+        keyed by invoice number. from_date/to_date narrow the run period
+        (used by month shards).
+        """
+        if batch_size is None:
+            batch_size = cint(self.batch_size) or 1000
 
-        # Create lookup dict by invoice number
-        return {inv.name: inv for inv in invoices}
+        last_date, last_name = None, None
+
+        while True:
+            values = {
+                "company": company,
+                "from_date": from_date or self.from_date,
+                "to_date": to_date or self.to_date,
+                "last_date": last_date,
+                "last_name": last_name,
+                "limit": batch_size,
+            }
+
+            invoices = frappe.db.sql("""
+                SELECT {fields}
+                FROM `tabSales Invoice`
+                WHERE company = %(company)s
+                    AND docstatus = 1
+                    AND posting_date BETWEEN %(from_date)s AND %(to_date)s
+                    {keyset_filter}
+                ORDER BY posting_date ASC, name ASC
+                LIMIT %(limit)s
+            """.format(
+                fields=", ".join(ERP_INVOICE_FIELDS),
+                keyset_filter=(
+                    "AND (posting_date > %(last_date)s"
+                    " OR (posting_date = %(last_date)s AND name > %(last_name)s))"
+                ) if last_name else ""
+            ), values, as_dict=True)
+
+            if not invoices:
+                break
+
+            yield {inv.name: inv for inv in invoices}
+
+            if len(invoices) < batch_size:
+                break
+
+            last_date, last_name = invoices[-1].posting_date, invoices[-1].name
 
     def get_asp_invoices(self):
         """
@@ -173,78 +540,485 @@ class ReconciliationRun(Document):
             return {}
 
         csv_doc = frappe.get_doc("CSV Import", self.csv_import)
-        return csv_doc.get_invoice_data()
+        return csv_doc.get_invoice_data(columns=ASP_INVOICE_COLUMNS)
+
+    def find_base_run(self):
+        """Last completed run for the same company, group and period"""
+        runs = frappe.get_all(
+            "Reconciliation Run",
+            filters={
+                "docstatus": 1,
+                "status": "Completed",
+                "company": self.company,
+                "company_group": self.company_group or ["is", "not set"],
+                "from_date": self.from_date,
+                "to_date": self.to_date,
+                "name": ["!=", self.name],
+            },
+            pluck="name",
+            order_by="modified desc",
+            limit=1
+        )
+        return runs[0] if runs else None
+
+    def get_base_run(self):
+        """
+        Base run a delta run carries forward from, or None.
+
+        Unchanged base rows are copied over wholesale, so the base run must
+        cover the same company, group and period. A base run with a
+        different tolerance or fuzzy setting could classify pairs
+        differently, so it is not used either.
+        """
+        if not cint(self.delta_mode):
+            return None
+
+        base_run = self.base_reconciliation_run or self.find_base_run()
+        if not base_run:
+            return None
+
+        base = frappe.db.get_value(
+            "Reconciliation Run",
+            base_run,
+            ["status", "tolerance_amount", "use_fuzzy_matching", "company", "company_group", "from_date", "to_date"],
+            as_dict=True
+        )
+        if not base or base.status != "Completed":
+            return None
+        if flt(base.tolerance_amount) != flt(self.tolerance_amount):
+            return None
+        if cint(base.use_fuzzy_matching) != cint(self.use_fuzzy_matching):
+            return None
+        if (cstr(base.company), cstr(base.company_group)) != (cstr(self.company), cstr(self.company_group)):
+            return None
+        if (getdate(base.from_date), getdate(base.to_date)) != (getdate(self.from_date), getdate(self.to_date)):
+            return None
+
+        if self.base_reconciliation_run != base_run:
+            self.db_set("base_reconciliation_run", base_run)
+
+        return base_run
+
+    def get_carry_forward_items(self, invoice_nos: list, exact_only=False) -> dict:
+        """
+        Matched pairs from the base run that a delta run may carry forward.
+
+        Returns the base Reconciliation Item rows of invoice_nos, keyed by
+        book invoice number and read batch_size invoices at a time, empty
+        unless delta_mode is on and get_base_run finds a base run.
+        exact_only skips fuzzy pairs, which parallel shards cannot safely
+        claim.
+        """
+        base_run = self.get_base_run()
+        if not base_run:
+            return {}
+
+        batch_size = cint(self.batch_size) or 1000
+
+        carry_forward = {}
+        for start in range(0, len(invoice_nos), batch_size):
+            for row in frappe.get_all(
+                "Reconciliation Item",
+                filters={
+                    "parent": base_run,
+                    "parenttype": self.doctype,
+                    "match_status": ["in", ["Matched", "Mismatched"]],
+                    "erp_fingerprint": ["is", "set"],
+                    "invoice_no": ["in", invoice_nos[start:start + batch_size]],
+                },
+                fields=RECONCILIATION_ITEM_FIELDS,
+                order_by="idx asc",
+                limit_page_length=0
+            ):
+                if exact_only and row.asp_invoice_no and row.asp_invoice_no != row.invoice_no:
+                    continue
+                carry_forward[row.invoice_no] = row
+
+        return carry_forward
+
+    def match_changed_invoices(self, base_run, companies):
+        """
+        Delta run: match only what changed since base_run.
+
+        Changed numbers are book invoices modified since the base run
+        started plus ASP rows that are new, gone or whose fingerprint
+        changed (see get_changed_asp_invoices). Base rows touching none of
+        them are copied in SQL when the results are saved; the rows that do
+        are matched again, together with their former partners. With fuzzy
+        matching every unpaired row is matched again, as a changed row may
+        now pair with it.
+
+        Returns:
+            tuple: (results for the re-matched invoices, carry_over for save_results)
+        """
+        self.publish_progress("Finding Changes", 5)
+        since = self.get_delta_since(base_run)
+
+        asp_invoices = self.get_asp_invoices()
+        changed = self.get_changed_book_invoices(companies, since)
+        changed |= self.get_changed_asp_invoices(base_run, asp_invoices, since)
+
+        carry_over = self.get_carry_over_condition(base_run, changed, since)
+
+        erp_nos, asp_nos = set(changed), set(changed)
+        for row in self.get_uncopied_base_rows(carry_over):
+            if row.match_status != "Missing in Books":
+                erp_nos.add(row.invoice_no)
+            asp_nos.add(row.asp_invoice_no or row.invoice_no)
+
+        self.publish_progress("Exact Matching", 10, changed=len(changed), total=len(erp_nos))
+        erp_invoices = self.get_erp_invoices_by_name(companies, list(erp_nos))
+        if hasattr(asp_invoices, "get_rows"):
+            asp_changed = asp_invoices.get_rows(asp_nos)
+        else:
+            asp_changed = {inv_no: asp_invoices[inv_no] for inv_no in asp_nos if inv_no in asp_invoices}
+
+        # Re-matched pairs whose fingerprints are unchanged still keep their base row
+        carry_forward = self.get_carry_forward_items(list(erp_invoices))
+        results = self.match_invoices_enhanced(erp_invoices, asp_changed, carry_forward)
+
+        return results, carry_over
+
+    def get_delta_since(self, base_run):
+        """When base_run started reading book invoices (creation for runs older than started_on)"""
+        started_on, creation = frappe.db.get_value("Reconciliation Run", base_run, ["started_on", "creation"])
+        return started_on or creation
+
+    def get_changed_book_invoices(self, companies, since) -> set:
+        """
+        Numbers of Sales Invoices submitted, cancelled or amended since a time
 
-    def match_invoices_enhanced(self, erp_invoices: dict, asp_invoices: dict) -> dict:
+        Not limited to the run period, so invoices moved out of it are
+        caught too.
+        """
+        return set(frappe.get_all(
+            "Sales Invoice",
+            filters={
+                "company": ["in", companies],
+                "docstatus": ["in", [1, 2]],
+                "modified": [">", since],
+            },
+            pluck="name",
+            limit_page_length=0
+        ))
+
+    def get_changed_asp_invoices(self, base_run, asp_invoices, since) -> set:
+        """
+        ASP invoice numbers that are new, gone or changed since base_run
+
+        Nothing changed when both runs read the same CSV Import and it was
+        not re-processed since. Otherwise base rows are streamed a batch at
+        a time and their ASP fingerprints compared with asp_invoices.
+        """
+        base_import = frappe.db.get_value("Reconciliation Run", base_run, "csv_import")
+        if base_import == self.csv_import and (
+            not self.csv_import or frappe.db.get_value("CSV Import", self.csv_import, "modified") <= since
+        ):
+            return set()
+
+        batch_size = cint(self.batch_size) or 1000
+        changed, seen = set(), set()
+        last_name = ""
+
+        while True:
+            rows = frappe.db.sql("""
+                SELECT name, asp_invoice_no, asp_fingerprint
+                FROM `tabReconciliation Item`
+                WHERE parent = %(parent)s AND parenttype = %(parenttype)s AND parentfield = 'items'
+                    AND IFNULL(asp_invoice_no, '') != '' AND name > %(last_name)s
+                ORDER BY name ASC
+                LIMIT %(limit)s
+            """, {"parent": base_run, "parenttype": self.doctype, "last_name": last_name, "limit": batch_size},
+                as_dict=True)
+
+            for row in rows:
+                asp_inv = asp_invoices.get(row.asp_invoice_no)
+                seen.add(row.asp_invoice_no)
+                if asp_inv is None or row.asp_fingerprint != self.get_asp_fingerprint(row.asp_invoice_no, asp_inv):
+                    changed.add(row.asp_invoice_no)
+
+            if len(rows) < batch_size:
+                break
+            last_name = rows[-1].name
+
+        changed.update(inv_no for inv_no in asp_invoices if inv_no not in seen)
+        return changed
+
+    def get_carry_over_condition(self, base_run, changed: set, since):
+        """
+        SQL condition on base run items (aliased item) that a delta run copies as they are
+
+        A row is copied when neither of its invoice numbers changed and its
+        book invoice is still the same submitted one. Returns (condition,
+        values) for copy_base_items and get_uncopied_base_rows.
+        """
+        values = {"base_run": base_run, "parenttype": self.doctype, "since": since}
+        conditions = [
+            """(item.match_status = 'Missing in Books' OR EXISTS (
+                SELECT 1 FROM `tabSales Invoice` si
+                WHERE si.name = item.invoice_no AND si.docstatus = 1 AND si.modified <= %(since)s
+            ))"""
+        ]
+
+        if changed:
+            values["changed"] = tuple(changed)
+            conditions.append("item.invoice_no NOT IN %(changed)s")
+            conditions.append("IFNULL(item.asp_invoice_no, '') NOT IN %(changed)s")
+
+        # A changed row may fuzzy-match any row that was left unpaired
+        if cint(self.use_fuzzy_matching):
+            conditions.append("item.match_status IN ('Matched', 'Mismatched')")
+
+        return " AND ".join(conditions), values
+
+    def get_uncopied_base_rows(self, carry_over):
+        """Base run items carry_over leaves out, which are matched again"""
+        condition, values = carry_over
+        return frappe.db.sql(f"""
+            SELECT item.invoice_no, item.asp_invoice_no, item.match_status
+            FROM `tabReconciliation Item` item
+            WHERE item.parent = %(base_run)s AND item.parenttype = %(parenttype)s AND item.parentfield = 'items'
+                AND NOT ({condition})
+        """, values, as_dict=True)
+
+    def copy_base_items(self, carry_over) -> int:
+        """
+        Copy the base run items carry_over selects into this run with one INSERT ... SELECT
+
+        Rows keep their order, fingerprints and resolution. Names are
+        derived from the base row names, so they stay unique. Returns the
+        number of rows copied.
+        """
+        condition, values = carry_over
+        columns = ", ".join(f"`{field}`" for field in RECONCILIATION_ITEM_FIELDS)
+        item_columns = ", ".join(f"item.`{field}`" for field in RECONCILIATION_ITEM_FIELDS)
+
+        frappe.db.sql(f"""
+            INSERT INTO `tabReconciliation Item` (
+                name, owner, creation, modified, modified_by, docstatus,
+                parent, parenttype, parentfield, idx, {columns}
+            )
+            SELECT
+                SUBSTRING(SHA1(CONCAT(%(parent)s, item.name)), 1, 10), %(user)s, %(now)s, %(now)s, %(user)s,
+                %(docstatus)s, %(parent)s, %(parenttype)s, 'items', ROW_NUMBER() OVER (ORDER BY item.idx),
+                {item_columns}
+            FROM `tabReconciliation Item` item
+            WHERE item.parent = %(base_run)s AND item.parenttype = %(parenttype)s AND item.parentfield = 'items'
+                AND {condition}
+        """, {
+            **values,
+            "parent": self.name,
+            "docstatus": self.docstatus,
+            "user": frappe.session.user,
+            "now": now_datetime(),
+        })
+
+        return frappe.db.count("Reconciliation Item", {
+            "parent": self.name,
+            "parenttype": self.doctype,
+            "parentfield": "items",
+        })
+
+    def get_erp_invoices_by_name(self, companies, invoice_nos) -> dict:
+        """
+        Submitted Sales Invoices of the run among invoice_nos, keyed by invoice number
+
+        Ordered by posting date and name, as iter_erp_invoices_for_company
+        yields them, so fuzzy matching sees them in the same order.
+        """
+        batch_size = cint(self.batch_size) or 1000
+
+        invoices = []
+        for start in range(0, len(invoice_nos), batch_size):
+            invoices += frappe.get_all(
+                "Sales Invoice",
+                filters={
+                    "name": ["in", invoice_nos[start:start + batch_size]],
+                    "company": ["in", companies],
+                    "docstatus": 1,
+                    "posting_date": ["between", [self.from_date, self.to_date]],
+                },
+                fields=ERP_INVOICE_FIELDS,
+                limit_page_length=0
+            )
+
+        invoices.sort(key=lambda inv: (getdate(inv.posting_date), inv.name))
+        return {inv.name: inv for inv in invoices}
+
+    def get_erp_fingerprint(self, erp_inv: dict) -> str:
+        """Fingerprint of the book invoice fields reconciliation compares"""
+        return get_invoice_fingerprint(
+            erp_inv.get("name"),
+            erp_inv.get("grand_total"),
+            erp_inv.get("total_taxes_and_charges"),
+            erp_inv.get("posting_date"),
+        )
+
+    def get_asp_fingerprint(self, inv_no: str, asp_inv: dict) -> str:
+        """Fingerprint of the ASP row fields reconciliation compares"""
+        return get_invoice_fingerprint(
+            inv_no,
+            asp_inv.get("grand_total") or asp_inv.get("total"),
+            asp_inv.get("vat_amount") or asp_inv.get("tax_amount"),
+            asp_inv.get("posting_date") or asp_inv.get("invoice_date"),
+        )
+
+    def can_carry_forward(self, base_row: dict, erp_inv: dict, asp_invoices: dict, asp_matched: set) -> bool:
+        """True if neither side of a base run pair changed since it was matched"""
+        asp_inv_no = base_row.asp_invoice_no or base_row.invoice_no
+        asp_inv = asp_invoices.get(asp_inv_no)
+
+        if asp_inv is None or asp_inv_no in asp_matched:
+            return False
+
+        return (
+            base_row.erp_fingerprint == self.get_erp_fingerprint(erp_inv)
+            and base_row.asp_fingerprint == self.get_asp_fingerprint(asp_inv_no, asp_inv)
+        )
+
+    def match_invoices_enhanced(self, erp_invoices, asp_invoices: dict, carry_forward: dict = None) -> dict:
         """
         Enhanced matching with fuzzy matching and tolerance support.
 
         1. First pass: exact invoice number matching
         2. Second pass: fuzzy matching if enabled
         3. Track missing invoices in both systems
+
+        erp_invoices is either a dict keyed by invoice number or an iterable
+        of such dicts (see iter_erp_invoice_chunks). Chunks are exact-matched
+        as they arrive; only book invoices left unmatched are kept around
+        for the fuzzy pass.
+
+        carry_forward holds base run pairs (see get_carry_forward_items).
+        Pairs whose book and ASP fingerprints are unchanged are copied into
+        the results as-is instead of being compared again.
         """
-        results = {
-            "matched": [],
-            "mismatched": [],
-            "missing_in_asp": [],
-            "missing_in_erp": [],
-        }
+        results = {key: [] for key in RESULT_KEYS}
 
-        # Track which invoices have been matched
+        # Track which ASP invoices have been matched
         asp_matched = set()
-        erp_matched = set()
 
-        # Build ASP lookup map for fuzzy matching
-        asp_map = dict(asp_invoices)
+        # Resolved once - may need the Company Group doc
+        tolerance = self.get_tolerance()
+
+        erp_unmatched = self.exact_match_invoices(
+            erp_invoices, asp_invoices, carry_forward, results, asp_matched, tolerance
+        )
+        self.match_remaining_invoices(erp_unmatched, asp_invoices, results, asp_matched, tolerance)
+
+        return results
+
+    def exact_match_invoices(self, erp_invoices, asp_invoices: dict, carry_forward: dict,
+                             results: dict, asp_matched: set, tolerance=None) -> dict:
+        """
+        First pass: exact invoice number matching (plus delta carry-forward).
+
+        Appends to results and asp_matched in place and returns the book
+        invoices left without an exact match, keyed by invoice number.
+        Pairs are compared a chunk at a time, see add_compared_items.
+        """
+        if tolerance is None:
+            tolerance = self.get_tolerance()
+
+        # Book invoices without an exact match, kept for fuzzy matching
+        erp_unmatched = {}
+
+        if isinstance(erp_invoices, dict):
+            erp_invoices = [erp_invoices]
+
+        # First pass: Exact matching, one chunk at a time
+        for erp_chunk in erp_invoices:
+            chunk_items = []
+
+            for inv_no, erp_inv in erp_chunk.items():
+                base_row = carry_forward.get(inv_no) if carry_forward else None
+                if base_row and self.can_carry_forward(base_row, erp_inv, asp_invoices, asp_matched):
+                    asp_matched.add(base_row.asp_invoice_no or inv_no)
+
+                    chunk_items.append({
+                        "invoice_no": inv_no,
+                        "carried_forward": True,
+                        "item_row": {f: base_row.get(f) for f in RECONCILIATION_ITEM_FIELDS},
+                    })
+                    continue
+
+                # A carried-forward fuzzy pair may already own this ASP row
+                if inv_no not in asp_invoices or inv_no in asp_matched:
+                    erp_unmatched[inv_no] = erp_inv
+                    continue
 
-        # First pass: Exact matching
-        for inv_no, erp_inv in erp_invoices.items():
-            if inv_no in asp_invoices:
                 asp_inv = asp_invoices[inv_no]
                 asp_matched.add(inv_no)
-                erp_matched.add(inv_no)
 
-                # Compare with tolerance
-                differences = self.compare_invoices_with_tolerance(erp_inv, asp_inv)
+                chunk_items.append(self.create_item(erp_inv, asp_inv, None))
 
-                item = self.create_item(erp_inv, asp_inv, "Matched" if not differences else "Mismatched")
-                item["differences"] = differences
+            # Compare the whole chunk with tolerance in one batch
+            self.add_compared_items(chunk_items, results, tolerance)
 
-                if differences:
-                    results["mismatched"].append(item)
-                else:
-                    results["matched"].append(item)
+        return erp_unmatched
+
+    def add_compared_items(self, items: list, results: dict, tolerance):
+        """
+        Compare pending pairs in one batch and file every item, in order,
+        under matched or mismatched. Prebuilt rows (carried forward) keep
+        their stored status.
+        """
+        pending = [item for item in items if "item_row" not in item]
+        all_differences = self.compare_invoice_pairs(
+            [(item["erp_data"], item["asp_data"]) for item in pending], tolerance
+        )
+
+        for item, differences in zip(pending, all_differences):
+            item["differences"] = differences
+            item["status"] = "Mismatched" if differences else "Matched"
+
+        for item in items:
+            status = item["item_row"]["match_status"] if "item_row" in item else item["status"]
+            results["matched" if status == "Matched" else "mismatched"].append(item)
+
+    def match_remaining_invoices(self, erp_unmatched: dict, asp_invoices: dict, results: dict,
+                                 asp_matched: set, tolerance=None):
+        """
+        Second pass: fuzzy matching (if enabled), then track missing
+        invoices in both systems. Appends to results in place.
+        """
+        if tolerance is None:
+            tolerance = self.get_tolerance()
+
+        erp_matched = set()
+        fuzzy_items = []
+
+        # Build ASP lookup map for fuzzy matching
+        asp_map = dict(asp_invoices)
+        fuzzy_index = None
 
         # Second pass: Fuzzy matching (if enabled)
         if cint(self.use_fuzzy_matching):
-            for inv_no, erp_inv in erp_invoices.items():
-                if inv_no in erp_matched:
-                    continue  # Already matched exactly
+            self.publish_progress("Fuzzy Matching", 50, candidates=len(erp_unmatched))
+            for inv_no, erp_inv in erp_unmatched.items():
+                # Index ASP invoices lazily - only needed if something is left to fuzzy match
+                if fuzzy_index is None:
+                    fuzzy_index = self.build_fuzzy_index(asp_map, asp_matched, tolerance)
 
                 # Try fuzzy matching
-                fuzzy_match = self.find_fuzzy_match(erp_inv, asp_map, asp_matched)
+                fuzzy_match = self.find_fuzzy_match(erp_inv, asp_map, asp_matched, fuzzy_index)
 
                 if fuzzy_match:
                     asp_inv_no, asp_inv, similarity = fuzzy_match
                     asp_matched.add(asp_inv_no)
                     erp_matched.add(inv_no)
 
-                    # Compare with tolerance
-                    differences = self.compare_invoices_with_tolerance(erp_inv, asp_inv)
-
-                    item = self.create_item(erp_inv, asp_inv, "Matched" if not differences else "Mismatched")
-                    item["differences"] = differences
+                    item = self.create_item(erp_inv, asp_inv, None)
                     item["fuzzy_matched"] = True
                     item["similarity_score"] = similarity
                     item["matched_asp_invoice"] = asp_inv_no
+                    fuzzy_items.append(item)
 
-                    if differences:
-                        results["mismatched"].append(item)
-                    else:
-                        results["matched"].append(item)
+            # Compare with tolerance - matching itself never looks at the differences
+            self.add_compared_items(fuzzy_items, results, tolerance)
 
         # Identify missing invoices
-        for inv_no, erp_inv in erp_invoices.items():
+        for inv_no, erp_inv in erp_unmatched.items():
             if inv_no not in erp_matched:
                 results["missing_in_asp"].append({
                     "invoice_no": inv_no,
@@ -258,17 +1032,35 @@ class ReconciliationRun(Document):
                     "asp_data": asp_inv,
                 })
 
-        return results
+    def build_fuzzy_index(self, asp_map: dict, already_matched: set = None, tolerance=None):
+        """
+        Build a blocking index over ASP invoices still available for fuzzy matching.
+        """
+        from digicomply.reconciliation.blocking import FuzzyMatchIndex
+
+        already_matched = already_matched or set()
+        unmatched = {k: v for k, v in asp_map.items() if k not in already_matched}
+
+        if tolerance is None:
+            tolerance = self.get_tolerance()
+
+        return FuzzyMatchIndex(unmatched, self.normalize_invoice_number, tolerance)
 
-    def find_fuzzy_match(self, erp_inv: dict, asp_map: dict, already_matched: set) -> tuple:
+    def find_fuzzy_match(self, erp_inv: dict, asp_map: dict, already_matched: set, index=None) -> tuple:
         """
         Find a fuzzy match for an ERP invoice in the ASP data.
 
         Uses SequenceMatcher to find similar invoice numbers.
         Also considers amount similarity for better matching.
 
+        When a FuzzyMatchIndex is given only its candidate set is scored,
+        otherwise every ASP invoice is compared.
+
         Returns tuple of (asp_invoice_no, asp_invoice_data, similarity_score) or None
         """
+        if index is not None:
+            return index.best_match(erp_inv, already_matched)
+
         erp_inv_no = erp_inv.get("name", "")
         erp_amount = flt(erp_inv.get("grand_total"), 2)
         tolerance = self.get_tolerance()
@@ -322,50 +1114,24 @@ class ReconciliationRun(Document):
 
         return normalized
 
-    def compare_invoices_with_tolerance(self, erp_inv: dict, asp_inv: dict) -> list:
+    def compare_invoice_pairs(self, pairs: list, tolerance=None) -> list:
         """
-        Compare ERP invoice with ASP data using tolerance amount.
-        Returns list of differences.
+        Compare (book invoice, ASP row) pairs in one batch using tolerance amount.
+        Returns one list of differences per pair, see reconciliation.compare.
         """
-        differences = []
-        tolerance = self.get_tolerance()
-
-        # Compare grand total with tolerance
-        erp_total = flt(erp_inv.get("grand_total"), 2)
-        asp_total = flt(asp_inv.get("grand_total") or asp_inv.get("total"), 2)
+        from digicomply.reconciliation.compare import compare_pairs
 
-        if abs(erp_total - asp_total) > tolerance:
-            differences.append({
-                "field": "Grand Total",
-                "erp_value": erp_total,
-                "asp_value": asp_total,
-                "difference": erp_total - asp_total,
-            })
-
-        # Compare VAT amount with tolerance
-        erp_vat = flt(erp_inv.get("total_taxes_and_charges"), 2)
-        asp_vat = flt(asp_inv.get("vat_amount") or asp_inv.get("tax_amount"), 2)
+        if tolerance is None:
+            tolerance = self.get_tolerance()
 
-        if abs(erp_vat - asp_vat) > tolerance:
-            differences.append({
-                "field": "VAT Amount",
-                "erp_value": erp_vat,
-                "asp_value": asp_vat,
-                "difference": erp_vat - asp_vat,
-            })
+        return compare_pairs(pairs, tolerance)
 
-        # Compare posting date
-        erp_date = str(erp_inv.get("posting_date"))
-        asp_date = str(asp_inv.get("posting_date") or asp_inv.get("invoice_date") or "")
-
-        if erp_date and asp_date and erp_date != asp_date:
-            differences.append({
-                "field": "Invoice Date",
-                "erp_value": erp_date,
-                "asp_value": asp_date,
-            })
-
-        return differences
+    def compare_invoices_with_tolerance(self, erp_inv: dict, asp_inv: dict, tolerance=None) -> list:
+        """
+        Compare ERP invoice with ASP data using tolerance amount.
+        Returns list of differences.
+        """
+        return self.compare_invoice_pairs([(erp_inv, asp_inv)], tolerance)[0]
 
     def create_item(self, erp_inv: dict, asp_inv: dict, status: str) -> dict:
         """
@@ -383,21 +1149,34 @@ class ReconciliationRun(Document):
         """
         Update summary counters based on reconciliation results.
         """
-        total = (
-            len(results["matched"]) +
-            len(results["mismatched"]) +
-            len(results["missing_in_asp"]) +
-            len(results["missing_in_erp"])
-        )
+        self.set_counts({key: len(results[key]) for key in RESULT_KEYS})
+
+    def get_item_counts(self) -> dict:
+        """Number of stored Reconciliation Items per result bucket"""
+        counts = {key: 0 for key in RESULT_KEYS}
+        for match_status, count in frappe.db.sql("""
+            SELECT match_status, COUNT(*)
+            FROM `tabReconciliation Item`
+            WHERE parent = %s AND parenttype = %s AND parentfield = 'items'
+            GROUP BY match_status
+        """, (self.name, self.doctype)):
+            if match_status in MATCH_STATUS_KEYS:
+                counts[MATCH_STATUS_KEYS[match_status]] = count
+
+        return counts
+
+    def set_counts(self, counts: dict):
+        """Write summary counters from per-bucket counts (see RESULT_KEYS)"""
+        total = sum(counts.values())
 
         self.db_set("total_invoices", total)
-        self.db_set("matched_count", len(results["matched"]))
-        self.db_set("mismatched_count", len(results["mismatched"]))
-        self.db_set("missing_in_asp", len(results["missing_in_asp"]))
-        self.db_set("missing_in_erp", len(results["missing_in_erp"]))
+        self.db_set("matched_count", counts["matched"])
+        self.db_set("mismatched_count", counts["mismatched"])
+        self.db_set("missing_in_asp", counts["missing_in_asp"])
+        self.db_set("missing_in_erp", counts["missing_in_erp"])
 
         if total > 0:
-            match_pct = (len(results["matched"]) / total) * 100
+            match_pct = (counts["matched"] / total) * 100
             self.db_set("match_percentage", flt(match_pct, 2))
 
     def match_invoices(self, erp_invoices: dict, asp_invoices: dict) -> dict:
@@ -501,55 +1280,111 @@ class ReconciliationRun(Document):
 
         return differences
 
-    def create_reconciliation_items(self, results: dict):
-        """Create Reconciliation Item child records"""
+    def create_reconciliation_items(self, results: dict, carry_over=None):
+        """
+        Create Reconciliation Item child records
+
+        Rows are written with batched multi-row INSERTs instead of appending
+        to self.items and saving, which validated and inserted every row
+        through the ORM. differences_html is not stored (HTML field) and is
+        rendered on load instead, see onload(). A delta run first copies the
+        base run rows carry_over selects (see copy_base_items).
+        """
+        from digicomply.utils import bulk_insert_rows
+
+        start_time = time.monotonic()
+
         # Clear existing items
-        self.items = []
+        frappe.db.delete("Reconciliation Item", {
+            "parent": self.name,
+            "parenttype": self.doctype,
+            "parentfield": "items",
+        })
+
+        copied = self.copy_base_items(carry_over) if carry_over else 0
+
+        row_count = copied + bulk_insert_rows(
+            "Reconciliation Item",
+            RECONCILIATION_ITEM_FIELDS,
+            self.get_reconciliation_item_rows(results),
+            parent_doc=self,
+            parentfield="items",
+            chunk_size=cint(self.batch_size) or 1000,
+            first_idx=copied + 1,
+        )
 
-        # Add matched items (green)
-        for item in results["matched"]:
-            self.append("items", {
-                "invoice_no": item["invoice_no"],
-                "match_status": "Matched",
-                "erp_grand_total": item["erp_data"].get("grand_total"),
-                "asp_grand_total": item["asp_data"].get("grand_total") or item["asp_data"].get("total"),
-                "customer": item["erp_data"].get("customer_name"),
-                "posting_date": item["erp_data"].get("posting_date"),
-            })
+        elapsed = time.monotonic() - start_time
+        rows_per_second = flt(row_count / elapsed, 2) if elapsed else row_count
 
-        # Add mismatched items (yellow)
-        for item in results["mismatched"]:
-            differences_html = self.format_differences_html(item["differences"])
-            self.append("items", {
-                "invoice_no": item["invoice_no"],
-                "match_status": "Mismatched",
-                "erp_grand_total": item["erp_data"].get("grand_total"),
-                "asp_grand_total": item["asp_data"].get("grand_total") or item["asp_data"].get("total"),
-                "customer": item["erp_data"].get("customer_name"),
-                "posting_date": item["erp_data"].get("posting_date"),
-                "differences": frappe.as_json(item["differences"]),
-                "differences_html": differences_html,
-            })
+        frappe.logger("digicomply").info(
+            f"Reconciliation {self.name}: inserted {row_count} items ({copied} copied from the base run) "
+            f"in {elapsed:.2f}s ({rows_per_second} rows/sec)"
+        )
 
-        # Add missing in ASP (red)
-        for item in results["missing_in_asp"]:
-            self.append("items", {
-                "invoice_no": item["invoice_no"],
-                "match_status": "Missing in ASP",
-                "erp_grand_total": item["erp_data"].get("grand_total"),
-                "customer": item["erp_data"].get("customer_name"),
-                "posting_date": item["erp_data"].get("posting_date"),
-            })
+        return {"rows": row_count, "copied": copied, "seconds": flt(elapsed, 3), "rows_per_second": rows_per_second}
 
-        # Add missing in ERP (red)
-        for item in results["missing_in_erp"]:
-            self.append("items", {
+    def get_reconciliation_item_rows(self, results: dict):
+        """Yield Reconciliation Item values for every result, in display order"""
+        for status_key in RESULT_KEYS:
+            for item in results[status_key]:
+                yield self.get_reconciliation_item_row(item, status_key)
+
+    def get_reconciliation_item_row(self, item: dict, status_key: str) -> dict:
+        """
+        Reconciliation Item values for one result
+
+        Each row stores book and ASP fingerprints so a later delta run can
+        tell whether the pair changed. Rows already built elsewhere
+        (carried forward from a base run or prepared by a parallel shard)
+        are returned unchanged, resolution included.
+        """
+        if "item_row" in item:
+            return item["item_row"]
+
+        # Missing in ERP (red)
+        if status_key == "missing_in_erp":
+            return {
                 "invoice_no": item["invoice_no"],
                 "match_status": "Missing in Books",
                 "asp_grand_total": item["asp_data"].get("grand_total") or item["asp_data"].get("total"),
-            })
+                "asp_invoice_no": item["invoice_no"],
+                "asp_fingerprint": self.get_asp_fingerprint(item["invoice_no"], item["asp_data"]),
+            }
+
+        row = {
+            "invoice_no": item["invoice_no"],
+            "erp_grand_total": item["erp_data"].get("grand_total"),
+            "customer": item["erp_data"].get("customer_name"),
+            "posting_date": item["erp_data"].get("posting_date"),
+            "erp_fingerprint": self.get_erp_fingerprint(item["erp_data"]),
+        }
 
-        self.save()
+        # Missing in ASP (red)
+        if status_key == "missing_in_asp":
+            row["match_status"] = "Missing in ASP"
+            return row
+
+        # Matched (green) / Mismatched (yellow)
+        asp_inv_no = item.get("matched_asp_invoice") or item["invoice_no"]
+        row.update({
+            "match_status": "Matched" if status_key == "matched" else "Mismatched",
+            "asp_grand_total": item["asp_data"].get("grand_total") or item["asp_data"].get("total"),
+            "asp_invoice_no": asp_inv_no,
+            "asp_fingerprint": self.get_asp_fingerprint(asp_inv_no, item["asp_data"]),
+        })
+        if status_key == "mismatched":
+            row["differences"] = frappe.as_json(item["differences"])
+
+        return row
+
+    def onload(self):
+        """Render differences HTML for mismatched items on demand"""
+        for item in self.get("items") or []:
+            if item.match_status == "Mismatched" and item.differences and not item.differences_html:
+                try:
+                    item.differences_html = self.format_differences_html(json.loads(item.differences))
+                except (json.JSONDecodeError, TypeError):
+                    continue
 
     def format_differences_html(self, differences: list) -> str:
         """Format differences as readable HTML"""
@@ -605,6 +1440,30 @@ class ReconciliationRun(Document):
         return create_report(self.name)
 
 
+def get_invoice_fingerprint(invoice_no, grand_total, vat_amount, posting_date) -> str:
+    """Stable hash of the fields reconciliation compares for one invoice"""
+    key = "|".join([
+        cstr(invoice_no),
+        f"{flt(grand_total, 2):.2f}",
+        f"{flt(vat_amount, 2):.2f}",
+        cstr(posting_date),
+    ])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def get_month_ranges(from_date, to_date):
+    """(start, end) date pairs for each calendar month overlapping the period"""
+    from_date, to_date = getdate(from_date), getdate(to_date)
+
+    ranges = []
+    month_start = get_first_day(from_date)
+    while month_start <= to_date:
+        ranges.append((max(month_start, from_date), min(get_last_day(month_start), to_date)))
+        month_start = add_months(month_start, 1)
+
+    return ranges
+
+
 def has_permission(doc, ptype, user):
     """Custom permission check"""
     if ptype == "read":
@@ -621,11 +1480,53 @@ def has_permission(doc, ptype, user):
 
 @frappe.whitelist()
 def run_reconciliation(docname):
-    """API endpoint to run reconciliation"""
+    """API endpoint to run reconciliation (queued as a background job)"""
     doc = frappe.get_doc("Reconciliation Run", docname)
-    return doc.run_reconciliation()
+    doc.check_permission("write")
+    return doc.enqueue_reconciliation()
 
 
-def on_submit_handler(doc, method):
-    """Hook handler for on_submit event"""
+def execute_reconciliation(docname):
+    """
+    Background job entry point for a queued reconciliation.
+
+    Completed runs are skipped, so a duplicate or re-enqueued job is harmless.
+    """
+    doc = frappe.get_doc("Reconciliation Run", docname)
+
+    if doc.status == "Completed" or doc.docstatus == 2:
+        return
+
     doc.run_reconciliation()
+
+
+def execute_reconciliation_shard(docname, shard_run_id, shard_index, shard_count, company, from_date, to_date):
+    """Background job entry point for one shard of a parallel reconciliation"""
+    doc = frappe.get_doc("Reconciliation Run", docname)
+
+    # Another shard failed or the run was restarted - nothing left to contribute to
+    if doc.status != "In Progress":
+        return
+
+    try:
+        doc.run_shard(shard_run_id, shard_index, shard_count, company, from_date, to_date)
+    except Exception as e:
+        doc.mark_failed(e)
+
+
+def execute_reconciliation_merge(docname, shard_run_id, shard_count):
+    """Background job entry point merging the shards of a parallel reconciliation"""
+    doc = frappe.get_doc("Reconciliation Run", docname)
+
+    if doc.status != "In Progress":
+        return
+
+    try:
+        doc.merge_shards(shard_run_id, shard_count)
+    except Exception as e:
+        doc.mark_failed(e)
+
+
+def on_submit_handler(doc, method):
+    """Hook handler for on_submit event - queues the run (de-duplicated)"""
+    doc.enqueue_reconciliation()
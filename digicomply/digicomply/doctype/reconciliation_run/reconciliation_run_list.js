@@ -9,6 +9,7 @@ frappe.listview_settings['Reconciliation Run'] = {
     get_indicator: function(doc) {
         const status_colors = {
             'Draft': 'gray',
+            'Queued': 'yellow',
             'In Progress': 'blue',
             'Completed': doc.match_percentage >= 90 ? 'green' : (doc.match_percentage >= 70 ? 'orange' : 'red'),
             'Failed': 'red'
@@ -7,6 +7,13 @@ from frappe.utils import now_datetime, time_diff_in_seconds
 import json
 
 
+# Counters written by the throttled progress reporter
+PROGRESS_FIELDS = [
+    "records_fetched", "records_pushed", "records_created",
+    "records_updated", "records_failed", "records_skipped"
+]
+
+
 class SyncRun(Document):
     def before_save(self):
         # Calculate duration if completed
@@ -55,7 +62,7 @@ class SyncRun(Document):
 
     def add_error(self, record_type, record_id, error_message, error_code=None):
         """Add an error to the sync run"""
-        self.append("sync_errors", {
+        row = self.append("sync_errors", {
             "record_type": record_type,
             "record_id": record_id,
             "error_message": error_message[:500] if error_message else None,
@@ -64,11 +71,36 @@ class SyncRun(Document):
         })
         self.records_failed = (self.records_failed or 0) + 1
 
-    def update_progress(self, processed, total):
-        """Update progress percentage"""
-        if total > 0:
+        # Insert the row right away so progress flushes never need a full save
+        if not self.is_new():
+            row.db_insert()
+
+    def get_progress_reporter(self):
+        from digicomply.utils import ProgressReporter
+
+        if not getattr(self, "_progress_reporter", None):
+            self._progress_reporter = ProgressReporter(self, "sync_run_progress")
+        return self._progress_reporter
+
+    def update_progress(self, processed=None, total=None, force=False):
+        """
+        Update progress percentage and record counters
+
+        Writes are throttled and coalesced by ProgressReporter; pass
+        force=True before completing the run.
+        """
+        if total:
             self.progress_percent = round((processed / total) * 100, 2)
-            self.save()
+
+        values = {field: self.get(field) or 0 for field in PROGRESS_FIELDS}
+        values["progress_percent"] = self.progress_percent or 0
+
+        self.get_progress_reporter().report(
+            values,
+            percent=self.progress_percent or 0,
+            message={"sync_run": self.name, "status": self.run_status, **values},
+            force=force
+        )
 
 
 def create_sync_run(connection, schedule=None, direction="Pull",
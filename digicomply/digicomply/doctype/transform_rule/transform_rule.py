@@ -3,16 +3,58 @@
 
 import frappe
 from frappe.model.document import Document
+import ast
 import json
 import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+
+# Rule definitions are cached in Redis per (connector, entity type, direction)
+# under the current rules version; compiled pipelines are kept per process
+TRANSFORM_RULES_VERSION_KEY = "transform_rules::version"
+TRANSFORM_RULES_CACHE_TTL = 24 * 60 * 60
+
+# Custom Code execution time is summed per process and added to Redis
+# counters every RULE_TIMING_FLUSH_SECONDS (and after each batch)
+RULE_TIMING_FLUSH_SECONDS = 10
+RULE_TIMING_TTL = 7 * 24 * 60 * 60
+
+# Calculation formulas: {field} references combined with + - * / // **
+# over numeric literals; ** only takes a literal exponent
+FORMULA_FIELD_REFERENCE = re.compile(r"\{([^{}]+)\}")
+FORMULA_OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Pow)
+FORMULA_UNARY_OPERATORS = (ast.UAdd, ast.USub)
+
+# Lookup results are cached per process with LRU eviction and a TTL
+# (digicomply_lookup_cache_size / digicomply_lookup_cache_ttl in site_config);
+# keys missing from the cache are resolved LOOKUP_BATCH_SIZE at a time
+DEFAULT_LOOKUP_CACHE_SIZE = 10000
+DEFAULT_LOOKUP_CACHE_TTL = 300
+LOOKUP_BATCH_SIZE = 500
+
+_pipelines = {}
+_lookup_caches = {}
+_custom_code = {}
+_rule_timings = {}
+_rule_timings_flushed = time.monotonic()
 
 
 class TransformRule(Document):
     def validate(self):
         self.validate_transform_type()
+        if self.transform_type == "Calculation":
+            self.validate_formula()
         if self.custom_code:
             self.validate_custom_code()
 
+    def on_update(self):
+        clear_transform_rule_cache()
+
+    def on_trash(self):
+        clear_transform_rule_cache()
+
     def validate_transform_type(self):
         """Validate required fields based on transform type"""
         if self.transform_type == "Field Mapping":
@@ -22,6 +64,13 @@ class TransformRule(Document):
             if not self.custom_code:
                 frappe.throw("Custom code is required for Custom Code transform type")
 
+    def validate_formula(self):
+        """Calculation formulas must compile"""
+        try:
+            compile_formula(self.get_params().get("formula") or "")
+        except ValueError as e:
+            frappe.throw(f"Invalid calculation formula: {e}")
+
     def validate_custom_code(self):
         """Validate custom code syntax"""
         # Basic validation - check for dangerous operations
@@ -39,6 +88,11 @@ class TransformRule(Document):
             if re.search(pattern, self.custom_code):
                 frappe.throw(f"Custom code contains potentially dangerous operations")
 
+        try:
+            compile(self.custom_code, f"<Transform Rule {self.name}>", "exec")
+        except SyntaxError as e:
+            frappe.throw(f"Custom code has a syntax error on line {e.lineno}: {e.msg}")
+
     @frappe.whitelist()
     def test_transform(self):
         """Test the transformation with test input"""
@@ -58,64 +112,139 @@ class TransformRule(Document):
 
     def apply_transform(self, value, record, context):
         """Apply the transformation to a value"""
-        # Check condition first
-        if not self._check_condition(record):
-            return value
+        return self.compile()(value, record, context)
+
+    def get_params(self):
+        return json.loads(self.transform_params) if self.transform_params else {}
+
+    def compile(self):
+        """
+        Build a function(value, record, context) that applies this rule
+
+        Parameters are parsed and the transform chosen once, so the function
+        can be reused for every record of a sync.
+        """
+        params = self.get_params()
+        condition = self._compile_condition()
+        transform = self._compile_transform(params)
+
+        if not condition:
+            return transform
+
+        def apply(value, record, context):
+            if not condition(record):
+                return value
+            return transform(value, record, context)
+
+        return apply
+
+    def compile_many(self):
+        """
+        Build a function(values, records, context) -> list that applies this
+        rule to a whole batch at once, or None if the rule type has none
+
+        Records failing the condition keep their value, as with compile().
+        """
+        transform_many = self._compile_transform_many(self.get_params())
+        condition = self._compile_condition()
+
+        if not transform_many or not condition:
+            return transform_many
+
+        def apply_many(values, records, context):
+            results = list(values)
+            selected = [idx for idx, record in enumerate(records) if condition(record)]
+            if selected:
+                outputs = transform_many(
+                    [values[idx] for idx in selected], [records[idx] for idx in selected], context
+                )
+                for idx, output in zip(selected, outputs):
+                    results[idx] = output
+            return results
+
+        return apply_many
+
+    def _compile_transform(self, params):
+        default = self.default_value
 
         if self.transform_type == "Field Mapping":
-            return record.get(self.source_field, self.default_value)
+            source_field = self.source_field
+            return lambda value, record, context: record.get(source_field, default)
 
         elif self.transform_type == "Value Mapping":
-            params = json.loads(self.transform_params) if self.transform_params else {}
             mapping = params.get("mapping", {})
-            return mapping.get(str(value), self.default_value or value)
+            return lambda value, record, context: mapping.get(str(value), default or value)
 
         elif self.transform_type == "Format":
-            return self._apply_format(value)
+            return lambda value, record, context: self._apply_format(value, params)
 
         elif self.transform_type == "Calculation":
-            return self._apply_calculation(value, record)
+            formula = self._compile_formula(params)
+            if not formula:
+                return lambda value, record, context: value
+            return lambda value, record, context: formula.evaluate(record, value)
 
         elif self.transform_type == "Concatenate":
-            return self._apply_concatenate(record)
+            return lambda value, record, context: self._apply_concatenate(record, params)
 
         elif self.transform_type == "Split":
-            return self._apply_split(value)
+            return lambda value, record, context: self._apply_split(value, params)
 
         elif self.transform_type == "Lookup":
-            return self._apply_lookup(value)
+            lookup = self._compile_lookup(params)
+            return lambda value, record, context: lookup([value])[0]
 
         elif self.transform_type == "Custom Code":
-            return self._apply_custom_code(value, record, context)
+            return self._compile_custom_code()
 
-        return value
+        return lambda value, record, context: value
 
-    def _check_condition(self, record):
-        """Check if the condition is met"""
-        if not self.condition_type:
-            return True
-
-        if self.condition_type == "Field Value":
-            field_value = record.get(self.condition_field)
-
-            if self.condition_operator == "equals":
-                return str(field_value) == self.condition_value
-            elif self.condition_operator == "not equals":
-                return str(field_value) != self.condition_value
-            elif self.condition_operator == "contains":
-                return self.condition_value in str(field_value or "")
-            elif self.condition_operator == "starts with":
-                return str(field_value or "").startswith(self.condition_value)
-            elif self.condition_operator == "ends with":
-                return str(field_value or "").endswith(self.condition_value)
-            elif self.condition_operator == "is empty":
-                return not field_value
-            elif self.condition_operator == "is not empty":
-                return bool(field_value)
+    def _compile_transform_many(self, params):
+        if self.transform_type == "Calculation":
+            formula = self._compile_formula(params)
+            if formula:
+                return lambda values, records, context: formula.evaluate_many(records, values)
 
-        return True
+        elif self.transform_type == "Lookup":
+            lookup = self._compile_lookup(params)
+            return lambda values, records, context: lookup(values)
+
+        return None
 
-    def _apply_format(self, value):
+    def _compile_formula(self, params):
+        """The compiled formula, or None if it does not compile (the value is then kept)"""
+        try:
+            return compile_formula(params.get("formula") or "")
+        except ValueError:
+            return None
+
+    def _compile_condition(self):
+        """Predicate on the record, or None if the rule always applies"""
+        if self.condition_type != "Field Value":
+            return None
+
+        field = self.condition_field
+        expected = self.condition_value
+        operator = self.condition_operator
+
+        if operator == "equals":
+            return lambda record: str(record.get(field)) == expected
+        elif operator == "not equals":
+            return lambda record: str(record.get(field)) != expected
+        elif operator == "contains":
+            return lambda record: expected in str(record.get(field) or "")
+        elif operator == "starts with":
+            return lambda record: str(record.get(field) or "").startswith(expected)
+        elif operator == "ends with":
+            return lambda record: str(record.get(field) or "").endswith(expected)
+        elif operator == "is empty":
+            return lambda record: not record.get(field)
+        elif operator == "is not empty":
+            return lambda record: bool(record.get(field))
+
+        return None
+
+    def _apply_format(self, value, params):
         """Apply formatting function"""
         if not value:
             return self.default_value
@@ -133,46 +262,22 @@ class TransformRule(Document):
                 return f"{gstin[:2]} {gstin[2:7]} {gstin[7:12]} {gstin[12]} {gstin[13]} {gstin[14]}"
             return value
         elif self.transform_function == "Date Format":
-            params = json.loads(self.transform_params) if self.transform_params else {}
             from frappe.utils import getdate, formatdate
             date_val = getdate(value)
             return formatdate(date_val, params.get("format", "yyyy-mm-dd"))
 
         return value
 
-    def _apply_calculation(self, value, record):
-        """Apply calculation"""
-        params = json.loads(self.transform_params) if self.transform_params else {}
-        formula = params.get("formula", "")
-
-        # Simple arithmetic - replace field references with values
-        result = formula
-        for field, val in record.items():
-            if isinstance(val, (int, float)):
-                result = result.replace(f"{{{field}}}", str(val))
-
-        try:
-            # Only allow safe arithmetic
-            allowed_chars = set("0123456789+-*/.() ")
-            if all(c in allowed_chars for c in result):
-                return eval(result)
-        except Exception:
-            pass
-
-        return value
-
-    def _apply_concatenate(self, record):
+    def _apply_concatenate(self, record, params):
         """Concatenate multiple fields"""
-        params = json.loads(self.transform_params) if self.transform_params else {}
         fields = params.get("fields", [])
         separator = params.get("separator", " ")
 
         values = [str(record.get(f, "")) for f in fields if record.get(f)]
         return separator.join(values) or self.default_value
 
-    def _apply_split(self, value):
+    def _apply_split(self, value, params):
         """Split a value"""
-        params = json.loads(self.transform_params) if self.transform_params else {}
         separator = params.get("separator", ",")
         index = params.get("index", 0)
 
@@ -182,44 +287,316 @@ class TransformRule(Document):
 
         return self.default_value
 
-    def _apply_lookup(self, value):
-        """Lookup value from another doctype"""
-        params = json.loads(self.transform_params) if self.transform_params else {}
+    def _compile_lookup(self, params):
+        """
+        Build a function(values) -> list of looked up values
+
+        All values missing from the lookup cache are resolved together with
+        IN queries; values not found (or empty) map to the default value.
+        """
         doctype = params.get("doctype")
         lookup_field = params.get("lookup_field")
         return_field = params.get("return_field")
+        default = self.default_value
+
+        if not (doctype and lookup_field and return_field):
+            return lambda values: [default] * len(values)
+
+        cache = get_lookup_cache(doctype, lookup_field, return_field)
+
+        def lookup(values):
+            # The database compares case-insensitively, so keys are casefolded
+            keys = [str(value).casefold() if value else None for value in values]
+
+            # Answers for this call come from here; the cache only saves future queries,
+            # as a batch may hold more keys than the cache keeps
+            resolved = {}
+            missing = {}
+            for key, value in zip(keys, values):
+                if key is None or key in resolved or key in missing:
+                    continue
+                if cache.contains(key):
+                    resolved[key] = cache.get(key)
+                else:
+                    missing[key] = value
+
+            missing_values = list(missing.values())
+            for start in range(0, len(missing_values), LOOKUP_BATCH_SIZE):
+                batch = missing_values[start:start + LOOKUP_BATCH_SIZE]
+                found = {}
+                for row in frappe.get_all(
+                    doctype,
+                    filters={lookup_field: ["in", batch]},
+                    fields=[lookup_field, return_field],
+                    limit_page_length=0
+                ):
+                    found.setdefault(str(row.get(lookup_field)).casefold(), row.get(return_field))
+
+                for value in batch:
+                    key = str(value).casefold()
+                    resolved[key] = found.get(key)
+                    cache.set(key, resolved[key])
+
+            return [(resolved[key] or default) if key is not None else default for key in keys]
+
+        return lookup
+
+    def _compile_custom_code(self):
+        """
+        The transform() defined by the custom code, wrapped in a timer
+
+        The code is compiled and run once per process for each saved
+        version of the rule (name + modified), not once per value. Code
+        that fails to load fails only this rule: applying it raises the
+        load error, which apply_many reports per record.
+        """
+        key = (frappe.local.site, self.name)
+        cached = _custom_code.get(key)
+        if not cached or cached[0] != (str(self.modified), self.custom_code):
+            try:
+                transform = load_custom_code(self.custom_code, self.name)
+            except Exception as e:
+                transform = get_load_error_transform(self.name, e)
+            cached = ((str(self.modified), self.custom_code), transform)
+            _custom_code[key] = cached
+
+        transform = cached[1]
+        if not transform:
+            return lambda value, record, context: value
+
+        rule_name = self.name
+
+        def timed_transform(value, record, context):
+            start = time.perf_counter()
+            try:
+                return transform(value, record, context)
+            finally:
+                timing = _rule_timings.setdefault((frappe.local.site, rule_name), [0, 0.0])
+                timing[0] += 1
+                timing[1] += time.perf_counter() - start
+
+        return timed_transform
+
+
+class LookupCache:
+    """LRU cache with a TTL for the results of one Lookup (doctype, lookup field, return field)"""
+
+    def __init__(self, maxsize=DEFAULT_LOOKUP_CACHE_SIZE, ttl=DEFAULT_LOOKUP_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+
+    def contains(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        if entry[0] < time.monotonic():
+            del self.entries[key]
+            return False
+        self.entries.move_to_end(key)
+        return True
 
-        if doctype and lookup_field and return_field and value:
-            result = frappe.db.get_value(
-                doctype,
-                {lookup_field: value},
-                return_field
-            )
-            return result or self.default_value
+    def get(self, key):
+        entry = self.entries.get(key)
+        return entry[1] if entry else None
 
-        return self.default_value
+    def set(self, key, value):
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
 
-    def _apply_custom_code(self, value, record, context):
-        """Apply custom code transformation"""
-        # Create a safe execution environment
-        safe_globals = {
-            "frappe": frappe,
-            "json": json,
-            "re": re
-        }
+    def clear(self):
+        self.entries.clear()
 
-        local_vars = {}
-        exec(self.custom_code, safe_globals, local_vars)
 
-        if "transform" in local_vars:
-            return local_vars["transform"](value, record, context)
+def get_lookup_cache(doctype, lookup_field, return_field):
+    """The site's LookupCache for a lookup, shared by all rules that use it"""
+    key = (frappe.local.site, doctype, lookup_field, return_field)
+    cache = _lookup_caches.get(key)
+    if cache is None:
+        cache = _lookup_caches[key] = LookupCache(
+            frappe.conf.get("digicomply_lookup_cache_size") or DEFAULT_LOOKUP_CACHE_SIZE,
+            frappe.conf.get("digicomply_lookup_cache_ttl") or DEFAULT_LOOKUP_CACHE_TTL
+        )
+    return cache
+
+
+def clear_lookup_caches():
+    """Forget all cached lookup results of the current site"""
+    for key, cache in _lookup_caches.items():
+        if key[0] == frappe.local.site:
+            cache.clear()
 
-        return value
+
+class Formula:
+    """
+    A Calculation formula compiled to a Python function
+
+    The formula is parsed once and checked to contain only arithmetic on
+    numbers and {field} references. A record is calculated when every
+    referenced field holds an int or float; otherwise, or if the
+    arithmetic fails (e.g. division by zero), its current value is kept.
+    """
+
+    def __init__(self, fields, function):
+        self.fields = fields
+        # function(records, values) -> list, evaluating the whole batch in one comprehension
+        self.function = function
+
+    def evaluate(self, record, value=None):
+        try:
+            return self.function((record,), (value,))[0]
+        except ArithmeticError:
+            return value
+
+    def evaluate_many(self, records, values):
+        """evaluate() over a batch of records and their current values"""
+        try:
+            return self.function(records, values)
+        except ArithmeticError:
+            # Some record fails: find out which one by one
+            return [self.evaluate(record, value) for record, value in zip(records, values)]
+
+
+@lru_cache(maxsize=256)
+def compile_formula(formula):
+    """
+    Parse and compile a Calculation formula, e.g. "{total} * 1.05"
+
+    Raises:
+        ValueError: formula is empty, malformed or uses anything but arithmetic
+    """
+    fields = []
+
+    def reference(match):
+        field = match.group(1)
+        if field not in fields:
+            fields.append(field)
+        return f"_field_{fields.index(field)}"
+
+    expression = FORMULA_FIELD_REFERENCE.sub(reference, formula).strip()
+    if not expression:
+        raise ValueError("formula is empty")
+
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError:
+        raise ValueError(f"cannot parse '{formula}'")
+
+    operands = {f"_field_{idx}" for idx in range(len(fields))}
+    for node in ast.walk(tree.body):
+        check_formula_node(node, operands)
+
+    # Only vetted arithmetic reaches eval, with no builtins available
+    names = "".join(f"_field_{idx}, " for idx in range(len(fields)))
+    lookups = "".join(f"_record.get({field!r}), " for field in fields)
+    numeric = " and ".join(f"_type(_field_{idx}) in _numbers" for idx in range(len(fields))) or "True"
+    function = eval(
+        f"lambda _records, _values: ["
+        f"({ast.unparse(tree.body)}) if {numeric} else _value "
+        f"for _record, _value in zip(_records, _values) "
+        f"for ({names}) in (({lookups}),)]",
+        {"__builtins__": {}, "_type": type, "_numbers": frozenset((int, float)), "zip": zip}
+    )
+
+    return Formula(fields, function)
+
+
+def check_formula_node(node, operands):
+    if isinstance(node, ast.BinOp):
+        if not isinstance(node.op, FORMULA_OPERATORS):
+            raise ValueError(f"operator {type(node.op).__name__} is not allowed")
+        if isinstance(node.op, ast.Pow) and not isinstance(node.right, ast.Constant):
+            raise ValueError("exponents must be numbers")
+    elif isinstance(node, ast.UnaryOp):
+        if not isinstance(node.op, FORMULA_UNARY_OPERATORS):
+            raise ValueError(f"operator {type(node.op).__name__} is not allowed")
+    elif isinstance(node, ast.Constant):
+        if not isinstance(node.value, (int, float)) or isinstance(node.value, bool):
+            raise ValueError(f"{node.value!r} is not a number")
+    elif isinstance(node, ast.Name):
+        if node.id not in operands:
+            raise ValueError(f"'{node.id}' is not a field reference; write {{{node.id}}}")
+    elif not isinstance(node, (ast.operator, ast.unaryop, ast.Load)):
+        raise ValueError(f"{type(node).__name__} is not allowed")
+
+
+def load_custom_code(source, rule_name=None):
+    """Compile and run Custom Code once; returns its transform function, or None"""
+    # Create a safe execution environment
+    namespace = {
+        "frappe": frappe,
+        "json": json,
+        "re": re
+    }
+
+    exec(compile(source, f"<Transform Rule {rule_name}>", "exec"), namespace)
+    return namespace.get("transform")
+
+
+def get_load_error_transform(rule_name, error):
+    """A transform that raises the error the Custom Code of rule_name failed to load with"""
+    message = f"Custom Code of Transform Rule {rule_name} failed to load: {error}"
+
+    def transform(value, record, context):
+        raise frappe.ValidationError(message)
+
+    return transform
+
+
+def flush_rule_timings(force=False):
+    """Add this process's Custom Code timings to the shared Redis counters"""
+    global _rule_timings_flushed
+
+    if not _rule_timings or not (force or time.monotonic() - _rule_timings_flushed >= RULE_TIMING_FLUSH_SECONDS):
+        return
+
+    site = frappe.local.site
+    cache = frappe.cache()
+    for key in [key for key in _rule_timings if key[0] == site]:
+        calls, seconds = _rule_timings.pop(key)
+        for field, amount in (("calls", calls), ("us", int(seconds * 1000000))):
+            counter_key = cache.make_key(f"transform_rule_timing::{key[1]}::{field}")
+            cache.incrby(counter_key, amount)
+            cache.expire(counter_key, RULE_TIMING_TTL)
+
+    _rule_timings_flushed = time.monotonic()
+
+
+@frappe.whitelist()
+def get_rule_timings():
+    """Calls and execution time of each Custom Code rule over the last week, slowest first"""
+    flush_rule_timings(force=True)
+
+    cache = frappe.cache()
+    timings = []
+    for rule in frappe.get_all("Transform Rule", filters={"transform_type": "Custom Code"}, pluck="name"):
+        calls = int(cache.get(cache.make_key(f"transform_rule_timing::{rule}::calls")) or 0)
+        total_us = int(cache.get(cache.make_key(f"transform_rule_timing::{rule}::us")) or 0)
+        timings.append({
+            "rule": rule,
+            "calls": calls,
+            "total_ms": round(total_us / 1000, 1),
+            "avg_ms": round(total_us / 1000 / calls, 3) if calls else 0,
+        })
+
+    return sorted(timings, key=lambda timing: timing["total_ms"], reverse=True)
 
 
 @frappe.whitelist()
 def get_rules_for_connector(connector, entity_type=None, direction=None):
     """Get transform rules for a connector"""
+    return [frappe.get_doc(rule) for rule in get_rule_definitions(connector, entity_type, direction)]
+
+
+def get_rule_definitions(connector, entity_type=None, direction=None):
+    """Field values of the applicable rules in priority order, cached in Redis"""
+    cache_key = f"transform_rules::{get_rules_version()}::{connector}::{entity_type}::{direction}"
+    rules = frappe.cache().get_value(cache_key)
+    if rules is not None:
+        return rules
+
     filters = {
         "enabled": 1,
         "asp_connector": ["in", [connector, None]]
@@ -234,22 +611,119 @@ def get_rules_for_connector(connector, entity_type=None, direction=None):
     rules = frappe.get_all(
         "Transform Rule",
         filters=filters,
-        fields=["name"],
+        fields=["*"],
         order_by="priority asc"
     )
+    for rule in rules:
+        rule.doctype = "Transform Rule"
+
+    frappe.cache().set_value(cache_key, rules, expires_in_sec=TRANSFORM_RULES_CACHE_TTL)
+    return rules
 
-    return [frappe.get_doc("Transform Rule", r.name) for r in rules]
+
+def get_rules_version():
+    version = frappe.cache().get_value(TRANSFORM_RULES_VERSION_KEY)
+    if not version:
+        version = frappe.generate_hash(length=10)
+        frappe.cache().set_value(TRANSFORM_RULES_VERSION_KEY, version)
+    return version
+
+
+def clear_transform_rule_cache():
+    """Invalidate cached rules and compiled pipelines in every worker"""
+    frappe.cache().set_value(TRANSFORM_RULES_VERSION_KEY, frappe.generate_hash(length=10))
+
+
+class TransformPipeline:
+    """
+    The compiled rules for one (connector, entity type, direction)
+
+    Each step is (source field, target field, function, batch function)
+    from TransformRule.compile() and compile_many(); rules without both
+    fields are skipped, as apply_transforms always did.
+    """
+
+    def __init__(self, rules):
+        self.steps = [
+            (rule.source_field, rule.target_field, rule.compile(), rule.compile_many())
+            for rule in rules
+            if rule.source_field and rule.target_field
+        ]
+
+    def apply(self, data, context=None):
+        result = data.copy() if isinstance(data, dict) else data
+        context = context or {}
+
+        for source_field, target_field, transform, _transform_many in self.steps:
+            result[target_field] = transform(result.get(source_field), result, context)
+
+        flush_rule_timings()
+        return result
+
+    def apply_many(self, records, context=None, on_error=None):
+        """
+        Apply the pipeline to a list of records, one rule at a time
+
+        Rules with a batch function are applied to all records in one call;
+        if that raises, the rule falls back to record by record. With
+        on_error, a record whose transform raises is reported as
+        on_error(index, exception), skipped by the remaining rules and
+        returned as None; otherwise the exception propagates.
+        """
+        results = [data.copy() if isinstance(data, dict) else data for data in records]
+        context = context or {}
+        failed = set()
+
+        for source_field, target_field, transform, transform_many in self.steps:
+            if transform_many:
+                active = [idx for idx in range(len(results)) if idx not in failed]
+                batch = [results[idx] for idx in active]
+                try:
+                    outputs = transform_many([result.get(source_field) for result in batch], batch, context)
+                except Exception:
+                    pass
+                else:
+                    for result, output in zip(batch, outputs):
+                        result[target_field] = output
+                    continue
+
+            for idx, result in enumerate(results):
+                if idx in failed:
+                    continue
+                try:
+                    result[target_field] = transform(result.get(source_field), result, context)
+                except Exception as e:
+                    if not on_error:
+                        raise
+                    failed.add(idx)
+                    on_error(idx, e)
+
+        flush_rule_timings(force=True)
+        return [None if idx in failed else result for idx, result in enumerate(results)]
+
+
+def get_transform_pipeline(connector, entity_type, direction):
+    """Compiled pipeline, built once per process for each rules version"""
+    version = get_rules_version()
+    site_pipelines = _pipelines.get(frappe.local.site)
+    if not site_pipelines or site_pipelines[0] != version:
+        # Rules changed: drop everything compiled from the old ones
+        site_pipelines = _pipelines[frappe.local.site] = (version, {})
+
+    key = (connector, entity_type, direction)
+    pipeline = site_pipelines[1].get(key)
+    if pipeline is None:
+        pipeline = TransformPipeline(get_rules_for_connector(connector, entity_type, direction))
+        site_pipelines[1][key] = pipeline
+
+    return pipeline
 
 
 def apply_transforms(data, connector, entity_type, direction, context=None):
     """Apply all applicable transform rules to data"""
-    rules = get_rules_for_connector(connector, entity_type, direction)
-    result = data.copy() if isinstance(data, dict) else data
+    return get_transform_pipeline(connector, entity_type, direction).apply(data, context)
 
-    for rule in rules:
-        if rule.source_field and rule.target_field:
-            value = result.get(rule.source_field)
-            transformed = rule.apply_transform(value, result, context or {})
-            result[rule.target_field] = transformed
 
-    return result
+def apply_transforms_many(records, connector, entity_type, direction, context=None, on_error=None):
+    """Apply all applicable transform rules to a batch of records (see TransformPipeline.apply_many)"""
+    return get_transform_pipeline(connector, entity_type, direction).apply_many(records, context, on_error)
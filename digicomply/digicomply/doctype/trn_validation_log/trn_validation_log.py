@@ -227,6 +227,51 @@ def create_validation_log(
     return doc
 
 
+def insert_validation_logs(logs):
+    """
+    Insert many TRN Validation Logs with multi-row INSERTs
+
+    Args:
+        logs: list of dicts with create_validation_log's arguments
+
+    Unlike create_validation_log, no document hooks run: callers update
+    the linked TRN Registry records themselves.
+    """
+    import json
+    from digicomply.utils import bulk_insert_rows, reserve_names
+
+    if not logs:
+        return 0
+
+    now = now_datetime()
+    # Same names the TRNVAL-.YYYY.-.##### series would give
+    names = reserve_names(f"TRNVAL-{now:%Y}-", len(logs), digits=5)
+
+    rows = []
+    for name, log in zip(names, logs):
+        raw_response = log.get("raw_response")
+        trn = log.get("trn")
+        rows.append({
+            "name": name,
+            "trn": trn.replace(" ", "").replace("-", "") if trn else "",
+            "trn_registry": log.get("trn_registry"),
+            "company": log.get("company"),
+            "validation_type": log.get("validation_type") or "Format Check",
+            "validation_source": log.get("validation_source") or "Manual",
+            "validation_status": log.get("validation_status"),
+            "validation_date": now,
+            "response_code": log.get("response_code"),
+            "response_message": log.get("response_message"),
+            "fta_entity_name": log.get("fta_entity_name"),
+            "fta_registration_date": log.get("fta_registration_date"),
+            "fta_expiry_date": log.get("fta_expiry_date"),
+            "fta_status": log.get("fta_status"),
+            "raw_response": json.dumps(raw_response) if isinstance(raw_response, dict) else raw_response
+        })
+
+    return bulk_insert_rows("TRN Validation Log", list(rows[0]), rows)
+
+
 @frappe.whitelist()
 def get_validation_stats(company=None, days=30):
     """
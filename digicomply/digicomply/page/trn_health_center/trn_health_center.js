@@ -749,7 +749,15 @@ class TRNHealthCenter {
 
                         if (r.message) {
                             const results = r.message.results || {};
-                            if (r.message.success) {
+                            if (r.message.queued) {
+                                // Large sets run in a background job that notifies on completion
+                                frappe.msgprint({
+                                    title: __('Bulk Validation Started'),
+                                    message: r.message.message,
+                                    indicator: 'blue'
+                                });
+                                return;
+                            } else if (r.message.success) {
                                 frappe.msgprint({
                                     title: __('Bulk Validation Complete'),
                                     message: __('Validated {0} TRNs:<br>- Valid: {1}<br>- Invalid: {2}<br>- Errors: {3}', [
@@ -102,11 +102,19 @@ def get_trn_health_data(company=None):
     }
 
 
+# Companies with more TRNs than a web request may validate are validated in a background job
+BULK_VALIDATION_JOB_TIMEOUT = 3600
+
+
 @frappe.whitelist()
 def bulk_validate_all(company=None):
     """
     Validate all TRNs for a company (or all companies if none specified).
 
+    Up to MAX_BULK_TRNS_PER_REQUEST TRNs are validated right away; more
+    are validated in a background job and the user is notified when it
+    completes.
+
     Args:
         company: Optional company filter
 
@@ -114,6 +122,7 @@ def bulk_validate_all(company=None):
         dict: {
             "success": bool,
             "message": str,
+            "queued": bool (only when a background job was started),
             "results": {
                 "total": count,
                 "valid": count,
@@ -122,22 +131,77 @@ def bulk_validate_all(company=None):
             }
         }
     """
+    from digicomply.digicomply.api.fta_api import MAX_BULK_TRNS_PER_REQUEST
+
     # Permission check
     if not frappe.has_permission("TRN Registry", "write"):
         frappe.throw(_("You do not have permission to validate TRNs"), frappe.PermissionError)
 
+    trns = get_active_trns(company)
+
+    if len(trns) > MAX_BULK_TRNS_PER_REQUEST:
+        frappe.enqueue(
+            "digicomply.digicomply.page.trn_health_center.trn_health_center.run_bulk_validation",
+            company=company,
+            user=frappe.session.user,
+            queue="long",
+            timeout=BULK_VALIDATION_JOB_TIMEOUT,
+            job_id=f"trn_bulk_validation::{company or 'all'}",
+            deduplicate=True
+        )
+        return {
+            "success": True,
+            "queued": True,
+            "message": _("Validating {0} TRNs in the background. You will be notified when it completes.").format(len(trns)),
+            "results": {
+                "total": len(trns),
+                "valid": 0,
+                "invalid": 0,
+                "errors": 0
+            }
+        }
+
+    return validate_registry_trns(trns, company)
+
+
+def run_bulk_validation(company=None, user=None):
+    """Background job for bulk_validate_all"""
+    result = validate_registry_trns(get_active_trns(company), company)
+
+    if user:
+        results = result["results"]
+        frappe.publish_realtime(
+            "msgprint",
+            {
+                "title": _("Bulk Validation Complete") if result["success"] else _("Validation Error"),
+                "message": _("Validated {0} TRNs:<br>- Valid: {1}<br>- Invalid: {2}<br>- Errors: {3}").format(
+                    results["total"], results["valid"], results["invalid"], results["errors"]
+                ) if result["success"] else result["message"],
+                "indicator": "green" if result["success"] else "red"
+            },
+            user=user
+        )
+
+    return result
+
+
+def get_active_trns(company=None):
+    """Active TRN Registry records to validate"""
     # Build filters
     filters = {"is_active": 1}
     if company:
         filters["company"] = company
 
-    # Get all TRNs to validate
-    trns = frappe.get_all(
+    return frappe.get_all(
         "TRN Registry",
         filters=filters,
-        fields=["name", "trn", "company"]
+        fields=["name", "trn", "company"],
+        limit_page_length=0
     )
 
+
+def validate_registry_trns(trns, company=None):
+    """Validate TRN Registry records in bulk and store their new status"""
     if not trns:
         return {
             "success": True,
@@ -160,20 +224,20 @@ def bulk_validate_all(company=None):
     try:
         validation_result = bulk_validate_trns(trn_numbers, company=company)
 
-        # Update TRN Registry records with results
+        # Update TRN Registry records with results, in one batch
         results_map = validation_result.get("results", {})
+        validated_at = now_datetime()
+        updates = {}
         for trn_doc in trns:
             trn_result = results_map.get(trn_doc.trn, {})
             if trn_result:
-                new_status = "Valid" if trn_result.get("valid") else "Invalid"
-                frappe.db.set_value(
-                    "TRN Registry",
-                    trn_doc.name,
-                    {
-                        "validation_status": new_status,
-                        "last_validated": now_datetime()
-                    }
-                )
+                updates[trn_doc.name] = {
+                    "validation_status": "Valid" if trn_result.get("valid") else "Invalid",
+                    "last_validated": validated_at
+                }
+
+        if updates:
+            frappe.db.bulk_update("TRN Registry", updates)
 
         frappe.db.commit()
 
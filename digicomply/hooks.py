@@ -52,17 +52,25 @@ notification_config = "digicomply.notifications.get_notification_config"
 
 # DocType Events
 doc_events = {
-    "Reconciliation Run": {
-        "on_submit": "digicomply.digicomply.doctype.reconciliation_run.reconciliation_run.on_submit_handler",
-    },
+    # Reconciliation Run queues itself in ReconciliationRun.on_submit
     "Sales Invoice": {
         "on_submit": "digicomply.digicomply.doctype.e_invoice.e_invoice.auto_create_e_invoice",
     },
     # CSV Import processes automatically in validate()
 }
 
+# Request / Job Hooks
+# Buffered API Log records are handed to a background insert once the work is done
+after_request = ["digicomply.digicomply.doctype.api_log.api_log.flush_api_logs"]
+after_job = ["digicomply.digicomply.doctype.api_log.api_log.flush_api_logs"]
+
 # Scheduled Tasks
 scheduler_events = {
+    "cron": {
+        "*/10 * * * *": [
+            "digicomply.reconciliation.tasks.resume_stalled_reconciliations",
+        ],
+    },
     "daily": [
         "digicomply.reconciliation.tasks.check_pending_reconciliations",
         "digicomply.digicomply.doctype.auditor_access.auditor_access.check_expired_access",
@@ -0,0 +1,211 @@
+# Copyright (c) 2024, DigiComply and contributors
+# License: MIT
+
+"""
+Pooled keep-alive HTTP sessions for ASP and FTA calls
+
+Plain requests.request() (or a new Session per call) opens a fresh TCP
+connection and TLS handshake for every request. get_session() instead
+keeps one requests.Session per ASP Connection / FTA endpoint for the
+life of the worker process, so consecutive calls reuse open connections.
+
+- Sessions are keyed per site, so a multi-tenant worker never shares one
+  between sites.
+- Each session carries a fingerprint of its base URL and credentials; a
+  different fingerprint (credentials rotated, URL changed) closes the old
+  session and opens a new one. Sessions idle for longer than the
+  keep-alive window are recycled as well.
+- Pool sizes and the keep-alive window can be tuned in site_config.json
+  (digicomply_http_pool_connections, digicomply_http_pool_maxsize,
+  digicomply_http_keepalive_seconds).
+
+send() records request latency split by whether the request opened a new
+connection or reused a pooled one; get_pool_stats() reports both averages
+and the time saved on reused connections.
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+import frappe
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_KEEPALIVE_SECONDS = 120
+
+# Latency counters are kept in Redis for a day, summed across workers
+POOL_STATS_TTL = 24 * 60 * 60
+POOL_STATS_FIELDS = ("new_requests", "new_ms", "reused_requests", "reused_ms")
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+class PooledSession:
+    """A requests.Session with the fingerprint it was opened for"""
+
+    def __init__(self, session, adapter, fingerprint):
+        self.session = session
+        self.adapter = adapter
+        self.fingerprint = fingerprint
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.session.close()
+        except Exception:
+            pass
+
+
+def get_fingerprint(*parts) -> str:
+    """Stable hash of the base URL and credentials a session is opened for"""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_retry(max_retries=3, backoff_factor=0.5, status_forcelist=(502, 503, 504), allowed_methods=None):
+    """
+    Retry policy for a pooled adapter
+
+    By default only connection failures and gateway errors on idempotent
+    methods are retried, so a POST that reached the server is never sent
+    twice.
+    """
+    return Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=list(status_forcelist),
+        allowed_methods=allowed_methods or Retry.DEFAULT_ALLOWED_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+
+
+def get_session(key, fingerprint, retry=None) -> PooledSession:
+    """
+    Pooled session for key, opened (or recycled) as needed
+
+    Args:
+        key: Identifies the remote, e.g. "asp::<connection>" or "fta::<url>"
+        fingerprint: get_fingerprint() of whatever should force a new session
+        retry: urllib3 Retry for the adapter; get_retry() if not given
+    """
+    registry_key = (frappe.local.site, key)
+    keepalive = frappe.conf.get("digicomply_http_keepalive_seconds") or DEFAULT_KEEPALIVE_SECONDS
+    now = time.monotonic()
+
+    with _lock:
+        pooled = _sessions.get(registry_key)
+        if pooled and (pooled.fingerprint != fingerprint or now - pooled.last_used > keepalive):
+            pooled.close()
+            pooled = None
+
+        if not pooled:
+            pooled = _open_session(fingerprint, retry or get_retry())
+            _sessions[registry_key] = pooled
+
+        pooled.last_used = now
+        return pooled
+
+
+def _open_session(fingerprint, retry) -> PooledSession:
+    adapter = HTTPAdapter(
+        pool_connections=frappe.conf.get("digicomply_http_pool_connections") or DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=frappe.conf.get("digicomply_http_pool_maxsize") or DEFAULT_POOL_MAXSIZE,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return PooledSession(session, adapter, fingerprint)
+
+
+def close_session(key):
+    """Drop the pooled session for key, e.g. after a connection is disabled"""
+    with _lock:
+        pooled = _sessions.pop((frappe.local.site, key), None)
+    if pooled:
+        pooled.close()
+
+
+def send(key, pooled, method, url, latency=None, **kwargs):
+    """
+    session.request() that records latency against key
+
+    A request counts as "new" when the session's pools opened a connection
+    while it ran, otherwise as "reused". Worker threads have no site
+    context, so they pass a latency list: the (key, elapsed_ms, reused)
+    measurement is appended to it and recorded later with record_latency().
+    """
+    opened_before = _count_connections(pooled)
+
+    start = time.perf_counter()
+    try:
+        return pooled.session.request(method, url, **kwargs)
+    finally:
+        measurement = (
+            key,
+            int((time.perf_counter() - start) * 1000),
+            _count_connections(pooled) == opened_before
+        )
+        if latency is None:
+            record_latency(*measurement)
+        else:
+            latency.append(measurement)
+
+
+def _count_connections(pooled) -> int:
+    """Connections opened so far by every pool of the session's adapter"""
+    pools = pooled.adapter.poolmanager.pools
+    total = 0
+    for pool_key in pools.keys():
+        pool = pools.get(pool_key)
+        if pool is not None:
+            total += pool.num_connections
+    return total
+
+
+def record_latency(key, elapsed_ms, reused):
+    prefix = "reused" if reused else "new"
+    try:
+        cache = frappe.cache()
+        for field, amount in ((f"{prefix}_requests", 1), (f"{prefix}_ms", elapsed_ms)):
+            stats_key = cache.make_key(f"http_pool::{key}::{field}")
+            cache.incrby(stats_key, amount)
+            cache.expire(stats_key, POOL_STATS_TTL)
+    except Exception:
+        # Metrics must never fail a request
+        pass
+
+
+def get_pool_stats(key) -> dict:
+    """
+    Latency of new vs reused connections for key over the last day
+
+    saved_ms estimates the handshake time avoided: reused requests times
+    the difference between the two averages.
+    """
+    cache = frappe.cache()
+    stats = {
+        field: int(cache.get(cache.make_key(f"http_pool::{key}::{field}")) or 0)
+        for field in POOL_STATS_FIELDS
+    }
+
+    avg_new = stats["new_ms"] / stats["new_requests"] if stats["new_requests"] else 0
+    avg_reused = stats["reused_ms"] / stats["reused_requests"] if stats["reused_requests"] else 0
+    total = stats["new_requests"] + stats["reused_requests"]
+
+    stats.update({
+        "avg_new_ms": round(avg_new, 1),
+        "avg_reused_ms": round(avg_reused, 1),
+        "reuse_rate": round(stats["reused_requests"] * 100 / total, 1) if total else 0,
+        "saved_ms": int(max(avg_new - avg_reused, 0) * stats["reused_requests"]) if avg_new else 0,
+    })
+    return stats
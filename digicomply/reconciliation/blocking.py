@@ -0,0 +1,203 @@
+# Copyright (c) 2024, DigiComply and contributors
+# License: MIT
+
+"""
+Candidate blocking for fuzzy invoice matching
+
+Scoring every unmatched ASP invoice against every unmatched book invoice
+is quadratic. FuzzyMatchIndex narrows the search down to a small candidate
+set per book invoice using three blocking keys:
+
+- n-grams of the normalized invoice number (rarest grams are probed first)
+- amount buckets sized to the reconciliation tolerance
+- a date window around the book invoice posting date
+
+Only the candidates are scored with SequenceMatcher, using the same
+threshold and amount boost as ReconciliationRun.find_fuzzy_match.
+"""
+
+import datetime
+import heapq
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+from frappe.utils import flt
+
+
+# Minimum similarity for a fuzzy match and the boost for matching amounts
+FUZZY_MATCH_THRESHOLD = 0.7
+AMOUNT_MATCH_BOOST = 0.15
+
+# Blocking defaults
+NGRAM_SIZE = 3
+MAX_NGRAM_PROBES = 6
+MAX_NGRAM_POSTINGS = 1000
+MAX_CANDIDATES = 50
+DATE_WINDOW_DAYS = 7
+
+
+def _to_date(value):
+    """Best-effort conversion of a posting date to datetime.date"""
+    if not value:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    try:
+        return datetime.date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def get_asp_amount(asp_inv):
+    """Grand total of an ASP row, honouring the legacy 'total' column"""
+    return flt(asp_inv.get("grand_total") or asp_inv.get("total"), 2)
+
+
+def get_asp_date(asp_inv):
+    """Posting date of an ASP row, honouring the 'invoice_date' column"""
+    return asp_inv.get("posting_date") or asp_inv.get("invoice_date")
+
+
+class FuzzyMatchIndex:
+    """
+    Blocking index over ASP invoices for fuzzy matching.
+
+    Build it once per reconciliation run, then call best_match() for each
+    unmatched book invoice. Candidates are scored in the original ASP
+    order so ties resolve exactly like the brute-force scan.
+    """
+
+    def __init__(self, asp_map, normalize, tolerance, ngram_size=NGRAM_SIZE,
+                 max_candidates=MAX_CANDIDATES, date_window_days=DATE_WINDOW_DAYS):
+        self.normalize = normalize
+        self.tolerance = flt(tolerance)
+        self.ngram_size = ngram_size
+        self.max_candidates = max_candidates
+        self.date_window_days = date_window_days
+
+        # Amount buckets are at least one fils wide so zero tolerance still works
+        self.bucket_width = max(self.tolerance, 0.01)
+
+        self.keys = []
+        self.records = []
+        self.normalized = []
+        self.amounts = []
+
+        self.ngram_postings = defaultdict(list)
+        self.amount_buckets = defaultdict(list)
+        self.dates = []
+
+        for position, (inv_no, asp_inv) in enumerate(asp_map.items()):
+            normalized = self.normalize(inv_no)
+            amount = get_asp_amount(asp_inv)
+
+            self.keys.append(inv_no)
+            self.records.append(asp_inv)
+            self.normalized.append(normalized)
+            self.amounts.append(amount)
+            self.dates.append(_to_date(get_asp_date(asp_inv)))
+
+            for gram in self.get_ngrams(normalized):
+                self.ngram_postings[gram].append(position)
+
+            self.amount_buckets[self.get_amount_bucket(amount)].append(position)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def get_ngrams(self, normalized):
+        """Distinct n-grams of a normalized invoice number"""
+        if not normalized:
+            return set()
+        if len(normalized) <= self.ngram_size:
+            return {normalized}
+        size = self.ngram_size
+        return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+    def get_amount_bucket(self, amount):
+        return int(amount // self.bucket_width)
+
+    def candidates(self, erp_normalized, erp_amount, erp_date, already_matched):
+        """
+        Return candidate positions for a book invoice, in ASP order.
+
+        Combines the best n-gram hits with amount-bucket hits that fall
+        inside the date window (those can still pass thanks to the boost).
+        """
+        hits = defaultdict(int)
+
+        # Probe the rarest grams first; very common grams carry no signal
+        grams = [g for g in self.get_ngrams(erp_normalized) if g in self.ngram_postings]
+        grams.sort(key=lambda g: len(self.ngram_postings[g]))
+
+        for gram in grams[:MAX_NGRAM_PROBES]:
+            postings = self.ngram_postings[gram]
+            if len(postings) > MAX_NGRAM_POSTINGS:
+                break
+            for position in postings:
+                hits[position] += 1
+
+        selected = set(
+            heapq.nlargest(
+                self.max_candidates,
+                (p for p in hits if self.keys[p] not in already_matched),
+                key=lambda p: (hits[p], -p)
+            )
+        )
+
+        # Amount + date blocking catches pairs the boost can lift over the threshold
+        bucket = self.get_amount_bucket(erp_amount)
+        amount_hits = []
+        for key in (bucket - 1, bucket, bucket + 1):
+            for position in self.amount_buckets.get(key, ()):
+                if abs(erp_amount - self.amounts[position]) > self.tolerance:
+                    continue
+                if self.keys[position] in already_matched:
+                    continue
+                if not self._in_date_window(erp_date, self.dates[position]):
+                    continue
+                amount_hits.append(position)
+
+        selected.update(heapq.nsmallest(self.max_candidates, amount_hits))
+
+        return sorted(selected)
+
+    def _in_date_window(self, erp_date, asp_date):
+        if not erp_date or not asp_date:
+            return True
+        return abs((erp_date - asp_date).days) <= self.date_window_days
+
+    def best_match(self, erp_inv, already_matched):
+        """
+        Find the best fuzzy match for a book invoice.
+
+        Returns tuple of (asp_invoice_no, asp_invoice_data, similarity_score) or None
+        """
+        erp_normalized = self.normalize(erp_inv.get("name", ""))
+        erp_amount = flt(erp_inv.get("grand_total"), 2)
+        erp_date = _to_date(erp_inv.get("posting_date"))
+
+        best_match = None
+        best_score = FUZZY_MATCH_THRESHOLD
+
+        for position in self.candidates(erp_normalized, erp_amount, erp_date, already_matched):
+            amount_matches = abs(erp_amount - self.amounts[position]) <= self.tolerance
+            boost = AMOUNT_MATCH_BOOST if amount_matches else 0
+
+            matcher = SequenceMatcher(None, erp_normalized, self.normalized[position])
+
+            # Cheap upper bounds first - skip most candidates without a full diff
+            if matcher.real_quick_ratio() + boost <= best_score:
+                continue
+            if matcher.quick_ratio() + boost <= best_score:
+                continue
+
+            similarity = matcher.ratio() + boost
+
+            if similarity > best_score:
+                best_score = similarity
+                best_match = (self.keys[position], self.records[position], similarity)
+
+        return best_match
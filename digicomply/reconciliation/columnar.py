@@ -0,0 +1,179 @@
+# Copyright (c) 2024, DigiComply and contributors
+# License: MIT
+
+"""
+Columnar storage for parsed ASP rows
+
+A parsed CSV Import is stored as a zip archive with one deflate-compressed
+JSON array per column plus a small meta.json:
+
+    meta.json               {"version": 1, "row_count": n, "columns": [...]}
+    columns/invoice_no.json ["INV-001", "INV-002", ...]
+    columns/grand_total.json [1050.0, 2100.0, ...]
+
+ColumnarInvoiceData reads it lazily: only the invoice_no column is needed
+to build the index (membership tests, len, iteration), the other columns
+are decompressed the first time a row is read, and only the columns the
+caller asked for.
+"""
+
+import json
+import zipfile
+from collections.abc import Mapping
+from io import BytesIO
+from operator import itemgetter
+
+
+COLUMNAR_FORMAT_VERSION = 1
+INDEX_COLUMN = "invoice_no"
+
+
+def get_column_member(column):
+    return f"columns/{column}.json"
+
+
+def write_columnar(rows, columns=None) -> bytes:
+    """
+    Pack a list of row dicts into the columnar zip format.
+
+    columns defaults to every key seen in rows, in first-seen order. Keys a
+    row does not have are stored as null and skipped again on read.
+    """
+    if columns is None:
+        columns = []
+        for row in rows:
+            for key in row:
+                if key not in columns:
+                    columns.append(key)
+
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("meta.json", json.dumps({
+            "version": COLUMNAR_FORMAT_VERSION,
+            "row_count": len(rows),
+            "columns": columns,
+        }))
+
+        for column in columns:
+            values = [row.get(column) for row in rows]
+            archive.writestr(get_column_member(column), json.dumps(values, separators=(",", ":")))
+
+    return buffer.getvalue()
+
+
+class ColumnarInvoiceData(Mapping):
+    """
+    Read-only mapping of invoice number -> row dict over a columnar archive.
+
+    source is a file path or the archive bytes. columns limits the row dicts
+    to those fields (invoice_no is always included). As with the old JSON
+    blob, the last row wins when an invoice number repeats.
+    """
+
+    def __init__(self, source, columns=None):
+        self.source = source if isinstance(source, str) else BytesIO(source)
+
+        meta = json.loads(self._read_member("meta.json"))
+        if meta.get("version") != COLUMNAR_FORMAT_VERSION:
+            raise ValueError(f"Unsupported columnar format version: {meta.get('version')}")
+
+        self.row_count = meta["row_count"]
+        self.available_columns = meta["columns"]
+
+        if columns is None:
+            columns = self.available_columns
+        self.columns = [c for c in self.available_columns if c in columns or c == INDEX_COLUMN]
+
+        self._index = None
+        self._rows = None
+
+    def _read_member(self, member):
+        if not isinstance(self.source, str):
+            self.source.seek(0)
+        with zipfile.ZipFile(self.source) as archive:
+            return archive.read(member)
+
+    def _read_columns(self, columns):
+        if not isinstance(self.source, str):
+            self.source.seek(0)
+        with zipfile.ZipFile(self.source) as archive:
+            return {column: json.loads(archive.read(get_column_member(column))) for column in columns}
+
+    @property
+    def index(self):
+        """invoice number -> row position, built from the invoice_no column only"""
+        if self._index is None:
+            index = {}
+            if INDEX_COLUMN in self.available_columns:
+                invoice_nos = self._read_columns([INDEX_COLUMN])[INDEX_COLUMN]
+                index = dict(zip(invoice_nos, range(len(invoice_nos))))
+
+                # Rows without an invoice number are not addressable
+                for blank in ("", None):
+                    index.pop(blank, None)
+            self._index = index
+        return self._index
+
+    def _load_rows(self):
+        """
+        Decompress the requested columns and build every indexed row at once.
+
+        Zipping whole columns is much cheaper than assembling rows one by
+        one; keys are only dropped from rows where a column holds null.
+        """
+        if self._rows is not None:
+            return self._rows
+
+        data = self._read_columns(self.columns)
+        names = self.columns
+
+        # Keep only the surviving position of each invoice number (last row wins)
+        positions = list(self.index.values())
+        if len(positions) < self.row_count:
+            pick = itemgetter(*positions) if len(positions) > 1 else (lambda col: [col[p] for p in positions])
+            data = {column: pick(data[column]) for column in names}
+
+        rows = [dict(zip(names, values)) for values in zip(*(data[column] for column in names))]
+
+        nullable = [column for column in names if None in data[column]]
+        if nullable:
+            for row in rows:
+                for column in nullable:
+                    if row[column] is None:
+                        del row[column]
+
+        self._rows = dict(zip(self.index, rows))
+        return self._rows
+
+    def get_rows(self, invoice_nos) -> dict:
+        """
+        Row dicts of invoice_nos only, keyed by invoice number
+
+        For callers that need a few rows: the columns are still read, but
+        only the requested rows are built. Numbers not in the data are
+        skipped.
+        """
+        if self._rows is not None:
+            return {inv_no: self._rows[inv_no] for inv_no in invoice_nos if inv_no in self._rows}
+
+        positions = {inv_no: self.index[inv_no] for inv_no in invoice_nos if inv_no in self.index}
+        if not positions:
+            return {}
+
+        data = self._read_columns(self.columns)
+        return {
+            inv_no: {column: data[column][position] for column in self.columns if data[column][position] is not None}
+            for inv_no, position in positions.items()
+        }
+
+    def __getitem__(self, invoice_no):
+        return self._load_rows()[invoice_no]
+
+    def __contains__(self, invoice_no):
+        return invoice_no in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
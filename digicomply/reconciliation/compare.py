@@ -0,0 +1,121 @@
+# Copyright (c) 2024, DigiComply and contributors
+# License: MIT
+
+"""
+Batched tolerance comparison for reconciliation pairs
+
+compare_pairs() checks grand total, VAT and invoice date for a whole batch
+of (book invoice, ASP row) pairs at once. Values are packed into columns
+and every tolerance breach is found in one pass; difference dicts are only
+built for the pairs that actually differ.
+
+NumPy is used when installed, otherwise the same columns are compared in
+plain Python. Both produce exactly what
+ReconciliationRun.compare_invoices_with_tolerance used to return per pair.
+"""
+
+from frappe.utils import flt
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+def get_columns(pairs):
+    """Pack the compared fields of each pair into parallel lists"""
+    erp_total, asp_total, erp_vat, asp_vat, erp_date, asp_date = [], [], [], [], [], []
+
+    for erp_inv, asp_inv in pairs:
+        erp_total.append(flt(erp_inv.get("grand_total"), 2))
+        asp_total.append(flt(asp_inv.get("grand_total") or asp_inv.get("total"), 2))
+        erp_vat.append(flt(erp_inv.get("total_taxes_and_charges"), 2))
+        asp_vat.append(flt(asp_inv.get("vat_amount") or asp_inv.get("tax_amount"), 2))
+        erp_date.append(str(erp_inv.get("posting_date")))
+        asp_date.append(str(asp_inv.get("posting_date") or asp_inv.get("invoice_date") or ""))
+
+    return {
+        "erp_total": erp_total,
+        "asp_total": asp_total,
+        "erp_vat": erp_vat,
+        "asp_vat": asp_vat,
+        "erp_date": erp_date,
+        "asp_date": asp_date,
+    }
+
+
+def get_breaches(columns, tolerance):
+    """
+    Find tolerance breaches for every pair at once.
+
+    Returns the positions of pairs with at least one breach, plus the
+    per-pair (total, vat, date) breach flags.
+    """
+    if HAS_NUMPY:
+        erp_date = np.asarray(columns["erp_date"], dtype=str)
+        asp_date = np.asarray(columns["asp_date"], dtype=str)
+
+        total_breach = np.abs(
+            np.asarray(columns["erp_total"], dtype=float) - np.asarray(columns["asp_total"], dtype=float)
+        ) > tolerance
+        vat_breach = np.abs(
+            np.asarray(columns["erp_vat"], dtype=float) - np.asarray(columns["asp_vat"], dtype=float)
+        ) > tolerance
+        date_breach = (erp_date != "") & (asp_date != "") & (erp_date != asp_date)
+
+        breached = np.flatnonzero(total_breach | vat_breach | date_breach).tolist()
+        return breached, total_breach, vat_breach, date_breach
+
+    total_breach = [abs(e - a) > tolerance for e, a in zip(columns["erp_total"], columns["asp_total"])]
+    vat_breach = [abs(e - a) > tolerance for e, a in zip(columns["erp_vat"], columns["asp_vat"])]
+    date_breach = [bool(e and a and e != a) for e, a in zip(columns["erp_date"], columns["asp_date"])]
+
+    breached = [i for i, flags in enumerate(zip(total_breach, vat_breach, date_breach)) if any(flags)]
+    return breached, total_breach, vat_breach, date_breach
+
+
+def compare_pairs(pairs, tolerance):
+    """
+    Compare (book invoice, ASP row) pairs using one tolerance for the batch.
+
+    Returns a list of differences lists, one per pair in input order; pairs
+    within tolerance get an empty list.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return []
+
+    columns = get_columns(pairs)
+    breached, total_breach, vat_breach, date_breach = get_breaches(columns, flt(tolerance))
+
+    results = [[] for _ in pairs]
+
+    # Only pairs with a breach get difference dicts
+    for i in breached:
+        differences = results[i]
+
+        if total_breach[i]:
+            differences.append({
+                "field": "Grand Total",
+                "erp_value": columns["erp_total"][i],
+                "asp_value": columns["asp_total"][i],
+                "difference": columns["erp_total"][i] - columns["asp_total"][i],
+            })
+
+        if vat_breach[i]:
+            differences.append({
+                "field": "VAT Amount",
+                "erp_value": columns["erp_vat"][i],
+                "asp_value": columns["asp_vat"][i],
+                "difference": columns["erp_vat"][i] - columns["asp_vat"][i],
+            })
+
+        if date_breach[i]:
+            differences.append({
+                "field": "Invoice Date",
+                "erp_value": columns["erp_date"][i],
+                "asp_value": columns["asp_date"][i],
+            })
+
+    return results
@@ -7,6 +7,7 @@ DigiComply Scheduled Tasks
 
 import frappe
 from frappe import _
+from frappe.utils import add_to_date, cint, now_datetime
 
 
 def check_pending_reconciliations():
@@ -91,3 +92,51 @@ def generate_weekly_summary():
                 for s in summary
             ])
         )
+
+
+def resume_stalled_reconciliations():
+    """
+    Scheduled task: Re-queue reconciliation runs whose worker died mid-run
+
+    A run stuck in Queued or In Progress with no live background job is
+    enqueued again. Reconciliation is idempotent (items are replaced and
+    counts overwritten), so the run simply restarts from the beginning.
+    A run whose worker keeps dying (out of memory, a poison row) is marked
+    Failed once it was re-queued MAX_RUN_RESUMES times.
+    """
+    from digicomply.digicomply.doctype.reconciliation_run.reconciliation_run import (
+        MAX_RUN_RESUMES,
+        STALLED_RUN_MINUTES,
+    )
+
+    max_resumes = cint(frappe.conf.get("digicomply_max_reconciliation_resumes")) or MAX_RUN_RESUMES
+
+    stalled_runs = frappe.get_all(
+        "Reconciliation Run",
+        filters={
+            "docstatus": 1,
+            "status": ["in", ["Queued", "In Progress"]],
+            "modified": ["<", add_to_date(now_datetime(), minutes=-STALLED_RUN_MINUTES)],
+        },
+        fields=["name", "progress_stage", "resume_count"],
+    )
+
+    for run in stalled_runs:
+        doc = frappe.get_doc("Reconciliation Run", run.name)
+        if doc.has_live_job():
+            continue
+
+        if cint(run.resume_count) >= max_resumes:
+            try:
+                doc.mark_failed(_("The run stopped at stage '{0}' after {1} restarts").format(
+                    run.progress_stage, run.resume_count
+                ))
+            except frappe.ValidationError:
+                pass
+            continue
+
+        frappe.logger("digicomply").info(
+            f"Reconciliation {run.name}: re-queueing run interrupted at stage '{run.progress_stage}'"
+        )
+        doc.enqueue_reconciliation(resume_count=cint(run.resume_count) + 1)
+        frappe.db.commit()
@@ -0,0 +1,150 @@
+# Copyright (c) 2024, DigiComply
+# Benchmark script for reconciliation matching
+
+"""
+DigiComply Reconciliation Benchmark
+
+Measures fuzzy matching throughput on synthetic data:
+1. Generate book and ASP invoices (some renumbered, some missing)
+2. Run fuzzy matching through the FuzzyMatchIndex blocking layer
+3. Compare against the brute-force scan on the smaller sizes
+
+Accuracy is the share of renumbered ASP invoices paired with their
+true book invoice.
+
+Nothing is written to the database.
+
+Run with: bench --site [sitename] execute digicomply.tests.benchmark_reconciliation.run_benchmark
+"""
+
+import random
+import time
+import datetime
+
+import frappe
+
+from digicomply.reconciliation.blocking import FuzzyMatchIndex
+
+
+SIZES = [1000, 5000, 20000, 50000, 200000]
+BRUTE_FORCE_LIMIT = 5000
+
+
+def run_benchmark(sizes=None, seed=42):
+    """Main benchmark function"""
+    sizes = sizes or SIZES
+    recon = frappe.new_doc("Reconciliation Run")
+    recon.tolerance_amount = 0.5
+
+    print("\n" + "=" * 60)
+    print("DigiComply Fuzzy Matching Benchmark")
+    print("=" * 60)
+    print(f"  {'Invoices':>10}  {'Indexed (s)':>12}  {'us/invoice':>10}  {'Accuracy':>9}  {'Brute (s)':>10}  {'Accuracy':>9}")
+
+    results = []
+    for size in sizes:
+        erp_invoices, asp_invoices = generate_invoices(size, seed=seed)
+
+        indexed_time, indexed_matches = time_matching(recon, erp_invoices, asp_invoices, indexed=True)
+        indexed_accuracy = get_accuracy(indexed_matches, asp_invoices)
+
+        brute_time, brute_accuracy = None, None
+        if size <= BRUTE_FORCE_LIMIT:
+            brute_time, brute_matches = time_matching(recon, erp_invoices, asp_invoices, indexed=False)
+            brute_accuracy = get_accuracy(brute_matches, asp_invoices)
+
+        per_invoice_us = indexed_time / size * 1e6
+        print(
+            f"  {size:>10}  {indexed_time:>12.2f}  {per_invoice_us:>10.1f}  {indexed_accuracy:>9.1%}"
+            f"  {f'{brute_time:.2f}' if brute_time is not None else '-':>10}"
+            f"  {f'{brute_accuracy:.1%}' if brute_accuracy is not None else '-':>9}"
+        )
+
+        results.append({
+            "size": size,
+            "indexed_seconds": indexed_time,
+            "indexed_accuracy": indexed_accuracy,
+            "brute_force_seconds": brute_time,
+            "brute_force_accuracy": brute_accuracy,
+        })
+
+    print("=" * 60 + "\n")
+    return results
+
+
+def generate_invoices(size, seed=42):
+    """
+    Generate synthetic book and ASP invoices.
+
+    Roughly 90% of ASP rows keep the book number, 7% are renumbered the way
+    ASP exports usually differ (prefix, separators), 3% are missing.
+    """
+    rng = random.Random(seed)
+    start = datetime.date(2024, 1, 1)
+
+    erp_invoices = {}
+    asp_invoices = {}
+
+    for i in range(size):
+        name = f"SINV-24-{i:06d}"
+        posting_date = start + datetime.timedelta(days=rng.randint(0, 30))
+        grand_total = round(rng.uniform(100, 50000), 2)
+        vat = round(grand_total * 0.05 / 1.05, 2)
+
+        erp_invoices[name] = frappe._dict({
+            "name": name,
+            "company": "Benchmark Company",
+            "posting_date": posting_date,
+            "customer_name": f"Customer {i % 500}",
+            "grand_total": grand_total,
+            "total_taxes_and_charges": vat,
+        })
+
+        roll = rng.random()
+        if roll < 0.03:
+            continue
+        asp_no = name if roll < 0.93 else f"INV/24/{i:06d}"
+
+        asp_invoices[asp_no] = {
+            "invoice_no": asp_no,
+            "posting_date": posting_date.isoformat(),
+            "grand_total": grand_total,
+            "vat_amount": vat,
+        }
+
+    return erp_invoices, asp_invoices
+
+
+def get_accuracy(matches, asp_invoices):
+    """Share of renumbered ASP invoices matched to their true book invoice"""
+    renumbered = [k for k in asp_invoices if k.startswith("INV/")]
+    expected = {k: "SINV-24-" + k.rsplit("/", 1)[-1] for k in renumbered}
+    actual = {asp_no: inv_no for inv_no, asp_no in matches.items()}
+
+    correct = sum(1 for k in renumbered if actual.get(k) == expected[k])
+    return correct / max(len(renumbered), 1)
+
+
+def time_matching(recon, erp_invoices, asp_invoices, indexed=True):
+    """Time the fuzzy pass for book invoices without an exact ASP match"""
+    unmatched = {k: v for k, v in erp_invoices.items() if k not in asp_invoices}
+    asp_matched = set(k for k in erp_invoices if k in asp_invoices)
+
+    start = time.perf_counter()
+
+    index = None
+    if indexed:
+        index = FuzzyMatchIndex(
+            {k: v for k, v in asp_invoices.items() if k not in asp_matched},
+            recon.normalize_invoice_number,
+            recon.get_tolerance()
+        )
+
+    matches = {}
+    for inv_no, erp_inv in unmatched.items():
+        match = recon.find_fuzzy_match(erp_inv, asp_invoices, asp_matched, index)
+        if match:
+            asp_matched.add(match[0])
+            matches[inv_no] = match[0]
+
+    return time.perf_counter() - start, matches
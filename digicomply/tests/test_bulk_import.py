@@ -0,0 +1,201 @@
+# Copyright (c) 2024, DigiComply
+# Tests for parallel and resumable Bulk Import processing
+
+"""
+Run with: bench --site [sitename] run-tests --module digicomply.tests.test_bulk_import
+"""
+
+import csv
+import os
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from digicomply.digicomply.doctype.bulk_import_log import bulk_import_log
+from digicomply.digicomply.doctype.bulk_import_log.bulk_import_log import (
+    claim_import_chunk,
+    get_checkpoint_tally,
+    get_shard_rows,
+    import_rows,
+    scan_data_rows,
+)
+
+
+SHARD_FILES = {
+    "plain": "name,trn\n" + "".join(f"Customer {i},1000{i}\n" for i in range(23)),
+    "quoted newlines": '"name","address"\n' + "".join(f'"C{i}","line 1\nline {i}"\n' for i in range(17)),
+    "blank rows": "name,trn\n" + "".join(f"C{i},{i}\n\n , \n" for i in range(19)),
+    "bare cr": "name,trn\n" + "".join(f"C{i},{i}\r" if i % 5 == 3 else f"C{i},{i}\n" for i in range(21)),
+    "crlf, no final newline": "name,trn\r\n" + "\r\n".join(f'C{i},"{i}"' for i in range(20)),
+}
+
+
+class TestImportShards(FrappeTestCase):
+    def write_file(self, text, encoding="utf-8"):
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "wb") as f:
+            f.write(text.encode(encoding))
+        self.addCleanup(os.remove, path)
+        return path
+
+    def get_data_rows(self, text):
+        rows = [row for row in csv.reader(StringIO(text, newline="")) if any(cell.strip() for cell in row)]
+        return rows[1:]
+
+    def read_shards(self, path, rows_per_shard, encoding="utf-8"):
+        """Rows of each shard, read the way process_import_shard reads them"""
+        total_rows, offsets = scan_data_rows(path, encoding, ",", rows_per_shard)
+        shards = [(start, min(start + rows_per_shard, total_rows)) for start in range(0, total_rows, rows_per_shard)]
+
+        return total_rows, [
+            list(get_shard_rows(path, encoding, ",", start, end, offsets.get(start), offsets.get(end)))
+            for start, end in shards
+        ]
+
+    def test_shards_cover_every_row_once(self):
+        for label, text in SHARD_FILES.items():
+            path = self.write_file(text)
+            expected = self.get_data_rows(text)
+
+            for rows_per_shard in (1, 4, 7, len(expected)):
+                with self.subTest(file=label, rows_per_shard=rows_per_shard), \
+                        patch("frappe.log_error") as log_error:
+                    total_rows, shard_rows = self.read_shards(path, rows_per_shard)
+
+                    self.assertEqual(total_rows, len(expected))
+                    self.assertEqual([row for rows in shard_rows for row in rows], expected)
+                    self.assertTrue(all(len(rows) <= rows_per_shard for rows in shard_rows))
+                    log_error.assert_not_called()
+
+    def test_utf8_bom(self):
+        text = SHARD_FILES["quoted newlines"]
+        path = self.write_file(text, "utf-8-sig")
+
+        total_rows, shard_rows = self.read_shards(path, 5, "utf-8-sig")
+        self.assertEqual([row for rows in shard_rows for row in rows], self.get_data_rows(text))
+
+    def test_misaligned_offset_falls_back_to_parsing(self):
+        text = SHARD_FILES["quoted newlines"]
+        path = self.write_file(text)
+        expected = self.get_data_rows(text)
+        _total, offsets = scan_data_rows(path, "utf-8", ",", 5)
+
+        for offset in (offsets[5] + 1, offsets[5] - 8, offsets[10]):
+            with self.subTest(offset=offset), patch("frappe.log_error") as log_error:
+                rows = list(get_shard_rows(path, "utf-8", ",", 5, 10, offset, offsets[10]))
+
+                self.assertEqual(rows, expected[5:10])
+                log_error.assert_called_once()
+
+
+class WorkerKilled(BaseException):
+    """Stands in for a worker dying mid-import; per-row handling does not catch it"""
+
+
+class TestResumableImport(FrappeTestCase):
+    def setUp(self):
+        self.import_log = frappe.get_doc({
+            "doctype": "Bulk Import Log",
+            "import_type": "Customer",
+            "file": "/private/files/test-resumable-import.csv",
+            "status": "Processing",
+        }).insert(ignore_permissions=True)
+        frappe.db.commit()
+        self.addCleanup(self.delete_import_log)
+
+        patcher = patch.object(bulk_import_log, "IMPORT_BATCH_SIZE", 3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.header = ["customer_name"]
+        self.rows = [[f"Customer {i}"] for i in range(10)]
+
+    def delete_import_log(self):
+        frappe.db.rollback()
+        frappe.db.delete("Bulk Import Checkpoint", {"import_log": self.import_log.name})
+        frappe.delete_doc("Bulk Import Log", self.import_log.name, force=True, ignore_permissions=True)
+        frappe.db.commit()
+
+    def get_handler(self, seen, kill_at=None):
+        def handler(row_data, import_log, row_num, context=None):
+            if row_num == kill_at:
+                raise WorkerKilled
+            seen.append(row_num)
+            return {"status": "success"}
+
+        return handler
+
+    def run_interrupted(self, data_rows, kill_at=None):
+        """Import until the worker dies, then drop the uncommitted chunk as process_import does"""
+        seen = []
+        with self.assertRaises(WorkerKilled):
+            import_rows(self.import_log, self.get_handler(seen, kill_at), self.header, data_rows)
+        frappe.db.rollback()
+        return seen
+
+    def resume(self):
+        """Import again from the checkpoints, as process_import does on resume"""
+        seen = []
+        tally = get_checkpoint_tally(self.import_log.name)
+        done_ranges = tally.pop("ranges")
+
+        tally = import_rows(
+            self.import_log, self.get_handler(seen), self.header, self.rows, tally=tally, done_ranges=done_ranges
+        )
+        return seen, tally
+
+    def test_resume_after_reading_stops(self):
+        def rows_until_killed():
+            for index, row in enumerate(self.rows):
+                if index == 7:
+                    raise WorkerKilled
+                yield row
+
+        first = self.run_interrupted(rows_until_killed())
+        second, tally = self.resume()
+
+        # Chunks of rows 2-4 and 5-7 were committed; the resume starts at row 8
+        self.assertEqual(first, list(range(2, 8)))
+        self.assertEqual(second, list(range(8, 12)))
+        self.assertEqual((tally["processed"], tally["success"]), (10, 10))
+
+    def test_resume_after_dying_mid_chunk(self):
+        first = self.run_interrupted(self.rows, kill_at=9)
+        second, tally = self.resume()
+
+        # Row 8 was imported in the chunk that died uncommitted, so it is imported again
+        self.assertEqual(first, list(range(2, 9)))
+        self.assertEqual(second, list(range(8, 12)))
+        self.assertEqual((tally["processed"], tally["success"]), (10, 10))
+
+        ranges = get_checkpoint_tally(self.import_log.name)["ranges"]
+        self.assertEqual(ranges, [(2, 4), (5, 7), (8, 10), (11, 11)])
+
+    def test_chunk_is_claimed_once(self):
+        chunk = [(2, {"customer_name": "Customer 0"}), (3, {"customer_name": "Customer 1"})]
+
+        self.assertTrue(claim_import_chunk(self.import_log, chunk))
+        self.assertIsNone(claim_import_chunk(self.import_log, chunk))
+
+    def test_live_import_is_not_claimed_again(self):
+        claim_import_chunk(self.import_log, [(2, {"customer_name": "Customer 0"})])
+        frappe.db.commit()
+
+        with patch("frappe.utils.background_jobs.is_job_enqueued", return_value=True), \
+                patch("frappe.enqueue") as enqueue:
+            self.assertRaises(frappe.ValidationError, self.import_log.resume_import)
+
+            self.import_log.status = "Failed"
+            self.assertRaises(frappe.ValidationError, self.import_log.start_import)
+            enqueue.assert_not_called()
+
+        # start_import kept the running attempt's checkpoints
+        self.assertTrue(frappe.db.exists("Bulk Import Checkpoint", {"import_log": self.import_log.name}))
+
+        with patch("frappe.utils.background_jobs.is_job_enqueued", return_value=False), \
+                patch("frappe.enqueue") as enqueue:
+            self.import_log.resume_import()
+            enqueue.assert_called_once()
@@ -162,72 +162,77 @@ def setup_invoices(company, customers):
         if frappe.db.exists("Sales Invoice", inv_name):
             frappe.delete_doc("Sales Invoice", inv_name, force=True)
 
-        # Get default income account
+        try:
+            invoices.append(create_sales_invoice(company, inv_data))
+        except Exception as e:
+            print(f"  Warning: Could not create {inv_name}: {e}")
+
+    frappe.db.commit()
+    return invoices
+
+
+def create_sales_invoice(company, inv_data):
+    """Create and submit one Sales Invoice of a single service line plus 5% VAT"""
+    # Get default income account
+    income_account = frappe.db.get_value(
+        "Account",
+        {"company": company.name, "account_type": "Income Account", "is_group": 0},
+        "name"
+    )
+    if not income_account:
         income_account = frappe.db.get_value(
             "Account",
-            {"company": company.name, "account_type": "Income Account", "is_group": 0},
+            {"company": company.name, "root_type": "Income", "is_group": 0},
             "name"
         )
-        if not income_account:
-            income_account = frappe.db.get_value(
-                "Account",
-                {"company": company.name, "root_type": "Income", "is_group": 0},
-                "name"
-            )
-
-        # Get default tax account
+
+    # Get default tax account
+    tax_account = frappe.db.get_value(
+        "Account",
+        {"company": company.name, "account_type": "Tax", "is_group": 0},
+        "name"
+    )
+    if not tax_account:
         tax_account = frappe.db.get_value(
             "Account",
-            {"company": company.name, "account_type": "Tax", "is_group": 0},
-            "name"
-        )
-        if not tax_account:
-            tax_account = frappe.db.get_value(
-                "Account",
-                {"company": company.name, "account_name": ["like", "%VAT%"], "is_group": 0},
-                "name"
-            )
-
-        # Get receivable account
-        receivable_account = frappe.db.get_value(
-            "Account",
-            {"company": company.name, "account_type": "Receivable", "is_group": 0},
+            {"company": company.name, "account_name": ["like", "%VAT%"], "is_group": 0},
             "name"
         )
 
-        invoice = frappe.get_doc({
-            "doctype": "Sales Invoice",
-            "naming_series": "",
-            "name": inv_name,
-            "customer": inv_data["customer"],
-            "company": company.name,
-            "posting_date": inv_data["date"],
-            "due_date": add_days(inv_data["date"], 30),
-            "debit_to": receivable_account,
-            "items": [{
-                "item_name": "Service",
-                "description": "Consulting Service",
-                "qty": 1,
-                "rate": inv_data["total"],
-                "income_account": income_account,
-            }],
-            "taxes": [{
-                "charge_type": "On Net Total",
-                "account_head": tax_account,
-                "description": "VAT 5%",
-                "rate": 5,
-            }] if tax_account else [],
-        })
-
-        try:
-            invoice.insert(ignore_permissions=True)
-            invoice.submit()
-            invoices.append(invoice)
-        except Exception as e:
-            print(f"  Warning: Could not create {inv_name}: {e}")
+    # Get receivable account
+    receivable_account = frappe.db.get_value(
+        "Account",
+        {"company": company.name, "account_type": "Receivable", "is_group": 0},
+        "name"
+    )
+
+    invoice = frappe.get_doc({
+        "doctype": "Sales Invoice",
+        "naming_series": "",
+        "name": inv_data["name"],
+        "customer": inv_data["customer"],
+        "company": company.name,
+        "posting_date": inv_data["date"],
+        "due_date": add_days(inv_data["date"], 30),
+        "debit_to": receivable_account,
+        "items": [{
+            "item_name": "Service",
+            "description": "Consulting Service",
+            "qty": 1,
+            "rate": inv_data["total"],
+            "income_account": income_account,
+        }],
+        "taxes": [{
+            "charge_type": "On Net Total",
+            "account_head": tax_account,
+            "description": "VAT 5%",
+            "rate": 5,
+        }] if tax_account else [],
+    })
 
-    frappe.db.commit()
-    return invoices
+    invoice.insert(ignore_permissions=True)
+    invoice.submit()
+    return invoice
 
 
 def create_csv_import_from_invoices(company, invoices):
@@ -0,0 +1,94 @@
+# Copyright (c) 2024, DigiComply
+# Tests for the byte-level CSV row scanner
+
+"""
+Checks iter_csv_row_offsets against csv.reader: every file must give the
+same number of non-empty rows, and each offset must start the row it
+stands for.
+
+Run with: bench --site [sitename] run-tests --module digicomply.tests.test_csv_scan
+"""
+
+import csv
+import os
+import tempfile
+from io import StringIO
+
+from frappe.tests.utils import FrappeTestCase
+
+from digicomply import utils
+from digicomply.utils import iter_csv_row_offsets, iter_csv_rows
+
+
+class TestCSVRowScan(FrappeTestCase):
+    def assertScanMatchesCSV(self, text, encoding="utf-8", delimiter=","):
+        """Scanner rows and offsets agree with csv.reader on text"""
+        path = self.write_file(text.encode(encoding))
+        expected = [
+            row for row in csv.reader(StringIO(text, newline=""), delimiter=delimiter)
+            if any(cell.strip() for cell in row)
+        ]
+
+        offsets = list(iter_csv_row_offsets(path, encoding, delimiter))
+        self.assertEqual(len(offsets), len(expected), repr(text))
+
+        for index, offset in enumerate(offsets):
+            if offset is not None:
+                self.assertEqual(list(iter_csv_rows(path, encoding, delimiter, offset)), expected[index:], repr(text))
+
+        return offsets
+
+    def write_file(self, content):
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_plain_rows(self):
+        offsets = self.assertScanMatchesCSV("a,b\n1,2\n\n3,4\n")
+        self.assertEqual(offsets, [0, 4, 9])
+
+    def test_quoted_newlines(self):
+        self.assertScanMatchesCSV('"no","note"\n"1","two\nlines"\n"2","x"\n')
+        self.assertScanMatchesCSV('a,b\n1,"open\n\n,still open"\n2,"a ""quoted"" word"\n')
+
+    def test_crlf(self):
+        offsets = self.assertScanMatchesCSV('"a","b"\r\n"1","2"\r\n\r\n3,4\r\n')
+        self.assertEqual(offsets, [0, 9, 20])
+
+    def test_bare_cr(self):
+        self.assertScanMatchesCSV("a,b\r1,2\r3,4\r")
+        self.assertScanMatchesCSV("a,b\n1,2\n3\r4\n")
+        self.assertScanMatchesCSV('""111\r\né,,\t;a\r;\t\t;\r\n\t\n', delimiter=";")
+
+    def test_bare_cr_after_first_block(self):
+        self.patch_block_size(8)
+        self.assertScanMatchesCSV("a,b\n1,2\n3,4\n5,6\n7,8\r9,0\n")
+        self.assertScanMatchesCSV('a,b\n1,"x\ny"\n3,4\n5,"6\r7"\r8,9\n')
+
+    def test_utf8_bom(self):
+        offsets = self.assertScanMatchesCSV("a;b\n1;2\n", encoding="utf-8-sig", delimiter=";")
+        self.assertEqual(offsets, [3, 7])
+
+    def test_utf16(self):
+        offsets = self.assertScanMatchesCSV("a\tb\n1\t2\n\n3\t4", encoding="utf-16", delimiter="\t")
+        self.assertEqual(offsets, [None, None, None])
+
+    def test_trailing_row_without_newline(self):
+        self.assertScanMatchesCSV("a,b\n1,2")
+        self.assertScanMatchesCSV('a,b\n1,"2"')
+        self.assertScanMatchesCSV('a,b\n1,"open\nto the end')
+        self.assertScanMatchesCSV("a,b\n1,2\n  ,  ")
+
+    def test_blank_rows(self):
+        self.assertScanMatchesCSV('a,b\n,\n"",""\n \t\n" ",x\n')
+
+    def test_small_blocks(self):
+        self.patch_block_size(4)
+        self.assertScanMatchesCSV('"a","b"\n"1","x\ny"\n\n"2","3"\n4,5\n')
+
+    def patch_block_size(self, size):
+        block_size = utils.CSV_SCAN_BLOCK_BYTES
+        utils.CSV_SCAN_BLOCK_BYTES = size
+        self.addCleanup(setattr, utils, "CSV_SCAN_BLOCK_BYTES", block_size)
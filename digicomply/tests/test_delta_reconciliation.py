@@ -0,0 +1,172 @@
+# Copyright (c) 2024, DigiComply
+# Tests for incremental (delta) reconciliation
+
+"""
+A delta run re-matches only the invoices changed since its base run and
+copies the other base rows over in SQL. Its items must be exactly those
+of a full run over the same data.
+
+Run with: bench --site [sitename] run-tests --module digicomply.tests.test_delta_reconciliation
+"""
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, today
+
+from digicomply.tests.test_core_flow import (
+    cleanup_test_data,
+    create_csv_import_from_content,
+    create_sales_invoice,
+    setup_company,
+    setup_customers,
+)
+
+
+ITEM_FIELDS = ["invoice_no", "match_status", "asp_invoice_no", "erp_grand_total", "asp_grand_total", "differences"]
+
+
+class TestDeltaReconciliation(FrappeTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.company = setup_company()
+        cls.customers = setup_customers(cls.company)
+
+    def setUp(self):
+        cleanup_test_data()
+        self.addCleanup(cleanup_test_data)
+
+        self.invoices = [
+            self.make_invoice(f"DLT-{i:03d}", add_days(today(), -20 + i), 1000 * (i + 1), self.customers[i % 8])
+            for i in range(12)
+        ]
+        self.asp_rows = {inv.name: self.get_asp_row(inv) for inv in self.invoices}
+
+        # One pair mismatched and one invoice only the ASP has
+        self.asp_rows["DLT-006"]["grand_total"] += 100
+        self.asp_rows["DLT-ASP-ONLY"] = {
+            "posting_date": today(), "customer_name": "Unknown Customer", "grand_total": 500.0, "vat_amount": 25.0
+        }
+
+    def make_invoice(self, name, posting_date, total, customer):
+        return create_sales_invoice(
+            self.company, {"name": name, "customer": customer.name, "date": posting_date, "total": total}
+        )
+
+    def get_asp_row(self, invoice):
+        return {
+            "posting_date": str(invoice.posting_date),
+            "customer_name": invoice.customer_name,
+            "grand_total": invoice.grand_total,
+            "vat_amount": invoice.total_taxes_and_charges,
+        }
+
+    def make_csv_import(self):
+        lines = ["Invoice Number,Invoice Date,Customer Name,Grand Total,VAT Amount"]
+        for inv_no, row in self.asp_rows.items():
+            lines.append(
+                f"{inv_no},{row['posting_date']},{row['customer_name']},{row['grand_total']:.2f},{row['vat_amount']:.2f}"
+            )
+        return create_csv_import_from_content(self.company, "\n".join(lines))
+
+    def run_reconciliation(self, csv_import, base_run=None):
+        run = frappe.get_doc({
+            "doctype": "Reconciliation Run",
+            "company": self.company.name,
+            "asp_provider": "ClearTax",
+            "csv_import": csv_import.name,
+            "from_date": add_days(today(), -30),
+            "to_date": today(),
+            "posting_date": today(),
+            "use_fuzzy_matching": 0,
+            "delta_mode": 1 if base_run else 0,
+            "base_reconciliation_run": base_run,
+            "status": "Draft",
+        })
+        run.insert(ignore_permissions=True)
+        run.run_reconciliation()
+
+        frappe.db.commit()
+        return frappe.get_doc("Reconciliation Run", run.name)
+
+    def change_books(self):
+        """Change, cancel, move out of the period and add book invoices"""
+        frappe.db.set_value("Sales Invoice", "DLT-001", "grand_total", self.invoices[1].grand_total + 40)
+        frappe.get_doc("Sales Invoice", "DLT-002").cancel()
+        frappe.db.set_value("Sales Invoice", "DLT-003", "posting_date", add_days(today(), -60))
+        new_invoice = self.make_invoice("DLT-NEW", add_days(today(), -2), 2500, self.customers[0])
+        frappe.db.commit()
+        return new_invoice
+
+    def get_items(self, run):
+        return sorted(
+            tuple(str(item[field] or "") for field in ITEM_FIELDS)
+            for item in frappe.get_all("Reconciliation Item", filters={"parent": run.name}, fields=ITEM_FIELDS)
+        )
+
+    def assertSameAsFullRun(self, delta, full):
+        self.assertEqual(self.get_items(delta), self.get_items(full))
+        for field in ("total_invoices", "matched_count", "mismatched_count", "missing_in_asp", "missing_in_erp"):
+            self.assertEqual(delta.get(field), full.get(field), field)
+
+        # Base rows were copied, and numbered on from 1 with the re-matched ones
+        self.assertGreater(delta.carried_forward_count, 0)
+        idx = frappe.get_all("Reconciliation Item", filters={"parent": delta.name}, pluck="idx", order_by="idx asc")
+        self.assertEqual(idx, list(range(1, len(idx) + 1)))
+
+    def resolve_item(self, run, invoice_no):
+        frappe.db.set_value(
+            "Reconciliation Item", {"parent": run.name, "invoice_no": invoice_no}, "resolution_notes", "Checked"
+        )
+        frappe.db.commit()
+
+    def get_resolution(self, run, invoice_no):
+        return frappe.db.get_value(
+            "Reconciliation Item", {"parent": run.name, "invoice_no": invoice_no}, "resolution_notes"
+        )
+
+    def test_delta_after_book_changes(self):
+        csv_import = self.make_csv_import()
+        base = self.run_reconciliation(csv_import)
+        self.resolve_item(base, "DLT-008")
+
+        self.change_books()
+
+        delta = self.run_reconciliation(csv_import, base_run=base.name)
+        full = self.run_reconciliation(csv_import)
+
+        self.assertEqual(delta.base_reconciliation_run, base.name)
+        self.assertSameAsFullRun(delta, full)
+        self.assertEqual(self.get_resolution(delta, "DLT-008"), "Checked")
+
+    def test_delta_after_book_and_asp_changes(self):
+        base = self.run_reconciliation(self.make_csv_import())
+        self.resolve_item(base, "DLT-008")
+
+        new_invoice = self.change_books()
+
+        # Change, drop and add ASP rows, then import them again
+        self.asp_rows["DLT-004"]["vat_amount"] += 10
+        del self.asp_rows["DLT-005"]
+        self.asp_rows["DLT-006"]["grand_total"] -= 100
+        self.asp_rows["DLT-NEW"] = self.get_asp_row(new_invoice)
+        self.asp_rows["DLT-ASP-NEW"] = dict(self.asp_rows["DLT-ASP-ONLY"], grand_total=750.0)
+        del self.asp_rows["DLT-ASP-ONLY"]
+        csv_import = self.make_csv_import()
+
+        delta = self.run_reconciliation(csv_import, base_run=base.name)
+        full = self.run_reconciliation(csv_import)
+
+        self.assertSameAsFullRun(delta, full)
+        self.assertEqual(self.get_resolution(delta, "DLT-008"), "Checked")
+
+    def test_base_run_for_another_period_is_not_used(self):
+        csv_import = self.make_csv_import()
+        base = self.run_reconciliation(csv_import)
+        frappe.db.set_value("Reconciliation Run", base.name, "from_date", add_days(today(), -31))
+
+        delta = self.run_reconciliation(csv_import, base_run=base.name)
+        full = self.run_reconciliation(csv_import)
+
+        self.assertFalse(delta.carried_forward_count)
+        self.assertEqual(self.get_items(delta), self.get_items(full))
@@ -5,9 +5,37 @@
 DigiComply Utilities
 """
 
+import codecs
+import csv
+import re
+import time
+from io import BufferedReader, BytesIO, RawIOBase, StringIO, TextIOWrapper
+from itertools import accumulate, islice
+
 import frappe
 from frappe import _
-from frappe.utils import cstr
+from frappe.utils import cint, cstr, now_datetime
+
+
+# CSV sniffing: bytes read to detect encoding and delimiter, and candidates in order
+CSV_SNIFF_BYTES = 64 * 1024
+CSV_DELIMITERS = [",", ";", "\t"]
+
+# Characters str.strip() removes that are single ASCII bytes in every supported encoding
+CSV_WHITESPACE = b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+
+# Row scans read the file in blocks of whole lines; most blocks are counted without a per-line loop
+CSV_SCAN_BLOCK_BYTES = 1024 * 1024
+CSV_BLANK_LINE = re.compile(r"\n[^\S\n]*\n")
+# csv.reader also ends a row at a CR that no LF follows
+CSV_BARE_CR = re.compile(rb"\r(?!\n)")
+
+# Non-UTF-8 exports from Arabic Windows systems are almost always Windows-1256
+CSV_FALLBACK_ENCODING = "cp1256"
+
+# Progress writes: at most one per interval unless progress moved by the step
+PROGRESS_FLUSH_SECONDS = 2
+PROGRESS_FLUSH_PERCENT = 5
 
 
 def format_trn(trn: str) -> str:
@@ -147,3 +175,432 @@ def get_compliance_status(score: float) -> dict:
             "indicator": "red",
             "recommendation": _("URGENT: Submit missing invoices immediately"),
         }
+
+
+def bulk_insert_rows(doctype, fields, rows, parent_doc=None, parentfield=None, chunk_size=1000, first_idx=1):
+    """
+    Insert rows with multi-row INSERT statements, bypassing the ORM
+
+    Standard columns (name, owner, timestamps, docstatus and, for child
+    tables, parent/parenttype/parentfield/idx) are filled in. No
+    validation, hooks or naming series run, so callers must pass
+    rows that are already valid.
+
+    Args:
+        doctype: DocType to insert into
+        fields: Fieldnames to write; keys missing from a row are inserted as NULL
+        rows: Iterable of dicts with field values (may be a generator)
+        parent_doc: Parent document when inserting child table rows
+        parentfield: Table fieldname on the parent
+        chunk_size: Rows per INSERT statement
+        first_idx: idx of the first child row, for appending to rows already in the table
+
+    Returns:
+        int: Number of rows inserted
+    """
+    now = now_datetime()
+    user = frappe.session.user
+
+    columns = ["name", "owner", "creation", "modified", "modified_by", "docstatus"]
+    if parent_doc:
+        columns += ["parent", "parenttype", "parentfield", "idx"]
+    columns += [f for f in fields if f not in columns]
+
+    values = []
+    count = 0
+
+    for row in rows:
+        count += 1
+        record = {
+            "name": frappe.generate_hash(length=10),
+            "owner": user,
+            "creation": now,
+            "modified": now,
+            "modified_by": user,
+            "docstatus": parent_doc.docstatus if parent_doc else 0,
+        }
+        if parent_doc:
+            record.update({
+                "parent": parent_doc.name,
+                "parenttype": parent_doc.doctype,
+                "parentfield": parentfield,
+                "idx": first_idx + count - 1,
+            })
+        record.update(row)
+
+        values.append(tuple(record.get(c) for c in columns))
+
+        if len(values) >= chunk_size:
+            frappe.db.bulk_insert(doctype, columns, values)
+            values = []
+
+    if values:
+        frappe.db.bulk_insert(doctype, columns, values)
+
+    return count
+
+
+def reserve_names(prefix, count, digits=4):
+    """
+    Take count consecutive numbers from a naming series in one update
+
+    Returns the names the series would give, e.g. prefix + "0001", for
+    rows written with bulk_insert_rows.
+    """
+    current = frappe.db.sql("select `current` from `tabSeries` where `name`=%s for update", prefix)
+
+    if current and current[0][0] is not None:
+        start = cint(current[0][0])
+        frappe.db.sql("update `tabSeries` set `current` = `current` + %s where `name`=%s", (count, prefix))
+    else:
+        start = 0
+        frappe.db.sql("insert into `tabSeries` (`name`, `current`) values (%s, %s)", (prefix, count))
+
+    return [f"{prefix}{number:0{digits}d}" for number in range(start + 1, start + count + 1)]
+
+
+class ProgressReporter:
+    """
+    Throttled, coalesced progress writes for long-running jobs
+
+    report() only keeps the latest counter values in memory. They are
+    written with a single UPDATE (one db_set) and one realtime event when
+    PROGRESS_FLUSH_SECONDS have passed or progress moved by
+    PROGRESS_FLUSH_PERCENT since the last write, or when forced. Call
+    flush() before completing or cancelling so the final values land.
+
+    With shared=True the interval is enforced through a Redis key, so
+    several workers reporting on the same document (parallel shards) write
+    at most once per interval between them.
+    """
+
+    def __init__(self, doc, event=None, interval=PROGRESS_FLUSH_SECONDS, step=PROGRESS_FLUSH_PERCENT, shared=False):
+        self.doc = doc
+        self.event = event
+        self.interval = interval
+        self.step = step
+        self.shared = shared
+
+        self.values = {}
+        self.message = None
+        self.percent = 0
+        self.last_percent = 0
+        self.last_flush = time.monotonic()
+
+    def report(self, values, percent=None, message=None, force=False) -> bool:
+        """Record the latest values; returns True if they were written now"""
+        self.values.update(values)
+        if message is not None:
+            self.message = message
+        if percent is not None:
+            self.percent = percent
+
+        if force or self.is_due():
+            return self.flush()
+        return False
+
+    def is_due(self) -> bool:
+        if self.percent >= 100 or self.percent - self.last_percent >= self.step:
+            return True
+
+        if self.shared:
+            # Only the first worker in each interval gets the key
+            cache = frappe.cache()
+            key = cache.make_key(f"progress::{self.doc.doctype}::{self.doc.name}")
+            return bool(cache.set(key, 1, ex=max(int(self.interval), 1), nx=True))
+
+        return time.monotonic() - self.last_flush >= self.interval
+
+    def flush(self) -> bool:
+        """Write pending values and publish the latest message; returns False if nothing was pending"""
+        if not self.values and self.message is None:
+            return False
+
+        if self.values:
+            self.doc.db_set(self.values, update_modified=False)
+
+        if self.event and self.message is not None:
+            frappe.publish_realtime(self.event, self.message, user=frappe.session.user)
+
+        self.values = {}
+        self.message = None
+        self.last_percent = self.percent
+        self.last_flush = time.monotonic()
+        return True
+
+
+def get_file_path(file_url: str) -> str:
+    """On-disk path of an uploaded File, public or private"""
+    return frappe.get_doc("File", {"file_url": file_url}).get_full_path()
+
+
+def sniff_csv_format(path: str, sample_size: int = CSV_SNIFF_BYTES) -> tuple:
+    """
+    Detect encoding and delimiter of a CSV file from its first sample_size bytes
+
+    Encoding: a UTF-16 or UTF-8 BOM wins, then UTF-8 if the sample decodes,
+    otherwise CSV_FALLBACK_ENCODING. Delimiter: see sniff_csv_delimiter.
+
+    Returns:
+        tuple: (encoding, delimiter)
+    """
+    with open(path, "rb") as f:
+        sample = f.read(sample_size)
+
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        encoding = "utf-16"
+    else:
+        encoding = "utf-8-sig"
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+        except UnicodeDecodeError:
+            encoding = CSV_FALLBACK_ENCODING
+
+    text = sample.decode(encoding, errors="ignore")
+
+    # The sample may end mid-line; only complete lines are inspected
+    lines = text.splitlines()
+    if len(sample) == sample_size and len(lines) > 1:
+        lines = lines[:-1]
+
+    return encoding, sniff_csv_delimiter(lines)
+
+
+def sniff_csv_delimiter(lines) -> str:
+    """First of CSV_DELIMITERS that splits the first non-empty line into several columns"""
+    first_line = next((line for line in lines if line.strip()), "")
+
+    for delimiter in CSV_DELIMITERS:
+        row = next(csv.reader([first_line], delimiter=delimiter), [])
+        if len(row) > 1:
+            return delimiter
+
+    return CSV_DELIMITERS[0]
+
+
+def parse_csv_text(content: str) -> list:
+    """Parse CSV text already in memory into its non-empty rows, in one pass"""
+    delimiter = sniff_csv_delimiter(content[:CSV_SNIFF_BYTES].splitlines())
+    return [
+        row for row in csv.reader(StringIO(content, newline=""), delimiter=delimiter)
+        if any(cell.strip() for cell in row)
+    ]
+
+
+def iter_csv_rows(path: str, encoding: str = None, delimiter: str = None, offset: int = None,
+                  end: int = None):
+    """
+    Yield the non-empty rows of a CSV file lazily
+
+    The file is streamed from disk, so memory stays flat whatever its size.
+    Encoding and delimiter are sniffed when not given (see sniff_csv_format).
+    With offset, reading starts at that byte, which must be the start of a
+    row as yielded by iter_csv_row_offsets. With end, it stops before that
+    byte.
+    """
+    if not encoding or not delimiter:
+        sniffed_encoding, sniffed_delimiter = sniff_csv_format(path)
+        encoding = encoding or sniffed_encoding
+        delimiter = delimiter or sniffed_delimiter
+
+    with open(path, "rb") as raw:
+        if offset:
+            raw.seek(offset)
+        if end is not None:
+            raw = BufferedReader(BoundedReader(raw, end - (offset or 0)))
+
+        f = TextIOWrapper(raw, encoding=encoding, newline="")
+        for row in csv.reader(f, delimiter=delimiter):
+            if any(cell.strip() for cell in row):
+                yield row
+
+
+class BoundedReader(RawIOBase):
+    """Raw stream over the next size bytes of a binary file"""
+
+    def __init__(self, raw, size):
+        self.raw = raw
+        self.remaining = max(size, 0)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.raw.read(min(len(buffer), self.remaining))
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+def iter_csv_row_offsets(path: str, encoding: str = None, delimiter: str = None):
+    """
+    Yield the byte offset at which each non-empty row of a CSV file starts
+
+    A scan over the raw bytes, much cheaper than parsing: blocks of lines
+    that are all complete, non-empty rows are counted as a whole, and only
+    the others are followed line by line for quoted line breaks. Rows match
+    those of iter_csv_rows.
+
+    UTF-16 files cannot be scanned by line, nor can blocks with a bare CR
+    (one no LF follows); rows from there on are counted with iter_csv_rows
+    and yield None.
+    """
+    if not encoding or not delimiter:
+        sniffed_encoding, sniffed_delimiter = sniff_csv_format(path)
+        encoding = encoding or sniffed_encoding
+        delimiter = delimiter or sniffed_delimiter
+
+    with open(path, "rb") as f:
+        sample = f.read(CSV_SNIFF_BYTES)
+
+    if encoding.startswith("utf-16"):
+        for _row in iter_csv_rows(path, encoding, delimiter):
+            yield None
+        return
+
+    separator = delimiter.encode()
+    blank_bytes = CSV_WHITESPACE + b'"' + separator
+    single_line_rows = get_csv_block_pattern(separator)
+
+    with open(path, "rb") as f:
+        # A UTF-8 BOM is not part of the first cell
+        offset = len(codecs.BOM_UTF8) if sample.startswith(codecs.BOM_UTF8) else 0
+        f.seek(offset)
+        start = offset
+        lines = []
+        in_quotes = False
+
+        while block := f.read(CSV_SCAN_BLOCK_BYTES):
+            block += f.readline()
+
+            if CSV_BARE_CR.search(block):
+                # Rescan from the last row start found, which lies before this block
+                for _row in iter_csv_rows(path, encoding, delimiter, start if lines else offset):
+                    yield None
+                return
+
+            if not lines and is_simple_csv_block(block, separator, single_line_rows, blank_bytes, encoding):
+                # One row per line: offsets are the running total of line lengths
+                line_count = block.count(b"\n") + (not block.endswith(b"\n"))
+                yield from islice(accumulate(map(len, BytesIO(block)), initial=offset), line_count)
+                offset += len(block)
+                continue
+
+            for line in BytesIO(block):
+                if not lines:
+                    start = offset
+                offset += len(line)
+                lines.append(line)
+
+                if b'"' in line or in_quotes:
+                    in_quotes = csv_line_ends_in_quotes(line, separator, in_quotes)
+                    if in_quotes:
+                        continue
+
+                if not is_blank_csv_record(lines, blank_bytes, encoding, delimiter):
+                    yield start
+                lines = []
+
+        # An unterminated quoted field runs to the end of the file, as in csv.reader
+        if lines and not is_blank_csv_record(lines, blank_bytes, encoding, delimiter):
+            yield start
+
+
+def get_csv_block_pattern(separator: bytes):
+    """Regex for whole lines whose quotes only enclose single-line fields"""
+    sep = re.escape(separator)
+    field = rb'(?:"[^"\n]*(?:""[^"\n]*)*"|[^"' + sep + rb'\r\n]*)'
+    line = field + rb"(?:" + sep + field + rb")*"
+    return re.compile(rb"(?:" + line + rb"\r?\n)*(?:" + line + rb")?")
+
+
+def is_simple_csv_block(block: bytes, separator: bytes, single_line_rows, blank_bytes: bytes,
+                        encoding: str) -> bool:
+    """Whether every line of a block of whole lines is a complete, non-empty row"""
+    if (
+        b'"' in block
+        and not is_fully_quoted_csv_block(block, separator)
+        and not single_line_rows.fullmatch(block)
+    ):
+        return False
+
+    # With quotes and separators dropped, a blank row is a line of whitespace only
+    content = block.translate(None, blank_bytes.replace(b"\n", b""))
+    if not block.endswith(b"\n"):
+        content += b"\n"
+    return not CSV_BLANK_LINE.search("\n" + content.decode(encoding, errors="ignore"))
+
+
+def is_fully_quoted_csv_block(block: bytes, separator: bytes) -> bool:
+    """
+    Cheap check for the common all-quoted export ("a","b","c" on every line)
+
+    Every line break must sit between a closing and an opening quote, and
+    inside each line every other quote must close a field right before the
+    next opens, or be escaped.
+    """
+    text = block.replace(b"\r\n", b"\n")
+    if text.endswith(b"\n"):
+        text = text[:-1]
+    if len(text) < 2 or text[:1] != b'"' or text[-1:] != b'"':
+        return False
+    if text.count(b'"\n"') != text.count(b"\n"):
+        return False
+
+    inner = text[1:-1].replace(b'"\n"', b"\n").replace(b'"' + separator + b'"', b"").replace(b'""', b"")
+    return b'"' not in inner
+
+
+def csv_line_ends_in_quotes(line: bytes, separator: bytes, in_quotes: bool = False) -> bool:
+    """
+    Whether a quoted field is still open at the end of line
+
+    Follows csv.reader: a quote opens a quoted field only at the start of
+    a field, "" inside one is an escaped quote, and text after the closing
+    quote runs on to the next separator.
+    """
+    position = 0
+    length = len(line)
+
+    while position < length:
+        if in_quotes or line[position:position + 1] == b'"':
+            if not in_quotes:
+                position += 1
+            # Find the closing quote, skipping escaped ones
+            while True:
+                close = line.find(b'"', position)
+                if close < 0:
+                    return True
+                if line[close + 1:close + 2] == b'"':
+                    position = close + 2
+                    continue
+                position = close + 1
+                break
+            in_quotes = False
+
+        next_field = line.find(separator, position)
+        if next_field < 0:
+            return False
+        position = next_field + len(separator)
+
+    return False
+
+
+def is_blank_csv_record(lines, blank_bytes: bytes, encoding: str, delimiter: str) -> bool:
+    """Whether every cell of a (possibly multi-line) record is empty or whitespace"""
+    record = b"".join(lines)
+    content = record.translate(None, blank_bytes)
+
+    if content and (content.isascii() or content.decode(encoding, errors="ignore").strip()):
+        return False
+
+    if b'"' not in record:
+        return True
+
+    # Quotes may be cell content, or enclose only separators; let csv decide
+    text = record.decode(encoding, errors="ignore")
+    return not any(
+        cell.strip()
+        for row in csv.reader(StringIO(text, newline=""), delimiter=delimiter)
+        for cell in row
+    )